@@ -31,12 +31,20 @@
 #  OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from bin.utils.getconfig import *
-from TI.classnames import *
+import TI.classnames
 
 import argparse
 import cv2
 import numpy as np
 
+unknown_label = "unknown"
+
+# The label background around the center of each box, and the box and text
+# colors at a score of 1
+text_box_offsets = np.array([-5, 5, 160, -15], dtype=np.int32)
+box_color_scale = np.array([120, 120, 50], dtype=np.float32)
+text_color_scale = 240
+
 
 class PostProcess:
     """
@@ -49,9 +57,8 @@ class PostProcess:
     """
 
     def __init__(self, model_dir, disp_width, disp_height):
-        # Get parsed the model params
-        config = GetConfigYaml(model_dir)
-        self.params = config.params
+        # Get the model params, parsed once per process
+        self.params = get_model_params(model_dir)
 
         # Get the model and demo names
         self.model_name = model_dir[:len(model_dir) - 1]
@@ -94,51 +101,119 @@ class PostProcessDetection(PostProcess):
     def __init__(self, model, disp_width, disp_height):
         super().__init__(model, disp_width, disp_height)
 
-        self.classname = None
+        self.labels = self._make_labels()
+
+        # The model sees the center of the frame scaled to the crop size,
+        # so its boxes are shifted by the cropped margin of the resize
+        self.crop_offset = None
+        crop = getattr(self.params, 'crop', None)
+        if (crop is not None and tuple(crop) != tuple(self.params.resize)):
+            offset = np.zeros(4, dtype=np.float32)
+            for coordinate in range(4):
+                axis = coordinate % 2
+                offset[self.params.formatter.index(coordinate)] = \
+                    (self.params.resize[axis] - crop[axis]) / 2
+            self.crop_offset = offset
+
+    def get_uncropped_results(self, results):
+        """Map the boxes of a center cropped input to the resize of the
+        whole frame
+        """
+
+        if (self.crop_offset is None):
+            return results
+
+        class_IDs, scores, bounding_boxes = results
+
+        return class_IDs, scores, bounding_boxes + self.crop_offset
+
+    def _make_labels(self):
+        """Build the label of every class ID the model predicts, with the
+        label offset to the dataset applied. The last label is for the IDs
+        out of the dataset.
+        """
+
+        classnames = getattr(TI.classnames, self.params.dataset)
+        label_offset = self.params.label_offset
 
-    def overlay_bounding_box(self, frame, results, classnames, score_thresh,
-                             scalex, scaley, label_offset, formatter):
+        if isinstance(label_offset, dict):
+            size = max(label_offset, default=-1) + 1
+            offsets = [label_offset.get(class_id) for class_id in range(size)]
+        else:
+            size = max(max(classnames) - label_offset + 1, 0)
+            offsets = [class_id + label_offset for class_id in range(size)]
+
+        labels = np.empty(size + 1, dtype=object)
+        labels[:size] = [classnames.get(offset, unknown_label)
+                         for offset in offsets]
+        labels[size] = unknown_label
+
+        return labels
+
+    def get_labels(self, class_IDs):
+        """Getter for the label of every detection from its class ID
+
+        Args:
+            class_IDs: The (1, N) class IDs of the detections
+        """
+
+        class_IDs = np.asarray(class_IDs).reshape(-1).astype(np.intp)
+        unknown = len(self.labels) - 1
+        class_IDs[(class_IDs < 0) | (class_IDs > unknown)] = unknown
+
+        return self.labels[class_IDs]
+
+    def overlay_bounding_box(self, frame, results, labels, score_thresh,
+                             scalex, scaley, formatter):
         class_IDs, scores, bounding_boxes = results
-        for i, score in enumerate(np.squeeze(scores, axis=0)):
-            if (score <= score_thresh):
-                continue
-            box = bounding_boxes[0][i]
-            box = [int(box[formatter.index(0)] * scalex),
-                   int(box[formatter.index(1)] * scaley),
-                   int(box[formatter.index(2)] * scalex),
-                   int(box[formatter.index(3)] * scaley)]
-            class_id = label_offset[int(class_IDs[0][i])]
-            box_color = (int(120 * score), int(120 * score), int(50 * score))
-            text_color = (int(240 * score), int(240 * score), int(240 * score))
+
+        # Reorder, scale and truncate all the boxes above the threshold at
+        # once, so only the drawing is left for each box
+        scores = np.asarray(scores)[0]
+        keep = np.flatnonzero(scores > score_thresh)
+        if keep.size == 0:
+            return frame
+
+        scores = scores[keep]
+        order = [formatter.index(coordinate) for coordinate in range(4)]
+        boxes = (np.asarray(bounding_boxes)[0][keep][:, order] *
+                 (scalex, scaley, scalex, scaley)).astype(np.int32)
+
+        centers = ((boxes[:, :2] + boxes[:, 2:]) / 2).astype(np.int32)
+        text_boxes = centers[:, [0, 1, 0, 1]] + text_box_offsets
+        box_colors = (scores[:, np.newaxis] * box_color_scale).astype(np.int32)
+        text_colors = (text_color_scale * scores).astype(np.int32)
+
+        for box, text_box, center, box_color, text_color, label in zip(
+                boxes.tolist(), text_boxes.tolist(), centers.tolist(),
+                box_colors.tolist(), text_colors.tolist(),
+                np.asarray(labels)[keep]):
+            box_color = tuple(box_color)
             cv2.rectangle(frame, (box[0], box[1]),
                           (box[2], box[3]), box_color, 2)
             cv2.rectangle(frame,
-                          (int((box[2] + box[0]) / 2) - 5,
-                           int((box[3] + box[1]) / 2) + 5),
-                          (int((box[2] + box[0]) / 2) + 160,
-                              int((box[3] + box[1]) / 2) - 15),
+                          (text_box[0], text_box[1]),
+                          (text_box[2], text_box[3]),
                           box_color,
                           -1)
             cv2.putText(frame,
-                        classnames[class_id],
-                        (int((box[2] + box[0]) / 2),
-                         int((box[3] + box[1]) / 2)),
+                        label,
+                        tuple(center),
                         cv2.FONT_HERSHEY_SIMPLEX,
                         0.3,
-                        text_color)
-
-            self.classname = classnames[class_id]
+                        (text_color, text_color, text_color))
 
         return frame
 
-    def get_postprocessed_image(self, img, results):
+    def get_postprocessed_image(self, img, results, labels=None):
         # Get the image size
         (img_height, img_width, img_channels) = img.shape
         img_height = img_height
         img_width = img_width
         img_channels = img_channels
 
-        classnames = eval(self.params.dataset)
+        if labels is None:
+            labels = self.get_labels(results[0])
         scalex = img_width / self.params.resize[0]
         scaley = img_height / self.params.resize[1]
         threshold = 0.5
@@ -146,14 +221,10 @@ class PostProcessDetection(PostProcess):
         img = self.overlay_bounding_box(
             img,
             results,
-            classnames,
+            labels,
             threshold,
             scalex,
             scaley,
-            self.params.label_offset,
             self.params.formatter)
 
         return img
-
-    def get_classname(self):
-        return self.classname
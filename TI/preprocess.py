@@ -34,6 +34,7 @@ from bin.utils.getconfig import *
 
 import cv2
 import numpy as np
+import threading
 import yaml
 
 
@@ -50,9 +51,19 @@ class PreProcess:
     """
 
     def __init__(self, model_dir):
-        # Get parsed the model params
-        config = GetConfigYaml(model_dir)
-        self.params = config.params
+        # Get the model params, parsed once per process
+        self.params = get_model_params(model_dir)
+
+        # The normalized value of every 8 bit value of each channel
+        self.lut = self.get_normalization_lut(
+            self.params.mean, self.params.scale)
+
+    def get_normalization_lut(self, mean, scale):
+        values = np.arange(256, dtype=np.float32)[:, np.newaxis]
+        lut = (values - np.array(mean, dtype=np.float32)) * \
+            np.array(scale, dtype=np.float32)
+
+        return lut[np.newaxis].astype(np.float32)
 
     def resize(self, img, new_width, new_height):
         if img is None:
@@ -107,14 +118,201 @@ class PreProcess:
 
 
 class PreProcessDetection(PreProcess):
-    def get_preprocessed_image(self, img):
-        img = self.resize(img, *self.params.resize)
+    """
+    Detection pre-process with preallocated buffers
+    The resize, channel swap and normalization are written by OpenCV into
+    buffers kept per thread, so the steady state does not allocate. The
+    returned tensor is overwritten by the next call on the same thread,
+    unless an output tensor is given.
+    The tensor is float32 unless set_input_type selects an 8 bit integer
+    type, in which case the mean and scale are folded into the runtime
+    quantization and applied together with the channel swap in one pass.
+    Float tensors are normalized by default with a lookup in the per
+    channel tables, followed by a single copy doing the channel swap and
+    layout change.
+    A center crop smaller than the resize is taken as a view of the frame
+    before the resize, so only the cropped pixels are scaled to the crop
+    size given to the model.
+    Args:
+        model_dir (string): The model directory
+        normalization (string): 'lut' or 'arithmetic' float normalization
+    """
+
+    def __init__(self, model_dir, normalization='lut'):
+        super().__init__(model_dir)
+
+        if (normalization not in ('lut', 'arithmetic')):
+            raise PreProcessError(
+                "Unsupported normalization %s" % normalization)
+        self.normalization = normalization
+
+        # The lookup is done on the input channels, before the swap
+        self.input_lut = self.lut
         if (not self.params.reverse_channels):
-            img = self.channel_swap_bgr_to_rgb(img)
-        img = self.change_format(img, 'HWC', self.params.data_layout)
-        img = self.subtract_mean_and_scale(
-            img,
-            self.params.mean,
-            self.params.scale,
-            self.params.data_layout.index('C'))
-        return img
+            self.input_lut = np.ascontiguousarray(self.lut[:, :, ::-1])
+
+        width, height = self.params.resize
+        self.crop = None
+        crop = getattr(self.params, 'crop', None)
+        if (crop is not None and tuple(crop) != (width, height)):
+            crop_width, crop_height = crop
+            if (not 0 < crop_width <= width or
+                    not 0 < crop_height <= height):
+                raise PreProcessError("Invalid crop %s" % (crop,))
+            # The fraction of the frame kept on each axis
+            self.crop = (crop_width / width, crop_height / height)
+            width, height = crop_width, crop_height
+
+        layout = self.params.data_layout
+        if (layout == 'NCHW'):
+            self.input_shape = (1, 3, height, width)
+        elif (layout == 'NHWC'):
+            self.input_shape = (1, height, width, 3)
+        else:
+            raise PreProcessError("Unsupported data layout %s" % layout)
+
+        self.size = (width, height)
+
+        # OpenCV scalars hold up to 4 channels
+        self.mean = tuple(self.params.mean) + (0,)
+        self.scale = tuple(self.params.scale) + (1,)
+
+        self.input_dtype = np.dtype(np.float32)
+        self.transform = None
+        self.buffers = threading.local()
+
+    def set_input_type(self, dtype, quantization=(0.0, 0)):
+        """
+        Set the type of the input tensor expected by the runtime
+        Args:
+            dtype (numpy dtype): The input tensor type
+            quantization (tuple): The (scale, zero_point) of integer
+                tensors, with a 0 scale if the values are not quantized
+        """
+        dtype = np.dtype(dtype)
+        if (dtype == np.float32):
+            self.transform = None
+        elif (dtype == np.uint8 or dtype == np.int8):
+            self.transform = self.get_transform(dtype, *quantization)
+        else:
+            raise PreProcessError("Unsupported input type %s" % dtype)
+
+        self.input_dtype = dtype
+        self.buffers = threading.local()
+
+    def get_transform(self, dtype, quantization_scale, zero_point):
+        # Each output channel is gain * input + offset
+        mean = np.array(self.params.mean, dtype=np.float64)
+        scale = np.array(self.params.scale, dtype=np.float64)
+        if (quantization_scale):
+            gain = scale / quantization_scale
+            offset = zero_point - mean * gain
+        else:
+            gain = scale
+            offset = -mean * scale
+
+        # Signed values are computed as unsigned and shifted afterwards
+        if (dtype == np.int8):
+            offset = offset + 128
+
+        transform = np.zeros((3, 4), dtype=np.float32)
+        for channel in range(3):
+            source = channel if self.params.reverse_channels else 2 - channel
+            transform[channel, source] = gain[channel]
+            transform[channel, 3] = offset[channel]
+
+        return transform
+
+    def new_input(self):
+        return np.empty(self.input_shape, dtype=self.input_dtype)
+
+    def get_buffers(self):
+        buffers = self.buffers
+        if not hasattr(buffers, 'resized'):
+            width, height = self.size
+            buffers.resized = np.empty((height, width, 3), dtype=np.uint8)
+            buffers.swapped = np.empty((height, width, 3), dtype=np.uint8)
+            buffers.normalized = np.empty((height, width, 3), dtype=np.float32)
+            buffers.converted = np.empty((height, width, 3), dtype=np.uint8)
+            buffers.input = self.new_input()
+
+        return buffers
+
+    def get_cropped_image(self, img):
+        """Get a view of the center of the image given by the crop
+        """
+
+        if (self.crop is None):
+            return img
+
+        img_height, img_width = img.shape[:2]
+        crop_width = max(1, int(round(img_width * self.crop[0])))
+        crop_height = max(1, int(round(img_height * self.crop[1])))
+        x0 = (img_width - crop_width) // 2
+        y0 = (img_height - crop_height) // 2
+
+        return img[y0:y0 + crop_height, x0:x0 + crop_width]
+
+    def get_preprocessed_image(self, img, out=None):
+        buffers = self.get_buffers()
+        if out is None:
+            out = buffers.input
+
+        img = self.get_cropped_image(img)
+
+        # Images already scaled to the model input are used as they are
+        if (img.shape[1::-1] != self.size):
+            img = cv2.resize(img, self.size, dst=buffers.resized,
+                             interpolation=cv2.INTER_LINEAR)
+
+        if (self.transform is not None):
+            return self.convert_integer(img, out, buffers)
+
+        if (self.normalization == 'lut'):
+            return self.convert_lut(img, out, buffers)
+
+        if (not self.params.reverse_channels):
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=buffers.swapped)
+
+        # NHWC is normalized in place, NCHW is transposed afterwards
+        normalized = out[0] if self.params.data_layout == 'NHWC' \
+            else buffers.normalized
+        cv2.subtract(img, self.mean, dst=normalized, dtype=cv2.CV_32F)
+        cv2.multiply(normalized, self.scale, dst=normalized)
+
+        if self.params.data_layout == 'NCHW':
+            np.copyto(out[0], normalized.transpose(2, 0, 1))
+
+        return out
+
+    def convert_integer(self, img, out, buffers):
+        # OpenCV rounds and saturates to the 8 bit range
+        target = out.view(np.uint8)
+        converted = target[0] if self.params.data_layout == 'NHWC' \
+            else buffers.converted
+        cv2.transform(img, self.transform, dst=converted)
+
+        if self.params.data_layout == 'NCHW':
+            np.copyto(target[0], converted.transpose(2, 0, 1))
+
+        if (self.input_dtype == np.int8):
+            np.bitwise_xor(target, 0x80, out=target)
+
+        return out
+
+    def convert_lut(self, img, out, buffers):
+        swap = not self.params.reverse_channels
+        if (self.params.data_layout == 'NHWC' and not swap):
+            cv2.LUT(img, self.input_lut, dst=out[0])
+            return out
+
+        normalized = cv2.LUT(img, self.input_lut, dst=buffers.normalized)
+        if (self.params.data_layout == 'NHWC'):
+            cv2.cvtColor(normalized, cv2.COLOR_BGR2RGB, dst=out[0])
+            return out
+
+        if (swap):
+            normalized = normalized[:, :, ::-1]
+        np.copyto(out[0], normalized.transpose(2, 0, 1))
+
+        return out
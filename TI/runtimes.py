@@ -30,31 +30,133 @@
 #  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 #  OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from dlr import DLRModel
+import importlib
+import logging
+import os
+import sys
+
 import numpy as np
-import tflite_runtime.interpreter as tflitert_interpreter
 
+# The run times by session name, either as classes or as the
+# 'module:class' path to import them from when selected
+_runtimes = {}
+
+
+class RunTimeError(RuntimeError):
+    pass
+
+
+def register_runtime(name, runtime=None):
+    """Register a run time under a session name
+
+    The run time is a class built from the model parameters, or its
+    'module:class' path so its module is only imported if the run time is
+    selected. Without a run time, returns a class decorator.
+
+    Args:
+        name (string): The session name selecting the run time
+        runtime (class or string): The run time to register
+    """
+    if runtime is None:
+        def decorator(cls):
+            register_runtime(name, cls)
+            return cls
+        return decorator
+
+    _runtimes[name] = runtime
+    return runtime
+
+
+def get_runtime(name):
+    """Get the run time class registered under a session name
+
+    Raises:
+        RunTimeError: If the run time is not registered or cannot be
+            imported
+    """
+    try:
+        runtime = _runtimes[name]
+    except KeyError:
+        raise RunTimeError("Unsupported run time %s" % name) from None
+
+    if isinstance(runtime, str):
+        module_name, _, class_name = runtime.partition(':')
+        try:
+            runtime = getattr(importlib.import_module(module_name),
+                              class_name)
+        except (ImportError, AttributeError) as e:
+            raise RunTimeError("Unable to load run time %s" % name) from e
+        _runtimes[name] = runtime
+
+    return runtime
+
+
+def get_runtimes():
+    return list(_runtimes)
+
+
+def make_runtime(params, threads=None):
+    """Build the run time selected by the session of the model parameters
+
+    Args:
+        params: The parsed model parameters
+        threads (int): The threads of the run time, None for its default
+    """
+    runtime = get_runtime(params.run_time)
+    if threads is None:
+        return runtime(params)
 
+    return runtime(params, threads=threads)
+
+
+def copy_results(results):
+    """Copy the results of a run time, which may be overwritten by its next
+    run, for consumers that keep them
+    """
+    return type(results)(np.copy(result) for result in results)
+
+
+@register_runtime('tvmdlr')
 class tvmdlr:
     '''
     Abstracts the tvmdlr Run Time
     '''
 
-    def __init__(self, params):
+    def __init__(self, params, threads=None):
+        from dlr import DLRModel
+
+        # The TVM thread pool is shared by the process and sized from the
+        # environment when the first model is loaded
+        if (threads is not None):
+            os.environ.setdefault('TVM_NUM_THREADS', str(threads))
+
         self.params = params
         self.model = DLRModel(params.artifacts, 'cpu')
         self.input_names = self.model.get_input_names()
 
+    def get_input_type(self):
+        return np.float32, (0.0, 0)
+
     def run(self, input_img):
         return self.model.run({self.input_names[0]: input_img})
 
+    def run_batch(self, input_imgs):
+        # DLR artifacts are compiled for a fixed input shape
+        return [self.run(input_img) for input_img in input_imgs]
 
+
+@register_runtime('tflitert')
 class tflitert:
     '''
     Abstracts the tflitert Run Time
+    The outputs are read through views of the interpreter tensors into
+    result buffers allocated once, so the results returned by run are
+    only valid until the next run. Use copy_results to keep them.
     '''
 
-    def __init__(self, params):
+    def __init__(self, params, threads=None):
+        import tflite_runtime.interpreter as tflitert_interpreter
+
         self.params = params
         delegate_options = {
             "tidl_tools_path": "null",
@@ -72,24 +174,232 @@ class tflitert:
             sys.exit(1)
 
         self.interpreter = tflitert_interpreter.Interpreter(
-            params.model_path, experimental_delegates=tidl_delegate)
+            params.model_path, experimental_delegates=tidl_delegate,
+            num_threads=threads)
         self.interpreter.allocate_tensors()
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
+        self._allocate_results()
+
+        signature = self.input_details[0].get('shape_signature')
+        self.dynamic_batch = signature is not None and signature[0] == -1
+
+    def get_input_type(self):
+        """
+        The input tensor dtype and its (scale, zero_point) quantization,
+        so the pre-process can produce the tensor in its native type
+        """
+        return (self.input_details[0]['dtype'],
+                self.input_details[0].get('quantization', (0.0, 0)))
 
     def run(self, input_img):
-        if (self.input_details[0]['dtype'] != np.float32):
-            input_img = np.uint8(input_img)
+        dtype = self.input_details[0]['dtype']
+        if (input_img.dtype != dtype):
+            input_img = input_img.astype(dtype)
+        # A previous batch may have resized the input
+        self._resize_input(input_img.shape)
         self.interpreter.set_tensor(self.input_details[0]['index'], input_img)
         self.interpreter.invoke()
-        results = [self.interpreter.get_tensor(output_detail['index'])
-                   for output_detail in self.output_details]
         if (self.params.task_type == 'detection'):
-            return self._shuffle_detection_results(results, input_img.shape[2])
+            return self._shuffle_detection_results(input_img.shape[2])[0]
+        else:
+            return self._get_results()[0]
+
+    def run_batch(self, input_imgs):
+        if not self.dynamic_batch:
+            return [copy_results(self.run(input_img))
+                    for input_img in input_imgs]
+
+        batch = np.concatenate(input_imgs, axis=0)
+        dtype = self.input_details[0]['dtype']
+        if (batch.dtype != dtype):
+            batch = batch.astype(dtype)
+
+        self._resize_input(batch.shape)
+        self.interpreter.set_tensor(self.input_details[0]['index'], batch)
+        self.interpreter.invoke()
+        if (self.params.task_type == 'detection'):
+            return self._shuffle_detection_results(batch.shape[2])
+        else:
+            return self._get_results()
+
+    def _resize_input(self, shape):
+        # Only reallocate when the batch size changes
+        if (shape[0] == self.input_details[0]['shape'][0]):
+            return
+
+        self.interpreter.resize_tensor_input(
+            self.input_details[0]['index'], shape)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self._allocate_results()
+
+    def _allocate_results(self):
+        self.output_tensors = [self.interpreter.tensor(detail['index'])
+                               for detail in self.output_details]
+        self.results = [np.empty(detail['shape'], dtype=detail['dtype'])
+                        for detail in self.output_details]
+
+    def _get_results(self):
+        # The views of the interpreter tensors must not outlive this call,
+        # the interpreter refuses to run while they are referenced
+        for result, tensor in zip(self.results, self.output_tensors):
+            np.copyto(result, tensor())
+
+        return [[result[i:i + 1] for result in self.results]
+                for i in range(self.results[0].shape[0])]
+
+    def _shuffle_detection_results(self, scale):
+        bounding_boxes, class_IDs, scores, size = self.results
+        tensors = [tensor() for tensor in self.output_tensors]
+
+        results = []
+        for i in range(bounding_boxes.shape[0]):
+            count = int(tensors[3][i])
+            np.multiply(tensors[0][i, 0:count], scale,
+                        out=bounding_boxes[i, 0:count])
+            np.copyto(class_IDs[i, 0:count], tensors[1][i, 0:count])
+            np.copyto(scores[i, 0:count], tensors[2][i, 0:count])
+            results.append((class_IDs[i:i + 1, 0:count],
+                            scores[i:i + 1, 0:count],
+                            bounding_boxes[i:i + 1, 0:count]))
+
+        return results
+
+
+@register_runtime('onnxrt')
+class onnxrt:
+    '''
+    Abstracts the ONNX Run Time on the CPU
+    Args:
+        params: The parsed model parameters
+        threads (int): The threads running each operator, if the intra
+            operator threads are not given
+        intra_op_threads (int): The threads running each operator, the
+            session intra_op_num_threads of the model by default
+        inter_op_threads (int): The threads running independent
+            operators in parallel, the session inter_op_num_threads of
+            the model by default
+    '''
+
+    # ONNX tensor types the pre-process can produce
+    input_types = {
+        'tensor(float)': np.float32,
+        'tensor(uint8)': np.uint8,
+        'tensor(int8)': np.int8,
+    }
+
+    def __init__(self, params, threads=None, intra_op_threads=None,
+                 inter_op_threads=None):
+        import onnxruntime
+
+        self.params = params
+
+        if (intra_op_threads is None):
+            intra_op_threads = threads
+        if (intra_op_threads is None):
+            intra_op_threads = getattr(params, 'intra_op_threads', None)
+        if (inter_op_threads is None):
+            inter_op_threads = getattr(params, 'inter_op_threads', None)
+
+        options = onnxruntime.SessionOptions()
+        if (intra_op_threads):
+            options.intra_op_num_threads = intra_op_threads
+        if (inter_op_threads):
+            options.inter_op_num_threads = inter_op_threads
+            if (inter_op_threads > 1):
+                options.execution_mode = \
+                    onnxruntime.ExecutionMode.ORT_PARALLEL
+
+        try:
+            self.session = onnxruntime.InferenceSession(
+                params.model_path, sess_options=options,
+                providers=['CPUExecutionProvider'])
+        except Exception as e:
+            raise RunTimeError("Unable to load ONNX model %s" %
+                               params.model_path) from e
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        if (model_input.type not in self.input_types):
+            raise RunTimeError("Unsupported input type %s" %
+                               model_input.type)
+        self.input_dtype = np.dtype(self.input_types[model_input.type])
+
+        batch = model_input.shape[0]
+        self.dynamic_batch = not isinstance(batch, int) or batch < 1
+
+    def get_input_type(self):
+        return self.input_dtype, (0.0, 0)
+
+    def run(self, input_img):
+        if (input_img.dtype != self.input_dtype):
+            input_img = input_img.astype(self.input_dtype)
+        results = self.session.run(None, {self.input_name: input_img})
+        if (self.params.task_type == 'detection'):
+            return self._shuffle_detection_results(results, input_img.shape)
         else:
             return results
 
-    def _shuffle_detection_results(self, results, scale):
-        bounding_boxes, class_IDs, scores, size = results
-        return (class_IDs[:, 0:int(size[0])], scores[:, 0:int(size[0])],
-                bounding_boxes[:, 0:int(size[0])] * scale)
+    def run_batch(self, input_imgs):
+        if not self.dynamic_batch:
+            return [self.run(input_img) for input_img in input_imgs]
+
+        batch = np.concatenate(input_imgs, axis=0)
+        if (batch.dtype != self.input_dtype):
+            batch = batch.astype(self.input_dtype)
+        results = self.session.run(None, {self.input_name: batch})
+        if (self.params.task_type == 'detection'):
+            return [self._shuffle_detection_results(
+                [result[i:i + 1] for result in results], batch.shape)
+                for i in range(batch.shape[0])]
+        else:
+            return [[result[i:i + 1] for result in results]
+                    for i in range(batch.shape[0])]
+
+    def _shuffle_detection_results(self, results, input_shape):
+        """
+        Split the detection outputs into class IDs, scores and boxes of
+        shapes (1, N), (1, N) and (1, N, 4). The outputs are either a
+        single (1, N, 6) tensor of boxes, scores and labels, the (1, N, 5)
+        boxes with scores and the (1, N) labels, or separate boxes,
+        labels and scores.
+        """
+        if (len(results) == 1):
+            detections = results[0].reshape(1, -1, results[0].shape[-1])
+            bounding_boxes = detections[..., 0:4]
+            scores = detections[..., 4]
+            class_IDs = detections[..., 5]
+        elif (len(results) == 2):
+            detections, class_IDs = sorted(
+                results, key=lambda result: -result.ndim)
+            detections = detections.reshape(1, -1, detections.shape[-1])
+            bounding_boxes = detections[..., 0:4]
+            scores = detections[..., 4]
+        elif (len(results) == 3):
+            boxes = [result for result in results if result.shape[-1] == 4]
+            others = [result for result in results if result.shape[-1] != 4]
+            if (len(boxes) != 1):
+                raise RunTimeError("Unsupported ONNX detection outputs")
+            bounding_boxes = boxes[0].reshape(1, -1, 4)
+            scores, class_IDs = sorted(
+                others, key=lambda result: np.issubdtype(
+                    result.dtype, np.integer))
+        else:
+            raise RunTimeError("Unsupported ONNX detection outputs")
+
+        class_IDs = class_IDs.reshape(1, -1)
+        scores = scores.reshape(1, -1)
+
+        if (getattr(self.params, 'normalized_detections', False)):
+            layout = self.params.data_layout
+            size = (input_shape[layout.index('W')],
+                    input_shape[layout.index('H')])
+            scale = np.empty(4, dtype=np.float32)
+            for coordinate in range(4):
+                scale[self.params.formatter.index(coordinate)] = \
+                    size[coordinate % 2]
+            bounding_boxes = bounding_boxes * scale
+
+        return class_IDs, scores, bounding_boxes
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+"""Compares the AI backends throughput on synthetic streams
+
+Run from the repository root:
+    python3 -m benchmarks.bench_backends -m /opt/model_zoo/<model>/
+"""
+
+from argparse import ArgumentParser
+import threading
+import time
+
+import numpy as np
+
+from rr.ai.ai_manager import AIBackend
+from rr.gstreamer.gst_media import GstUtils
+
+width = 320
+height = 240
+default_dimentions = 3
+
+
+class SyntheticMedia():
+    def __init__(self, name):
+        self._name = name
+
+    def get_name(self):
+        return self._name
+
+    def get_triggers(self):
+        return []
+
+    def get_roi(self):
+        return None
+
+
+class SyntheticImage():
+    """
+    Minimal stand-in of a GstImage holding a random RGB frame
+    """
+
+    def __init__(self, media, data, slot=None):
+        self._data = data
+        self._media = media
+        self._slot = slot
+
+        buffer = GstUtils.buffer_new_wrapped(self._data.tobytes())
+        self._sample = GstUtils.sample_new(buffer, None)
+
+    def get_width(self):
+        return width
+
+    def get_height(self):
+        return height
+
+    def get_format(self):
+        return "RGB"
+
+    def get_data(self):
+        return self._data.data
+
+    def get_sample(self):
+        return self._sample
+
+    def get_media(self):
+        return self._media
+
+    def get_slot(self):
+        return self._slot
+
+    def get_model_image(self):
+        return None
+
+    def get_timestamp(self):
+        return 0
+
+
+def random_frame():
+    return np.random.randint(
+        0, 256, (height, width, default_dimentions), dtype=np.uint8)
+
+
+def copy_to_ring(frame_ring, image):
+    """Copies the image to a ring slot, as the medias do
+
+    Waits for a free slot instead of dropping the image, so the benchmark
+    measures the throughput of the backend.
+    """
+
+    if frame_ring is None:
+        return image
+
+    slot = frame_ring.acquire()
+    while slot is None:
+        time.sleep(0.001)
+        slot = frame_ring.acquire()
+
+    frame_ring.write(slot, image.get_data())
+
+    return SyntheticImage(image.get_media(), image._data, slot)
+
+
+class OnNewPredictionCounter():
+    def __init__(self, expected):
+        self._expected = expected
+        self._count = 0
+        self._mutex = threading.Lock()
+        self.done = threading.Event()
+
+    def __call__(self, prediction, image, media):
+        with self._mutex:
+            self._count += 1
+            if self._count == self._expected:
+                self.done.set()
+
+
+def run_streams(backend, model, streams, frames):
+    """Feeds every synthetic stream from its own thread, as appsink does
+
+    Returns
+    -------
+    The aggregated frames per second
+    """
+
+    ai_manager = AIBackend.make(backend, model, width, height)
+
+    images = [SyntheticImage(SyntheticMedia("stream%d" % i), random_frame())
+              for i in range(streams)]
+    frame_ring = ai_manager.get_frame_ring()
+
+    # Warm up the runtimes, and spawn the workers, before measuring
+    warmup = OnNewPredictionCounter(streams)
+    ai_manager.install_callback(warmup)
+    for image in images:
+        ai_manager.process_image(
+            copy_to_ring(frame_ring, image), model, width, height)
+    warmup.done.wait()
+
+    counter = OnNewPredictionCounter(streams * frames)
+    ai_manager.install_callback(counter)
+
+    def feed(image):
+        for frame in range(frames):
+            ai_manager.process_image(
+                copy_to_ring(frame_ring, image), model, width, height)
+
+    threads = [threading.Thread(target=feed, args=(image,))
+               for image in images]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.done.wait()
+    elapsed = time.monotonic() - start
+
+    ai_manager.stop()
+
+    return streams * frames / elapsed
+
+
+def parse_args():
+    parser = ArgumentParser(description='AI backends benchmark')
+    parser.add_argument('-m', dest='model', required=True,
+                        help='directory of the detection model.')
+    parser.add_argument('-w', dest='workers', default=4, type=int,
+                        help='number of workers of each backend.')
+    parser.add_argument('-n', dest='frames', default=50, type=int,
+                        help='number of frames per stream.')
+    parser.add_argument('-s', dest='streams', default=[4, 8, 16], type=int,
+                        nargs='+', help='number of synthetic streams.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    backends = [
+        {'type': 'pool', 'workers': args.workers},
+        {'type': 'process', 'workers': args.workers},
+    ]
+
+    print("%-10s %8s %10s" % ("backend", "streams", "fps"))
+    for streams in args.streams:
+        for backend in backends:
+            fps = run_streams(backend, args.model, streams, args.frames)
+            print("%-10s %8d %10.1f" % (backend['type'], streams, fps))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+"""Compares the center crop taken as a view before the resize against
+resizing the whole frame and cropping the result
+
+Run from the repository root:
+    python3 -m benchmarks.bench_crop -m /opt/model_zoo/<model>/ -c 256
+"""
+
+from argparse import ArgumentParser
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+from TI.preprocess import PreProcessDetection
+
+width = 1280
+height = 720
+default_dimentions = 3
+
+
+def load_preprocess(model, crop):
+    """Load the preprocess of the model, with the crop replaced if given
+
+    Only the model parameters are read, so a copy of them is enough
+    """
+
+    if crop is None:
+        return PreProcessDetection(model)
+
+    with open(os.path.join(model, "param.yaml"), "r") as file:
+        yaml_params = yaml.safe_load(file)
+    yaml_params['preprocess']['crop'] = crop
+
+    with tempfile.TemporaryDirectory() as model_copy:
+        with open(os.path.join(model_copy, "param.yaml"), "w") as file:
+            yaml.safe_dump(yaml_params, file)
+
+        return PreProcessDetection(model_copy + os.sep)
+
+
+def resize_then_crop(preprocess, img):
+    """Resize the whole frame and copy the center of the result
+    """
+
+    resize_width, resize_height = preprocess.params.resize
+    crop_width, crop_height = preprocess.size
+    resized = cv2.resize(img, (resize_width, resize_height),
+                         interpolation=cv2.INTER_LINEAR)
+
+    x0 = (resize_width - crop_width) // 2
+    y0 = (resize_height - crop_height) // 2
+
+    return np.ascontiguousarray(
+        resized[y0:y0 + crop_height, x0:x0 + crop_width])
+
+
+def crop_then_resize(preprocess, img, out):
+    """Resize only the view of the center of the frame
+    """
+
+    cropped = preprocess.get_cropped_image(img)
+
+    return cv2.resize(cropped, preprocess.size, dst=out,
+                      interpolation=cv2.INTER_LINEAR)
+
+
+def measure(function, frames):
+    function()
+
+    start = time.monotonic()
+    for frame in range(frames):
+        function()
+
+    return 1000 * (time.monotonic() - start) / frames
+
+
+def parse_args():
+    parser = ArgumentParser(description='Detection center crop benchmark')
+    parser.add_argument('-m', dest='model', required=True,
+                        help='directory of the detection model.')
+    parser.add_argument('-c', dest='crop', default=None, type=int,
+                        help='crop size replacing the one of the model.')
+    parser.add_argument('-n', dest='frames', default=500, type=int,
+                        help='number of frames to crop.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    preprocess = load_preprocess(args.model, args.crop)
+    if preprocess.crop is None:
+        raise RuntimeError("The model does not crop, select a crop size")
+
+    # Smoothed noise, so both sampling grids see similar neighbourhoods
+    img = np.random.randint(0, 256, (height, width, default_dimentions),
+                            dtype=np.uint8)
+    img = cv2.GaussianBlur(img, (0, 0), 4)
+    crop_width, crop_height = preprocess.size
+    out = np.empty((crop_height, crop_width, default_dimentions),
+                   dtype=np.uint8)
+
+    expected = resize_then_crop(preprocess, img)
+    result = crop_then_resize(preprocess, img, out)
+    difference = np.abs(expected.astype(np.int16) - result).mean()
+
+    cropped = preprocess.get_cropped_image(img)
+    implementations = [
+        ("resize+crop", lambda: resize_then_crop(preprocess, img),
+         img.shape[0] * img.shape[1]),
+        ("crop+resize", lambda: crop_then_resize(preprocess, img, out),
+         cropped.shape[0] * cropped.shape[1]),
+    ]
+
+    print("%-12s %12s %16s" % ("crop", "ms/frame", "resized px/frame"))
+    for name, function, pixels in implementations:
+        ms = measure(function, args.frames)
+        print("%-12s %12.3f %16d" % (name, ms, pixels))
+
+    print("Mean absolute difference: %.3f" % difference)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+"""Compares the detection preprocess against the original step by step
+implementation
+
+Run from the repository root:
+    python3 -m benchmarks.bench_preprocess -m /opt/model_zoo/<model>/
+"""
+
+from argparse import ArgumentParser
+import time
+import tracemalloc
+
+import numpy as np
+
+from TI.preprocess import PreProcessDetection
+
+width = 320
+height = 240
+default_dimentions = 3
+
+
+def preprocess_reference(preprocess, img):
+    """The original preprocess, allocating on every step
+    """
+
+    params = preprocess.params
+
+    img = preprocess.resize(img, *params.resize)
+    if (not params.reverse_channels):
+        img = preprocess.channel_swap_bgr_to_rgb(img)
+    img = preprocess.change_format(img, 'HWC', params.data_layout)
+    img = preprocess.subtract_mean_and_scale(
+        img,
+        params.mean,
+        params.scale,
+        params.data_layout.index('C'))
+
+    return img
+
+
+def measure(function, img, frames):
+    """Times the function and traces its steady state allocations
+
+    Returns
+    -------
+    A tuple with the milliseconds and the allocated bytes per frame
+    """
+
+    # Warm up, so the preallocated buffers exist before measuring
+    function(img)
+
+    start = time.monotonic()
+    for frame in range(frames):
+        function(img)
+    elapsed = time.monotonic() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    function(img)
+    allocated = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return 1000 * elapsed / frames, allocated
+
+
+def parse_args():
+    parser = ArgumentParser(description='Detection preprocess benchmark')
+    parser.add_argument('-m', dest='model', required=True,
+                        help='directory of the detection model.')
+    parser.add_argument('-n', dest='frames', default=500, type=int,
+                        help='number of frames to preprocess.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    preprocess = PreProcessDetection(args.model)
+    img = np.random.randint(0, 256, (height, width, default_dimentions),
+                            dtype=np.uint8)
+
+    arithmetic = PreProcessDetection(args.model, 'arithmetic')
+
+    expected = preprocess_reference(preprocess, img)
+    for candidate in [preprocess, arithmetic]:
+        result = candidate.get_preprocessed_image(img)
+        if not np.allclose(expected, result, atol=1e-5):
+            raise RuntimeError(
+                "Preprocess results differ from the reference")
+
+    # A quantized model taking the normalized [-1, 1] range as uint8
+    quantized = PreProcessDetection(args.model)
+    quantized.set_input_type(np.uint8, (1 / 128, 128))
+
+    implementations = [
+        ("reference", lambda img: preprocess_reference(preprocess, img)),
+        ("arithmetic", arithmetic.get_preprocessed_image),
+        ("lut", preprocess.get_preprocessed_image),
+        ("uint8", quantized.get_preprocessed_image),
+    ]
+
+    print("%-10s %12s %14s" % ("preprocess", "ms/frame", "bytes/frame"))
+    for name, function in implementations:
+        ms, allocated = measure(function, img, args.frames)
+        print("%-10s %12.3f %14d" % (name, ms, allocated))
+
+
+if __name__ == '__main__':
+    main()
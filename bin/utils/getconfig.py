@@ -10,8 +10,13 @@ import logging
 import numpy as np
 import os
 import sys
+import threading
 import yaml
 
+# The parsed parameters of every model directory loaded by the process
+_model_params = {}
+_model_params_mutex = threading.Lock()
+
 
 def read_file(model_dir):
     try:
@@ -42,9 +47,15 @@ class GetConfigYaml:
 
         # Get the preprocess parameters
         params.resize = yaml_params['preprocess']['resize']
-        crop = yaml_params['preprocess']['crop']
+        # The crop is a single size or a list ordered like the resize
+        crop = yaml_params['preprocess'].get('crop')
         if (isinstance(crop, int)):
             params.crop = (crop, crop)
+        elif (isinstance(crop, list) and len(crop) == 2):
+            params.crop = tuple(crop)
+        elif (crop is not None):
+            logging.error("Unsupported crop %s" % (crop,))
+            sys.exit(1)
 
         params.mean = yaml_params['preprocess']['mean']
         params.scale = yaml_params['preprocess']['scale']
@@ -61,6 +72,10 @@ class GetConfigYaml:
                 yaml_params['session']['model_path']
         params.artifacts = model_dir + \
             yaml_params['session']['artifacts_folder']
+        params.intra_op_threads = yaml_params['session'].get(
+            'intra_op_num_threads')
+        params.inter_op_threads = yaml_params['session'].get(
+            'inter_op_num_threads')
 
         # Get the postprocess parameters
         params.formatter = (0, 1, 2, 3)
@@ -68,6 +83,8 @@ class GetConfigYaml:
             formatter = yaml_params['postprocess']['formatter']
             if (formatter is not None):
                 params.formatter = formatter['src_indices']
+        params.normalized_detections = yaml_params['postprocess'].get(
+            'normalized_detections', False)
 
         # Get the dataset parameters
         params.dataset = yaml_params['input_dataset']['name']
@@ -80,3 +97,21 @@ class GetConfigYaml:
                 params.label_offset = yaml_params['metric']['label_offset_pred']
 
         return params
+
+
+def get_model_params(model_dir):
+    """
+    Get the parameters of a model, parsing its YAML file only the first
+    time the model directory is loaded by the process
+    The parameters are shared by all the callers and must not be modified
+    Args:
+        model_dir (string): The model directory
+    """
+    key = os.path.abspath(model_dir)
+    with _model_params_mutex:
+        params = _model_params.get(key)
+        if params is None:
+            params = GetConfigYaml(model_dir).params
+            _model_params[key] = params
+
+    return params
@@ -5,8 +5,11 @@
 
 import copy
 
+import numpy as np
+
 from rr.actions.log_event import LogEvent
 from rr.actions.record_event import RecordEvent
+from rr.ai.detections import Detections
 
 
 class FilterError(RuntimeError):
@@ -23,6 +26,12 @@ class Filter:
     def apply(self, prediction):
         self._is_triggered = False
 
+        if isinstance(prediction, Detections):
+            matches = np.isin(prediction.labels, self._labels)
+            matches &= prediction.scores >= self._probability
+            self._is_triggered = bool(matches.any())
+            return
+
         for instance in prediction["instances"]:
             for label in instance["labels"]:
                 if label["label"] in self._labels and label["probability"] >= self._probability:
@@ -6,6 +6,8 @@
 import csv
 import threading
 
+from rr.ai.detections import Detections
+
 
 class LogEventError(RuntimeError):
     pass
@@ -114,13 +116,28 @@ class LogEvent():
             The media object
         image : image obj
             The image object
-        inf_results : dict
+        inf_results : Detections or dict
             The inference results
         """
 
         media_name = media.get_name()
         image_time = image.get_timestamp()
 
+        if isinstance(inf_results, Detections):
+            for label, score, box in zip(inf_results.labels,
+                                         inf_results.scores,
+                                         inf_results.boxes):
+                self._writer.writerow({'name': media_name,
+                                       'time': image_time,
+                                       'label': label,
+                                       'probability': score,
+                                       'bbox-x': box[0],
+                                       'bbox-y': box[1],
+                                       'bbox-width': box[2],
+                                       'bbox-height': box[3]})
+            self._file.flush()
+            return
+
         for instance in inf_results['instances']:
             label_max = find_max_probability(instance['labels'])
             self._writer.writerow({'name': media_name,
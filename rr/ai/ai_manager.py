@@ -4,42 +4,32 @@
 #  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
 #           Marisol Zeledon <marisol.zeledon@ridgerun.com>
 
+from concurrent.futures import ProcessPoolExecutor
 import cv2
+import logging
+import multiprocessing
 import numpy as np
+import queue
 import threading
+import time
 
 from bin.utils.imagehandler import ImageHandler
+from rr.ai import ai_worker
+from rr.ai.detections import Detections
+from rr.ai.ai_worker import format_inf_results
+from rr.ai.ai_worker import map_frame_results
+from rr.ai.ai_worker import preprocess_frame
+from rr.ai.runtime_pool import get_runtime_pool
+from rr.ai.stream_order import StreamOrder
+from rr.gstreamer.frame_ring import FrameRing
 from rr.gstreamer.gst_media import GstImage
 from rr.gstreamer.gst_media import GstUtils
 from TI.postprocess import PostProcessDetection
 from TI.preprocess import PreProcessDetection
-from TI.runtimes import *
 
 
-def format_inf_results(classname, inference_results):
-    dict_instances = {}
-
-    class_IDs, scores, bounding_boxes = inference_results
-
-    keys = ["x", "y", "width", "height"]
-    instances = []
-    for i, score in enumerate(np.squeeze(scores, axis=0)):
-        dict_labels = {}
-        prob = scores[0][i]
-
-        fieldnames = {
-            'label': classname,
-            'probability': prob
-        }
-
-        dict_labels.update({"labels": [fieldnames]})
-        dict_labels.update({"bbox": dict(zip(keys, bounding_boxes[0][i]))})
-
-        instances.append(dict_labels)
-
-    dict_instances.update({"instances": instances})
-
-    return dict_instances
+# Weight of the newest sample in the smoothed latencies
+latency_smoothing = 0.1
 
 
 class AIManagerError(RuntimeError):
@@ -58,8 +48,25 @@ class AIManager():
     preprocess_obj : PreProcessDetection object
         The PreProcessDetection object
 
+    tiler : Tiler
+        The tiler splitting the images, None to infer whole images
+
+    score_floor : float
+        The score below which the detections are dropped, None to keep
+        them all
+
+    headless : bool
+        Whether the original images are delivered, without drawing the
+        overlay nor creating new images
+
+    inference_obj : RunTimePool
+        The run time instances inferring the images
+
     Methods
     -------
+    set_runtime(inference_obj : RunTimePool)
+        Setter for the run time instances inferring the images
+
     preprocess_detection(image : image input)
         Preprocess the image according to the model
 
@@ -74,19 +81,44 @@ class AIManager():
             self,
             model,
             disp_width,
-            disp_height):
+            disp_height,
+            load_runtime=True,
+            tiler=None,
+            instances=1,
+            threads=None,
+            score_floor=None,
+            headless=False):
         """
         Constructor for the AI Manager object
+
+        The runtime is not loaded if load_runtime is False, for managers
+        that run the inference somewhere else or share the run time of
+        another manager. Otherwise it uses the run time pool of the model
+        with the given number of instances and threads, loaded by the
+        first manager that needs it.
         """
 
+        self.tiler = tiler
+        self.score_floor = score_floor
+        self.headless = headless
         self.preprocess_obj = PreProcessDetection(model)
 
-        RunTime = eval(self.preprocess_obj.params.run_time)
-        self.inference_obj = RunTime(self.preprocess_obj.params)
+        self.inference_obj = None
+        if load_runtime:
+            self.set_runtime(get_runtime_pool(model, instances, threads))
 
         self.postprocess_obj = PostProcessDetection(
             model, disp_width, disp_height)
 
+    def set_runtime(self, inference_obj):
+        """Setter for the run time instances inferring the images
+
+        The preprocess produces the input type they expect
+        """
+
+        self.inference_obj = inference_obj
+        self.preprocess_obj.set_input_type(*inference_obj.get_input_type())
+
     def preprocess_detection(self, image):
         """Preprocess the image
 
@@ -105,7 +137,76 @@ class AIManager():
 
         return img_preprocessed
 
-    def run_inference(self, image):
+    def preprocess_frame(self, image, img, roi, owned=False):
+        """Preprocess the image into the model inputs to infer, one per
+        tile or a single one without tiling
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to preprocess. If the media scaled a copy to the model
+            input size, the copy is used unless a region or tiles are
+            inferred.
+        img : ndarray
+            The image data as an array
+        roi : RegionOfInterest
+            The region to preprocess, None for the whole image
+        owned : bool
+            Whether the inputs are kept after the next preprocess of the
+            calling thread, for instance in a queue
+        """
+
+        model_image = image.get_model_image()
+        if model_image is not None and roi is None and self.tiler is None:
+            img = ImageHandler.buffer_to_np_array(
+                model_image.get_data(),
+                model_image.get_width(),
+                model_image.get_height())
+
+        return preprocess_frame(
+            self.preprocess_obj, img, roi, self.tiler, owned)
+
+    def run_frame_inference(self, inputs, owned=False):
+        """Apply inference to the model inputs of an image
+
+        Parameters
+        ----------
+        inputs : list
+            The model inputs given by preprocess_frame
+        owned : bool
+            Whether the results are kept after the next inference, for
+            instance in a queue. Otherwise they may be left in the result
+            buffers of the runtime.
+
+        Returns
+        -------
+        A list with the inference results of each input
+        """
+
+        if len(inputs) == 1:
+            return [self.run_inference(inputs[0], owned)]
+
+        return self.run_batch_inference(inputs, owned)
+
+    def map_frame_results(self, img, roi, results):
+        """Merge the inference results of the model inputs of an image into
+        the inference results of the whole image
+
+        Parameters
+        ----------
+        img : ndarray
+            The whole image
+        roi : RegionOfInterest
+            The inferred region, None for the whole image
+        results : list
+            The inference results of each model input
+        """
+
+        return map_frame_results(
+            self.postprocess_obj, img, results, roi, self.tiler,
+            self.score_floor)
+
+    def run_inference(self, image, owned=False):
         """Apply inference to the image
 
         Parameters
@@ -113,6 +214,9 @@ class AIManager():
         image : image input
             The image to preprocess
 
+        owned : bool
+            Whether the results are kept after the next inference
+
         inference_model : str
             The inference model to apply
 
@@ -125,11 +229,30 @@ class AIManager():
             If couldn't run the inference to the image
         """
 
-        results = self.inference_obj.run(image)
+        results = self.inference_obj.run(image, owned)
+
+        return results
+
+    def run_batch_inference(self, images, owned=False):
+        """Apply inference to a batch of images
+
+        Parameters
+        ----------
+        images : list
+            The preprocessed images to infer
+        owned : bool
+            Whether the results are kept after the next inference
+
+        Returns
+        -------
+        A list with the inference results of each image
+        """
+
+        results = self.inference_obj.run_batch(images, owned)
 
         return results
 
-    def postprocess_detection(self, image, results):
+    def postprocess_detection(self, image, results, labels=None):
         """Postprocess the image
 
         Parameters
@@ -137,6 +260,9 @@ class AIManager():
         image : image input
             The image to postprocess
 
+        labels : ndarray
+            The label of every detection, looked up if not given
+
         inference_model : str
             The inference model to apply
 
@@ -147,12 +273,85 @@ class AIManager():
         """
 
         img_postprocessed = self.postprocess_obj.get_postprocessed_image(
-            image, results)
+            image, results, labels)
 
         return img_postprocessed
 
-    def get_classname(self):
-        return self.postprocess_obj.get_classname()
+    def get_labels(self, results):
+        return self.postprocess_obj.get_labels(results[0])
+
+    def process_frame(self, image, owned=False):
+        """Run the complete AI processing over an image
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to process
+        owned : bool
+            Whether the results are kept after the next inference, for
+            instance until the image is delivered. Otherwise they may be
+            left in the result buffers of the runtime.
+
+        Returns
+        -------
+        A tuple with the raw inference results, the formatted inference
+        results and a new GstImage with the postprocessed image
+        """
+
+        img = ImageHandler.buffer_to_np_array(
+            image.get_data(), image.get_width(), image.get_height())
+        roi = image.get_media().get_roi()
+
+        inputs = self.preprocess_frame(image, img, roi)
+
+        inference_results = self.map_frame_results(
+            img, roi, self.run_frame_inference(inputs, owned))
+
+        inference_results2, image2 = self.postprocess_frame(
+            image, img, inference_results)
+
+        return inference_results, inference_results2, image2
+
+    def postprocess_frame(self, image, img, inference_results):
+        """Postprocess an image from its inference results
+
+        Parameters
+        ----------
+        image : GstImage
+            The original image
+        img : ndarray
+            The original image data as an array
+        inference_results : run_inference return
+            The inference results for the image
+
+        Returns
+        -------
+        A tuple with the formatted inference results and a new GstImage
+        with the postprocessed image, or the original image if headless
+        """
+
+        labels = self.get_labels(inference_results)
+        inference_results2 = format_inf_results(
+            labels, inference_results, image.get_media().get_name(),
+            image.get_timestamp())
+
+        if self.headless:
+            return inference_results2, image
+
+        image_postprocessed = self.postprocess_detection(
+            img, inference_results, labels)
+
+        # Create GstBuffer from postprocess image
+        h, w, c = image_postprocessed.shape
+        buffer = GstUtils.buffer_new_wrapped(image_postprocessed.tobytes())
+
+        # Create GstImage
+        sample = image.get_sample()
+        caps = sample.get_caps()
+        sample2 = GstUtils.sample_new(buffer, caps)
+        image2 = GstImage(w, h, "RGB", sample2, image.get_media())
+
+        return inference_results2, image2
 
 
 class AIManagerOnNewImage(AIManager):
@@ -161,22 +360,46 @@ class AIManagerOnNewImage(AIManager):
 
     Attributes
     ----------
+    _last_results : dict
+        A private dictionary with the latest raw inference results of each
+        stream
+    _latency : dict
+        A private dictionary with the smoothed processing latency of each
+        stream
+    _order : StreamOrder
+        A private order delivering the images of each stream in the order
+        they entered
 
     Methods
     -------
-
+    process_image(image : GstImage, model : str, disp_width : int, disp_height : int)
+        Process the image and deliver the prediction
+    forward_image(image : GstImage)
+        Deliver the image reusing the latest prediction of its stream
+    get_latency(media_name : str)
+        Getter for the smoothed processing latency of a stream
     """
 
     def __init__(
             self,
             model,
             disp_width,
-            disp_height):
+            disp_height,
+            load_runtime=True,
+            tiler=None,
+            instances=1,
+            threads=None,
+            score_floor=None,
+            headless=False):
 
-        super().__init__(model, disp_width, disp_height)
+        super().__init__(model, disp_width, disp_height, load_runtime, tiler,
+                         instances, threads, score_floor, headless)
 
         self._mutex = threading.Lock()
         self.on_new_prediction_cb_ = None
+        self._last_results = {}
+        self._latency = {}
+        self._order = StreamOrder()
 
     def install_callback(self, on_new_prediction_cb_):
         self._mutex.acquire()
@@ -197,33 +420,801 @@ class AIManagerOnNewImage(AIManager):
             If couldn't get the image
         """
 
-        self._mutex.acquire()
-        gst_media = image.get_media()
+        start = time.monotonic()
+        self._order.enter(image)
+
+        try:
+            # The results must not be left in the runtime buffers, the
+            # next image may be inferred as soon as the mutex is released
+            with self._mutex:
+                inference_results, inference_results2, image2 = \
+                    self.process_frame(image, owned=True)
+        except Exception:
+            self._order.leave(image)
+            raise
+
+        self._on_prediction(
+            image, start, inference_results, inference_results2, image2)
+
+    def _on_prediction(self, image, start, inference_results,
+                       inference_results2, image2):
+        media = image.get_media()
+        media_name = media.get_name()
+
+        latency = time.monotonic() - start
+
+        # The results are owned, so they are kept for the skipped images
+        # past the next inference
+        def deliver():
+            self._last_results[media_name] = inference_results
+
+            last_latency = self._latency.get(media_name, latency)
+            self._latency[media_name] = last_latency + \
+                latency_smoothing * (latency - last_latency)
+
+            self.on_new_prediction_cb_(inference_results2, image2, media)
+
+        # Images finishing before a previous image of their stream wait
+        # for it
+        self._order.leave(image, deliver)
+
+    def forward_image(self, image):
+        """Deliver the image without inference, reusing the latest
+        prediction of its stream
+
+        The image keeps its turn in the stream, so it is delivered after
+        the images of the stream still being processed, with the latest
+        prediction at that time.
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to deliver. The latest boxes of its stream are drawn
+            on it.
+        """
+
+        self._order.enter(image)
+        self._order.leave(image, lambda: self._deliver_forwarded(image))
+
+    def _deliver_forwarded(self, image):
+        media = image.get_media()
+        inference_results = self._last_results.get(media.get_name())
+
+        if inference_results is None:
+            self.on_new_prediction_cb_(
+                Detections.empty(media.get_name(), image.get_timestamp()),
+                image, media)
+            return
+
+        # Headless managers do not draw on the image
+        img = None
+        if not self.headless:
+            img = ImageHandler.buffer_to_np_array(
+                image.get_data(), image.get_width(), image.get_height())
+
+        inference_results2, image2 = self.postprocess_frame(
+            image, img, inference_results)
+
+        self.on_new_prediction_cb_(inference_results2, image2, media)
+
+    def get_latency(self, media_name):
+        """Getter for the smoothed time, in seconds, between an image of
+        the stream entering the AI manager and its prediction, 0 if the
+        stream has no predictions yet
+        """
+
+        return self._latency.get(media_name, 0.0)
+
+    def get_frame_ring(self):
+        """Getter for the shared memory ring the frames should be copied
+        to, None if the AI manager does not use one
+        """
+
+        return None
+
+    def stop(self):
+        """Release the resources held by the AI manager
+        """
+
+        pass
+
+
+class AIManagerWorkerPool(AIManagerOnNewImage):
+    """
+    Class that performs the AI processing on a pool of inference workers
+
+    Every worker owns an AI manager with its preprocess and postprocess,
+    and checks out one of the run time instances of the pool for each
+    inference, so frames from all the streams are processed in parallel.
+    The predictions of each stream are still delivered in the order its
+    frames entered the pool.
+
+    Attributes
+    ----------
+    _queue : Queue
+        A private bounded queue with the images pending to be processed
+    _threads : list
+        A private list with the worker threads
+
+    Methods
+    -------
+    process_image(image : GstImage, model : str, disp_width : int, disp_height : int)
+        Queue the image to be processed by the next available worker
+    stop()
+        Stop and join the worker threads
+    """
+
+    def __init__(
+            self,
+            model,
+            disp_width,
+            disp_height,
+            workers,
+            queue_depth,
+            tiler=None,
+            threads=None,
+            score_floor=None,
+            headless=False):
+
+        if workers < 1:
+            raise AIManagerError("Invalid number of workers")
+
+        if queue_depth < 1:
+            raise AIManagerError("Invalid queue depth")
+
+        # One run time instance per worker
+        super().__init__(model, disp_width, disp_height, tiler=tiler,
+                         instances=workers, threads=threads,
+                         score_floor=score_floor, headless=headless)
+
+        self._queue = queue.Queue(maxsize=queue_depth)
+
+        # The pool itself acts as the first worker
+        ai_managers = [self]
+        for i in range(workers - 1):
+            ai_manager = AIManager(model, disp_width, disp_height,
+                                   load_runtime=False, tiler=tiler,
+                                   score_floor=score_floor,
+                                   headless=headless)
+            ai_manager.set_runtime(self.inference_obj)
+            ai_managers.append(ai_manager)
+
+        self._threads = []
+        for ai_manager in ai_managers:
+            thread = threading.Thread(
+                target=self._worker, args=(ai_manager,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def process_image(self, image, model, disp_width, disp_height):
+        """Queue the image to be processed by the worker pool
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to process. Blocks the caller if all the workers are
+            busy and the queue is full.
+        """
+
+        self._order.enter(image)
+        self._queue.put((image, time.monotonic()))
+
+    def _worker(self, ai_manager):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            image, start = item
+
+            try:
+                # The image may wait for the previous images of its
+                # stream, past the next inference of this worker
+                self._on_prediction(
+                    image, start,
+                    *ai_manager.process_frame(image, owned=True))
+            except Exception as e:
+                logging.error("Unable to process image: %s" % (e))
+                self._order.leave(image)
+
+    def stop(self):
+        """Stop and join the worker threads
+        """
+
+        for thread in self._threads:
+            self._queue.put(None)
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+
+
+class AIManagerBatch(AIManagerOnNewImage):
+    """
+    Class that performs the AI processing in batches collected from all the
+    streams
+
+    Images are preprocessed on the stream threads and queued. A batching
+    thread collects them until either the maximum batch size or the maximum
+    wait time is reached, runs a single inference over the batch and
+    scatters the results back to each stream. With tiling, all the tiles of
+    the collected images are inferred in the same batch.
+
+    Attributes
+    ----------
+    _max_batch_size : int
+        A private maximum number of images per batch
+    _max_batch_wait : float
+        A private maximum time in seconds to wait for a batch to fill
+    _queue : Queue
+        A private bounded queue with the preprocessed images
+
+    Methods
+    -------
+    process_image(image : GstImage, model : str, disp_width : int, disp_height : int)
+        Preprocess the image and queue it for the next batch
+    get_occupancy()
+        Getter for the average batch occupancy
+    stop()
+        Stop and join the batching thread
+    """
+
+    def __init__(
+            self,
+            model,
+            disp_width,
+            disp_height,
+            max_batch_size,
+            max_batch_wait,
+            queue_depth,
+            tiler=None,
+            threads=None,
+            score_floor=None,
+            headless=False):
+
+        if max_batch_size < 1:
+            raise AIManagerError("Invalid maximum batch size")
+
+        if max_batch_wait < 0:
+            raise AIManagerError("Invalid maximum batch wait")
+
+        if queue_depth < 1:
+            raise AIManagerError("Invalid queue depth")
+
+        super().__init__(model, disp_width, disp_height, tiler=tiler,
+                         threads=threads, score_floor=score_floor,
+                         headless=headless)
+
+        self._max_batch_size = max_batch_size
+        self._max_batch_wait = max_batch_wait
+        self._queue = queue.Queue(maxsize=queue_depth)
+
+        self._batches = 0
+        self._batched_images = 0
+
+        self._thread = threading.Thread(target=self._batcher, daemon=True)
+        self._thread.start()
+
+    def process_image(self, image, model, disp_width, disp_height):
+        """Preprocess the image and queue it for the next batch
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to process
+        """
+
+        start = time.monotonic()
+        self._order.enter(image)
+
+        try:
+            img = ImageHandler.buffer_to_np_array(
+                image.get_data(), image.get_width(), image.get_height())
+
+            inputs = self.preprocess_frame(
+                image, img, image.get_media().get_roi(), owned=True)
+        except Exception:
+            self._order.leave(image)
+            raise
+
+        self._queue.put((image, img, inputs, start))
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self._max_batch_wait
+
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if item is None:
+                # Finish the pending batch before stopping
+                self._queue.put(None)
+                break
+
+            batch.append(item)
+
+        return batch
+
+    def _batcher(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            self._batches += 1
+            self._batched_images += len(batch)
+            logging.debug("AI batch occupancy: %d/%d" %
+                          (len(batch), self._max_batch_size))
+
+            try:
+                results = self.run_frame_inference(
+                    [inputs for item in batch for inputs in item[2]],
+                    owned=True)
+
+                for image, img, inputs, start in batch:
+                    inference_results = self.map_frame_results(
+                        img,
+                        image.get_media().get_roi(),
+                        results[:len(inputs)])
+                    results = results[len(inputs):]
+
+                    inference_results2, image2 = self.postprocess_frame(
+                        image, img, inference_results)
+                    self._on_prediction(
+                        image, start, inference_results, inference_results2,
+                        image2)
+            except Exception as e:
+                logging.error("Unable to process batch: %s" % (e))
+
+                # The images already delivered left the order before
+                for item in batch:
+                    self._order.leave(item[0])
+
+    def get_occupancy(self):
+        """Getter for the average batch occupancy
+
+        Returns
+        -------
+        The average fraction of the maximum batch size used by each batch
+        """
+
+        if 0 == self._batches:
+            return 0.0
+
+        return self._batched_images / (self._batches * self._max_batch_size)
+
+    def stop(self):
+        """Stop and join the batching thread
+        """
+
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        logging.info("AI batches: %d, average occupancy: %.2f" %
+                     (self._batches, self.get_occupancy()))
+
+
+class AIManagerPipeline(AIManagerOnNewImage):
+    """
+    Class that performs the AI processing as a pipeline of stages
+
+    Preprocess, inference and postprocess run each on its own thread,
+    connected by bounded queues, so different images are processed by
+    different stages at the same time. Each stage has a single thread, so
+    the images leave the pipeline in the same order they entered it.
+
+    Attributes
+    ----------
+    _queues : list
+        A private list with the bounded queues feeding each stage
+    _threads : list
+        A private list with the stage threads
+
+    Methods
+    -------
+    process_image(image : GstImage, model : str, disp_width : int, disp_height : int)
+        Queue the image in the first stage of the pipeline
+    stop()
+        Drain and join the stage threads
+    """
+
+    def __init__(
+            self,
+            model,
+            disp_width,
+            disp_height,
+            queue_depth,
+            tiler=None,
+            threads=None,
+            score_floor=None,
+            headless=False):
+
+        if queue_depth < 1:
+            raise AIManagerError("Invalid queue depth")
+
+        super().__init__(model, disp_width, disp_height, tiler=tiler,
+                         threads=threads, score_floor=score_floor,
+                         headless=headless)
+
+        stages = [self._preprocess_stage,
+                  self._inference_stage,
+                  self._postprocess_stage]
+
+        self._queues = [queue.Queue(maxsize=queue_depth) for stage in stages]
+        self._queues.append(None)
+
+        self._threads = []
+        for i, stage in enumerate(stages):
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(stage, self._queues[i], self._queues[i + 1]),
+                daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def process_image(self, image, model, disp_width, disp_height):
+        """Queue the image in the first stage of the pipeline
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to process. Blocks the caller if the first stage
+            queue is full.
+        """
+
+        self._order.enter(image)
+        self._queues[0].put((image, time.monotonic()))
+
+    def _run_stage(self, stage, in_queue, out_queue):
+        while True:
+            item = in_queue.get()
+            if item is None:
+                if out_queue is not None:
+                    out_queue.put(None)
+                return
+
+            try:
+                item = stage(item)
+            except Exception as e:
+                logging.error("Unable to process image: %s" % (e))
+                self._order.leave(item[0])
+                continue
+
+            if out_queue is not None:
+                out_queue.put(item)
+
+    def _preprocess_stage(self, item):
+        image, start = item
 
         img = ImageHandler.buffer_to_np_array(
             image.get_data(), image.get_width(), image.get_height())
 
-        image_preprocessed = self.preprocess_detection(img)
+        roi = image.get_media().get_roi()
 
-        inference_results = self.run_inference(image_preprocessed)
-        image_postprocessed = self.postprocess_detection(
-            img, inference_results)
+        return image, start, img, roi, self.preprocess_frame(
+            image, img, roi, owned=True)
 
-        # Create GstBuffer from postprocess image
-        h, w, c = image_postprocessed.shape
-        buffer = GstUtils.buffer_new_wrapped(image_postprocessed.tobytes())
+    def _inference_stage(self, item):
+        image, start, img, roi, inputs = item
 
-        # Create GstImage
-        sample = image.get_sample()
-        caps = sample.get_caps()
-        sample2 = GstUtils.sample_new(buffer, caps)
-        image2 = GstImage(w, h, "RGB", sample2, image.get_media())
+        return image, start, img, roi, self.run_frame_inference(
+            inputs, owned=True)
 
-        classname = self.get_classname()
-        inference_results2 = format_inf_results(classname, inference_results)
+    def _postprocess_stage(self, item):
+        image, start, img, roi, results = item
 
-        self._mutex.release()
-        self.on_new_prediction_cb_(
-            inference_results2,
-            image2,
-            gst_media)
+        inference_results = self.map_frame_results(img, roi, results)
+
+        inference_results2, image2 = self.postprocess_frame(
+            image, img, inference_results)
+        self._on_prediction(
+            image, start, inference_results, inference_results2, image2)
+
+    def stop(self):
+        """Drain and join the stage threads
+        """
+
+        if not self._threads:
+            return
+
+        self._queues[0].put(None)
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+
+
+class AIManagerProcessPool(AIManagerOnNewImage):
+    """
+    Class that performs the AI processing on a pool of worker processes
+
+    Every worker process loads its own preprocess, runtime and postprocess
+    objects, so the Python heavy parts of the processing do not compete for
+    the interpreter lock with the stream callbacks. Workers are spawned
+    instead of forked so they do not inherit the GStreamer threads.
+
+    Frames reach the workers through a shared memory ring: the medias copy
+    each frame into a ring slot, the workers process it in place and only
+    the predictions travel back. Frames that did not get a slot are sent
+    by value.
+
+    Attributes
+    ----------
+    _executor : ProcessPoolExecutor
+        A private executor with the worker processes
+    _frame_ring : FrameRing
+        A private shared memory ring with the frames in flight
+    _pending : BoundedSemaphore
+        A private semaphore limiting the images in flight
+
+    Methods
+    -------
+    process_image(image : GstImage, model : str, disp_width : int, disp_height : int)
+        Send the image to the next available worker process
+    forward_image(image : GstImage)
+        Return the ring slot of the image and deliver it without inference
+    get_frame_ring()
+        Getter for the shared memory ring of the frames in flight
+    stop()
+        Shut down the worker processes
+    """
+
+    def __init__(
+            self,
+            model,
+            disp_width,
+            disp_height,
+            workers,
+            queue_depth,
+            tiler=None,
+            threads=None,
+            opencv_threads=None,
+            score_floor=None,
+            headless=False):
+
+        if workers < 1:
+            raise AIManagerError("Invalid number of workers")
+
+        if queue_depth < 1:
+            raise AIManagerError("Invalid queue depth")
+
+        # The runtime is only loaded by the worker processes
+        super().__init__(model, disp_width, disp_height, load_runtime=False,
+                         tiler=tiler, score_floor=score_floor,
+                         headless=headless)
+
+        self._pending = threading.BoundedSemaphore(queue_depth)
+
+        # The display size matches the size of the frames of the medias
+        self._frame_ring = FrameRing(
+            queue_depth,
+            disp_width *
+            disp_height *
+            ai_worker.default_dimentions)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=ai_worker.init_worker,
+            initargs=(model, disp_width, disp_height,
+                      self._frame_ring.get_name(),
+                      self._frame_ring.get_slots(),
+                      self._frame_ring.get_slot_size(),
+                      tiler,
+                      threads,
+                      opencv_threads,
+                      score_floor,
+                      headless))
+
+    def get_frame_ring(self):
+        return self._frame_ring
+
+    def process_image(self, image, model, disp_width, disp_height):
+        """Send the image to the next available worker process
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to process. Blocks the caller if there are already
+            too many images in flight.
+        """
+
+        start = time.monotonic()
+        slot = image.get_slot()
+
+        self._pending.acquire()
+        self._order.enter(image)
+
+        try:
+            if slot is not None:
+                future = self._executor.submit(
+                    ai_worker.process_slot,
+                    slot,
+                    image.get_width(),
+                    image.get_height(),
+                    image.get_media().get_roi())
+            else:
+                future = self._executor.submit(
+                    ai_worker.process_frame,
+                    bytes(image.get_data()),
+                    image.get_width(),
+                    image.get_height(),
+                    image.get_media().get_roi())
+        except Exception:
+            self._release(slot)
+            self._order.leave(image)
+            raise
+
+        future.add_done_callback(
+            lambda future: self._on_processed_frame(
+                image, slot, start, future))
+
+    def forward_image(self, image):
+        """Deliver the image without inference, reusing the latest
+        prediction of its stream
+
+        The medias copy every frame into a ring slot before the scheduler
+        decides whether to infer it. Skipped frames are delivered from
+        their own buffer, so their slot is returned right away.
+
+        Parameters
+        ----------
+        image : GstImage
+            The image to deliver
+        """
+
+        slot = image.get_slot()
+        if slot is not None:
+            self._frame_ring.release(slot)
+
+        super().forward_image(image)
+
+    def _release(self, slot):
+        if slot is not None:
+            self._frame_ring.release(slot)
+        self._pending.release()
+
+    def _on_processed_frame(self, image, slot, start, future):
+        try:
+            inference_results, inference_results2, data = future.result()
+            if slot is not None and not self.headless:
+                # The overlay was drawn in place, copy it out of the slot
+                data = self._frame_ring.view(
+                    slot, image.get_width(), image.get_height()).tobytes()
+        except Exception as e:
+            logging.error("Unable to process image: %s" % (e))
+            self._order.leave(image)
+            return
+        finally:
+            self._release(slot)
+
+        # The workers do not know the stream of the frames
+        inference_results2.stream = image.get_media().get_name()
+        inference_results2.timestamp = image.get_timestamp()
+
+        if self.headless:
+            self._on_prediction(
+                image, start, inference_results, inference_results2, image)
+            return
+
+        # Create GstImage from postprocess image
+        buffer = GstUtils.buffer_new_wrapped(data)
+        sample = GstUtils.sample_new(buffer, image.get_sample().get_caps())
+        image2 = GstImage(
+            image.get_width(),
+            image.get_height(),
+            "RGB",
+            sample,
+            image.get_media())
+
+        self._on_prediction(
+            image, start, inference_results, inference_results2, image2)
+
+    def stop(self):
+        """Shut down the worker processes and destroy the frame ring
+        """
+
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+        dropped = self._frame_ring.get_dropped()
+        if dropped:
+            logging.info("Frames dropped due to a full frame ring: %d" %
+                         dropped)
+
+        self._frame_ring.close()
+
+
+class AIBackend:
+    """
+    Class that creates the AI manager described by the backend configuration
+    """
+
+    @classmethod
+    def make(cls, desc, model, disp_width, disp_height, tiler=None,
+             budget=None, score_floor=None, headless=False):
+        if desc is None:
+            desc = {}
+
+        btype = desc.get("type", "serial")
+
+        threads = None
+        opencv_threads = None
+        if budget is not None:
+            threads = budget.get_runtime_threads()
+            opencv_threads = budget.get_opencv_threads()
+
+        try:
+            if btype == "serial":
+                return AIManagerOnNewImage(
+                    model, disp_width, disp_height, tiler=tiler,
+                    threads=threads, score_floor=score_floor,
+                    headless=headless)
+            elif btype == "pool":
+                return AIManagerWorkerPool(
+                    model,
+                    disp_width,
+                    disp_height,
+                    desc["workers"],
+                    desc.get("queue_depth", 2 * desc["workers"]),
+                    tiler,
+                    threads,
+                    score_floor,
+                    headless)
+            elif btype == "batch":
+                return AIManagerBatch(
+                    model,
+                    disp_width,
+                    disp_height,
+                    desc["max_batch_size"],
+                    desc["max_batch_wait"],
+                    desc.get("queue_depth", 2 * desc["max_batch_size"]),
+                    tiler,
+                    threads,
+                    score_floor,
+                    headless)
+            elif btype == "process":
+                return AIManagerProcessPool(
+                    model,
+                    disp_width,
+                    disp_height,
+                    desc["workers"],
+                    desc.get("queue_depth", 2 * desc["workers"]),
+                    tiler,
+                    threads,
+                    opencv_threads,
+                    score_floor,
+                    headless)
+            elif btype == "pipeline":
+                return AIManagerPipeline(
+                    model,
+                    disp_width,
+                    disp_height,
+                    desc.get("queue_depth", 2),
+                    tiler,
+                    threads,
+                    score_floor,
+                    headless)
+            else:
+                raise AIManagerError('Unknown AI backend "%s"' % btype)
+        except KeyError as e:
+            raise AIManagerError("Malformed AI backend description") from e
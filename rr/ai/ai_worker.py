@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import logging
+
+import cv2
+import numpy as np
+
+from rr.ai.detections import Detections
+from rr.gstreamer.frame_ring import FrameRing
+from TI.postprocess import PostProcessDetection
+from TI.preprocess import PreProcessDetection
+from TI.runtimes import make_runtime
+
+default_dimentions = 3
+
+# The AI worker owned by the current worker process
+_worker = None
+
+# The shared memory ring with the frames to process
+_frame_ring = None
+
+
+def format_inf_results(labels, inference_results, stream=None,
+                       timestamp=None):
+    """Get the detections of an image from its inference results
+
+    Parameters
+    ----------
+    labels : ndarray
+        The label of every detection, looked up from its class ID
+    inference_results : tuple
+        The class IDs, scores and boxes of the image
+    stream : str
+        The name of the stream of the image
+    timestamp : int
+        The timestamp of the image
+
+    Returns
+    -------
+    The Detections of the image, a legacy prediction dictionary is built
+    from them on demand
+    """
+
+    return Detections.from_results(
+        inference_results, labels, stream, timestamp)
+
+
+def preprocess_frame(preprocess_obj, img, roi=None, tiler=None, owned=False):
+    """Preprocess an image into the model inputs to infer
+
+    Parameters
+    ----------
+    preprocess_obj : PreProcessDetection object
+        The PreProcessDetection object
+    img : ndarray
+        The image to preprocess
+    roi : RegionOfInterest
+        The region of the image to infer, None for the whole image
+    tiler : Tiler
+        The tiler splitting the image, None to infer a single input
+    owned : bool
+        Whether the inputs must outlive the next preprocess of the calling
+        thread. Otherwise a single input is left in the reused buffer of
+        the preprocess object.
+
+    Returns
+    -------
+    A list with the preprocessed model inputs
+    """
+
+    if roi is not None:
+        img = roi.crop(img)
+
+    if tiler is None:
+        out = preprocess_obj.new_input() if owned else None
+        return [preprocess_obj.get_preprocessed_image(img, out)]
+
+    return [preprocess_obj.get_preprocessed_image(
+            tile, preprocess_obj.new_input())
+            for tile in tiler.split(img, preprocess_obj.params.resize)]
+
+
+def prune_results(results, score_floor):
+    """Drop the detections scoring below the floor, as a single mask over
+    all of them
+
+    Parameters
+    ----------
+    results : tuple
+        The (1, N) class IDs and scores, and the (1, N, 4) boxes of a model
+        input. Some runtimes give (1, N, 1) class IDs and scores.
+    score_floor : float
+        The score below which the detections are dropped
+
+    Returns
+    -------
+    A tuple with the kept (1, K) class IDs and scores and (1, K, 4) boxes,
+    and the number of retained and pruned detections
+    """
+
+    class_IDs, scores, bounding_boxes = results
+
+    scores = np.asarray(scores).reshape(-1)
+    keep = scores >= score_floor
+    retained = int(np.count_nonzero(keep))
+
+    return ((np.asarray(class_IDs).reshape(-1)[keep][np.newaxis],
+             scores[keep][np.newaxis],
+             np.asarray(bounding_boxes).reshape(-1, 4)[keep][np.newaxis]),
+            retained,
+            keep.size - retained)
+
+
+def map_frame_results(postprocess_obj, img, results, roi=None, tiler=None,
+                      score_floor=None):
+    """Merge the inference results of the inputs given by preprocess_frame
+    into the inference results of the whole image
+
+    Parameters
+    ----------
+    postprocess_obj : PostProcessDetection object
+        The PostProcessDetection object of the model
+    img : ndarray
+        The whole image
+    results : list
+        The inference results of each model input
+    roi : RegionOfInterest
+        The inferred region of the image, None for the whole image
+    tiler : Tiler
+        The tiler that split the image, None for a single input
+    score_floor : float
+        The score below which the detections are dropped, None to keep
+        them all
+    """
+
+    params = postprocess_obj.params
+
+    if score_floor is not None:
+        kept = []
+        retained = 0
+        pruned = 0
+        for input_results in results:
+            input_results, input_retained, input_pruned = prune_results(
+                input_results, score_floor)
+            kept.append(input_results)
+            retained += input_retained
+            pruned += input_pruned
+
+        results = kept
+        logging.debug("Detections retained: %d, pruned: %d" %
+                      (retained, pruned))
+
+    results = [postprocess_obj.get_uncropped_results(input_results)
+               for input_results in results]
+
+    if tiler is None:
+        inference_results = results[0]
+    else:
+        img_shape = img.shape
+        if roi is not None:
+            x0, y0, x1, y1 = roi.get_rect(img.shape)
+            img_shape = (y1 - y0, x1 - x0)
+
+        inference_results = tiler.merge(
+            results, img_shape, params.resize, params.formatter)
+
+    if roi is not None:
+        inference_results = roi.map_results(
+            inference_results, img.shape, params.resize, params.formatter)
+
+    return inference_results
+
+
+class AIWorker():
+    """
+    Class that runs the complete AI processing inside a worker process
+
+    It does not depend on GStreamer, so it can be loaded on processes
+    spawned without the media pipelines.
+
+    Attributes
+    ----------
+    preprocess_obj : PreProcessDetection object
+        The PreProcessDetection object
+    inference_obj : runtime object
+        The runtime object described by the model parameters
+    postprocess_obj : PostProcessDetection object
+        The PostProcessDetection object
+    tiler : Tiler
+        The tiler splitting the images, None to infer whole images
+    score_floor : float
+        The score below which the detections are dropped, None to keep
+        them all
+    headless : bool
+        Whether the overlay is not drawn on the images
+
+    Methods
+    -------
+    process(img : ndarray, roi : RegionOfInterest)
+        Preprocess, infer and postprocess the image
+    """
+
+    def __init__(self, model, disp_width, disp_height, tiler=None,
+                 threads=None, score_floor=None, headless=False):
+        """
+        Constructor for the AI Worker object
+        """
+
+        self.tiler = tiler
+        self.score_floor = score_floor
+        self.headless = headless
+
+        self.preprocess_obj = PreProcessDetection(model)
+
+        self.inference_obj = make_runtime(
+            self.preprocess_obj.params, threads)
+        self.preprocess_obj.set_input_type(
+            *self.inference_obj.get_input_type())
+
+        self.postprocess_obj = PostProcessDetection(
+            model, disp_width, disp_height)
+
+    def process(self, img, roi=None):
+        """Preprocess, infer and postprocess the image
+
+        Parameters
+        ----------
+        img : ndarray
+            The image to process. The overlay is drawn on it, unless
+            headless.
+        roi : RegionOfInterest
+            The region of the image to infer, None for the whole image
+
+        Returns
+        -------
+        A tuple with the raw inference results, the formatted inference
+        results and the postprocessed image
+        """
+
+        inputs = preprocess_frame(self.preprocess_obj, img, roi, self.tiler)
+
+        if len(inputs) == 1:
+            results = [self.inference_obj.run(inputs[0])]
+        else:
+            results = self.inference_obj.run_batch(inputs)
+
+        inference_results = map_frame_results(
+            self.postprocess_obj, img, results, roi, self.tiler,
+            self.score_floor)
+
+        labels = self.postprocess_obj.get_labels(inference_results[0])
+        if not self.headless:
+            img = self.postprocess_obj.get_postprocessed_image(
+                img, inference_results, labels)
+
+        return (inference_results,
+                format_inf_results(labels, inference_results),
+                img)
+
+
+def init_worker(model, disp_width, disp_height, ring_name=None,
+                ring_slots=0, ring_slot_size=0, tiler=None, threads=None,
+                opencv_threads=None, score_floor=None, headless=False):
+    """Load the AI worker of the current process
+
+    Parameters
+    ----------
+    model : str
+        The model directory
+    disp_width : int
+        The postprocessed image width
+    disp_height : int
+        The postprocessed image height
+    ring_name : str
+        The name of the shared memory frame ring to attach to, if any
+    ring_slots : int
+        The number of slots of the frame ring
+    ring_slot_size : int
+        The size in bytes of each slot of the frame ring
+    tiler : Tiler
+        The tiler splitting the frames, None to infer whole frames
+    threads : int
+        The threads of the run time, None for its default
+    opencv_threads : int
+        The OpenCV threads of the process, None for its default
+    score_floor : float
+        The score below which the detections are dropped, None to keep
+        them all
+    headless : bool
+        Whether the overlay is not drawn on the frames
+    """
+
+    if opencv_threads is not None:
+        cv2.setNumThreads(opencv_threads)
+
+    global _worker, _frame_ring
+    _worker = AIWorker(model, disp_width, disp_height, tiler, threads,
+                       score_floor, headless)
+
+    if ring_name is not None:
+        _frame_ring = FrameRing(ring_slots, ring_slot_size, ring_name)
+
+
+def process_frame(data, width, height, roi=None):
+    """Process a frame on the AI worker of the current process
+
+    Parameters
+    ----------
+    data : bytes
+        The RGB frame data
+    width : int
+        The frame width
+    height : int
+        The frame height
+    roi : RegionOfInterest
+        The region of the frame to infer, None for the whole frame
+
+    Returns
+    -------
+    A tuple with the raw inference results, the formatted inference
+    results and the postprocessed frame data, None if headless
+    """
+
+    img = np.frombuffer(bytearray(data), dtype=np.uint8).reshape(
+        (height, width, default_dimentions))
+
+    inference_results, inference_results2, img = _worker.process(img, roi)
+
+    if _worker.headless:
+        return inference_results, inference_results2, None
+
+    return inference_results, inference_results2, img.tobytes()
+
+
+def process_slot(slot, width, height, roi=None):
+    """Process a frame stored in the shared memory ring
+
+    The frame is processed in place, the overlay is drawn over the slot
+    contents.
+
+    Parameters
+    ----------
+    slot : int
+        The ring slot holding the RGB frame
+    width : int
+        The frame width
+    height : int
+        The frame height
+    roi : RegionOfInterest
+        The region of the frame to infer, None for the whole frame
+
+    Returns
+    -------
+    A tuple with the raw and formatted inference results, and None as the
+    postprocessed frame is left in the slot
+    """
+
+    img = _frame_ring.view(slot, width, height)
+
+    inference_results, inference_results2, img = _worker.process(img, roi)
+
+    return inference_results, inference_results2, None
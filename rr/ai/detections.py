@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import numpy as np
+
+bbox_keys = ["x", "y", "width", "height"]
+
+
+class Detections():
+    """
+    Class that holds the detections of an image as columns
+
+    Every detection is a row of NumPy arrays, so filters and actions work
+    on whole columns instead of a Python object per detection. Callers
+    expecting the legacy prediction dictionary can still index it, the
+    dictionary is only built the first time it is requested.
+
+    Attributes
+    ----------
+    class_ids : ndarray
+        The class ID of each detection
+    scores : ndarray
+        The score of each detection
+    boxes : ndarray
+        The N x 4 boxes of the detections, as given by the model
+    labels : ndarray
+        The label of each detection
+    stream : str
+        The name of the stream of the image, None if unknown
+    timestamp : int
+        The timestamp of the image, None if unknown
+
+    Methods
+    -------
+    to_dict()
+        Getter for the legacy prediction dictionary
+    """
+
+    __slots__ = ('class_ids', 'scores', 'boxes', 'labels', 'stream',
+                 'timestamp', '_dict')
+
+    def __init__(self, class_ids, scores, boxes, labels, stream=None,
+                 timestamp=None):
+        """
+        Constructor for the Detections object
+        """
+
+        self.class_ids = class_ids
+        self.scores = scores
+        self.boxes = boxes
+        self.labels = labels
+        self.stream = stream
+        self.timestamp = timestamp
+        self._dict = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, key):
+        return self.to_dict()[key]
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.to_dict() == other
+
+        if not isinstance(other, Detections):
+            return NotImplemented
+
+        return (np.array_equal(self.class_ids, other.class_ids) and
+                np.array_equal(self.scores, other.scores) and
+                np.array_equal(self.boxes, other.boxes) and
+                np.array_equal(self.labels, other.labels) and
+                self.stream == other.stream and
+                self.timestamp == other.timestamp)
+
+    __hash__ = None
+
+    def to_dict(self):
+        """Getter for the legacy prediction dictionary, with an instance
+        per detection holding its label and bounding box
+        """
+
+        if self._dict is None:
+            instances = []
+            for label, score, box in zip(self.labels, self.scores,
+                                         self.boxes):
+                instances.append({
+                    "labels": [{"label": label, "probability": score}],
+                    "bbox": dict(zip(bbox_keys, box))})
+
+            self._dict = {"instances": instances}
+
+        return self._dict
+
+    @classmethod
+    def from_results(cls, inference_results, labels, stream=None,
+                     timestamp=None):
+        """Create the detections from the inference results of an image
+
+        Parameters
+        ----------
+        inference_results : tuple
+            The (1, N) class IDs and scores, and the (1, N, 4) boxes. Some
+            runtimes give (1, N, 1) class IDs and scores.
+        labels : str or ndarray
+            The label of every detection, or a single label for all
+        """
+
+        class_IDs, scores, bounding_boxes = inference_results
+
+        scores = np.asarray(scores)[0].reshape(-1)
+        if isinstance(labels, str) or labels is None:
+            labels = np.full(len(scores), labels, dtype=object)
+
+        return Detections(np.asarray(class_IDs)[0].reshape(-1),
+                          scores,
+                          np.asarray(bounding_boxes)[0].reshape(-1, 4),
+                          labels,
+                          stream,
+                          timestamp)
+
+    @classmethod
+    def empty(cls, stream=None, timestamp=None):
+        return Detections(np.empty(0, dtype=np.float32),
+                          np.empty(0, dtype=np.float32),
+                          np.empty((0, 4), dtype=np.float32),
+                          np.empty(0, dtype=object),
+                          stream,
+                          timestamp)
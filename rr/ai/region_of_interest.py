@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import cv2
+import numpy as np
+
+
+class RegionOfInterestError(RuntimeError):
+    pass
+
+
+def map_boxes(results, rect, img_shape, resize, formatter):
+    """Map the boxes inferred over a rectangle of an image to the whole
+    image
+
+    Parameters
+    ----------
+    results : tuple
+        The class IDs, scores and boxes inferred over the rectangle, with
+        the boxes in model input coordinates
+    rect : tuple
+        The inferred rectangle as (x0, y0, x1, y1) pixels of the image
+    img_shape : tuple
+        The shape of the whole image
+    resize : list
+        The model input width and height
+    formatter : list
+        The position of the x1, y1, x2, y2 coordinates in each box
+
+    Returns
+    -------
+    The results with the boxes in model input coordinates of the whole
+    image
+    """
+
+    class_IDs, scores, bounding_boxes = results
+
+    img_height, img_width = img_shape[:2]
+    x0, y0, x1, y1 = rect
+    resize_width, resize_height = resize
+
+    x_cols = [formatter.index(0), formatter.index(2)]
+    y_cols = [formatter.index(1), formatter.index(3)]
+
+    bounding_boxes = np.array(bounding_boxes, dtype=np.float32)
+    bounding_boxes[..., x_cols] = \
+        bounding_boxes[..., x_cols] * ((x1 - x0) / img_width) + \
+        x0 * resize_width / img_width
+    bounding_boxes[..., y_cols] = \
+        bounding_boxes[..., y_cols] * ((y1 - y0) / img_height) + \
+        y0 * resize_height / img_height
+
+    return class_IDs, scores, bounding_boxes
+
+
+class RegionOfInterest():
+    """
+    Class that restricts the inference to a region of the image
+
+    The region is either a rectangle or a polygon, in pixels of the image
+    delivered to the AI manager. Only the bounding rectangle of the region
+    is preprocessed and inferred; for polygons the pixels outside the
+    polygon are blacked out. The region is clipped to the image, and the
+    whole image is used if nothing is left.
+
+    Attributes
+    ----------
+    _rect : tuple
+        A private bounding rectangle of the region as (x, y, width, height)
+    _polygon : ndarray
+        A private array with the polygon vertices, None for rectangles
+    _mask : ndarray
+        A private cached mask of the polygon over the cropped image
+
+    Methods
+    -------
+    get_rect(img_shape : tuple)
+        Getter for the region clipped to an image
+    crop(img : ndarray)
+        Extract the region from the image
+    map_results(results : tuple, img_shape : tuple, resize : list, formatter : list)
+        Map the boxes inferred over the region back to the whole image
+    """
+
+    def __init__(self, rect=None, polygon=None):
+        """
+        Constructor for the Region Of Interest object
+
+        Parameters
+        ----------
+        rect : list
+            The rectangle as [x, y, width, height]
+        polygon : list
+            The polygon as a list of [x, y] vertices
+        """
+
+        if (rect is None) == (polygon is None):
+            raise RegionOfInterestError(
+                "Region of interest needs either a rectangle or a polygon")
+
+        self._polygon = None
+        self._mask = None
+
+        if polygon is not None:
+            if len(polygon) < 3:
+                raise RegionOfInterestError(
+                    "Region of interest polygon needs at least 3 vertices")
+
+            self._polygon = np.array(polygon, dtype=np.int32).reshape(-1, 2)
+            rect = cv2.boundingRect(self._polygon)
+
+        x, y, width, height = [int(value) for value in rect]
+        if width <= 0 or height <= 0:
+            raise RegionOfInterestError("Region of interest is empty")
+
+        self._rect = (x, y, width, height)
+
+    def get_rect(self, img_shape):
+        """Getter for the bounding rectangle of the region clipped to an
+        image, as (x0, y0, x1, y1)
+        """
+
+        img_height, img_width = img_shape[:2]
+        x, y, width, height = self._rect
+
+        x0 = min(max(x, 0), img_width)
+        y0 = min(max(y, 0), img_height)
+        x1 = min(max(x + width, 0), img_width)
+        y1 = min(max(y + height, 0), img_height)
+
+        if x1 <= x0 or y1 <= y0:
+            return 0, 0, img_width, img_height
+
+        return x0, y0, x1, y1
+
+    def crop(self, img):
+        """Extract the region from the image
+
+        Parameters
+        ----------
+        img : ndarray
+            The HWC image
+
+        Returns
+        -------
+        A view of the image for rectangles, or a masked copy for polygons
+        """
+
+        x0, y0, x1, y1 = self.get_rect(img.shape)
+        cropped = img[y0:y1, x0:x1]
+
+        if self._polygon is None:
+            return cropped
+
+        # Several threads may crop at once, so the mask is only published
+        # once complete
+        mask = self._mask
+        if mask is None or mask.shape[:2] != cropped.shape[:2]:
+            mask = np.zeros(cropped.shape[:2], dtype=np.uint8)
+            cv2.fillPoly(mask, [self._polygon - (x0, y0)], 1)
+            mask = mask.astype(bool)[:, :, np.newaxis]
+            self._mask = mask
+
+        masked = np.zeros_like(cropped)
+        np.copyto(masked, cropped, where=mask)
+
+        return masked
+
+    def map_results(self, results, img_shape, resize, formatter):
+        """Map the boxes inferred over the region back to the whole image
+
+        Parameters
+        ----------
+        results : tuple
+            The class IDs, scores and boxes inferred over the region, with
+            the boxes in model input coordinates
+        img_shape : tuple
+            The shape of the whole image
+        resize : list
+            The model input width and height
+        formatter : list
+            The position of the x1, y1, x2, y2 coordinates in each box
+
+        Returns
+        -------
+        The results with the boxes in model input coordinates of the whole
+        image
+        """
+
+        return map_boxes(results, self.get_rect(img_shape), img_shape,
+                         resize, formatter)
+
+    @classmethod
+    def make(cls, desc):
+        if desc is None:
+            return None
+
+        return RegionOfInterest(desc.get("rect"), desc.get("polygon"))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import os
+import queue
+import threading
+
+from bin.utils.getconfig import get_model_params
+from TI.runtimes import copy_results
+from TI.runtimes import make_runtime
+
+# The run time pools of the process by model directory, instances and
+# threads
+_pools = {}
+_pools_mutex = threading.Lock()
+
+
+class RunTimePoolError(RuntimeError):
+    pass
+
+
+class RunTimePool():
+    """
+    Class that holds several instances of the run time of a model
+
+    Each instance has its own interpreter and threads. Callers check out an
+    instance, run it and return it, so as many inferences as instances run
+    at the same time. The pool runs like a single run time too, checking an
+    instance out for each call. With several instances, or once the pool
+    is shared, the results are copied before the instance is returned, as
+    another caller may run it right after. Callers keeping the results
+    ask for owned results instead of copying them again.
+
+    Attributes
+    ----------
+    _runtimes : list
+        A private list with all the run time instances
+    _free : Queue
+        A private queue with the instances not checked out
+
+    Methods
+    -------
+    checkout(timeout : float)
+        Take a free instance, waiting for one to be returned
+    checkin(runtime : run time object)
+        Return an instance to the pool
+    share()
+        Count one more user of the pool
+    run(input_img : ndarray, owned : bool)
+        Run an instance on a model input
+    run_batch(input_imgs : list, owned : bool)
+        Run an instance on a batch of model inputs
+    """
+
+    def __init__(self, params, instances=1, threads=None, runtimes=None):
+        """
+        Constructor for the Run Time Pool object
+
+        Parameters
+        ----------
+        params : model parameters
+            The parsed model parameters selecting the run time
+        instances : int
+            The number of run time instances
+        threads : int
+            The threads of each instance, None for the run time default
+        runtimes : list
+            Already built instances to pool instead
+        """
+
+        if runtimes is None:
+            if instances < 1:
+                raise RunTimePoolError("Invalid number of instances")
+
+            runtimes = [make_runtime(params, threads)
+                        for i in range(instances)]
+
+        if not runtimes:
+            raise RunTimePoolError("Invalid number of instances")
+
+        self._runtimes = list(runtimes)
+        self._free = queue.Queue()
+        for runtime in self._runtimes:
+            self._free.put(runtime)
+
+        self._checked_out = set()
+        self._mutex = threading.Lock()
+        self._users = 1
+
+    def checkout(self, timeout=None):
+        """Take a free instance
+
+        Parameters
+        ----------
+        timeout : float
+            The seconds to wait for an instance, None to wait forever
+
+        Raises
+        ------
+        RunTimePoolError
+            If no instance was returned in time
+        """
+
+        try:
+            runtime = self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise RunTimePoolError("No run time instance available") from None
+
+        with self._mutex:
+            self._checked_out.add(id(runtime))
+
+        return runtime
+
+    def checkin(self, runtime):
+        """Return an instance to the pool
+
+        Raises
+        ------
+        RunTimePoolError
+            If the instance was not checked out from the pool
+        """
+
+        with self._mutex:
+            if id(runtime) not in self._checked_out:
+                raise RunTimePoolError("Run time instance not checked out")
+
+            self._checked_out.remove(id(runtime))
+
+        self._free.put(runtime)
+
+    def share(self):
+        """Count one more user of the pool, so the results are copied
+        """
+
+        with self._mutex:
+            self._users += 1
+
+        return self
+
+    def _is_shared(self):
+        return len(self._runtimes) > 1 or self._users > 1
+
+    def run(self, input_img, owned=False):
+        runtime = self.checkout()
+        try:
+            results = runtime.run(input_img)
+            if owned or self._is_shared():
+                results = copy_results(results)
+        finally:
+            self.checkin(runtime)
+
+        return results
+
+    def run_batch(self, input_imgs, owned=False):
+        runtime = self.checkout()
+        try:
+            results = runtime.run_batch(input_imgs)
+            if owned or self._is_shared():
+                results = [copy_results(input_results)
+                           for input_results in results]
+        finally:
+            self.checkin(runtime)
+
+        return results
+
+    def get_input_type(self):
+        return self._runtimes[0].get_input_type()
+
+    def get_instances(self):
+        return len(self._runtimes)
+
+
+def get_runtime_pool(model, instances=1, threads=None):
+    """Get the run time pool of a model, loading it only the first time
+    it is requested by the process
+
+    Parameters
+    ----------
+    model : str
+        The model directory
+    instances : int
+        The number of run time instances
+    threads : int
+        The threads of each instance, None for the run time default
+
+    Returns
+    -------
+    The pool, counting the caller as one more user if it was already
+    loaded
+    """
+
+    key = (os.path.abspath(model), instances, threads)
+    with _pools_mutex:
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool.share()
+
+        pool = RunTimePool(get_model_params(model), instances, threads)
+        _pools[key] = pool
+
+    return pool
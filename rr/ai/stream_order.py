@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+from collections import deque
+import logging
+import threading
+
+
+class _StreamTurns():
+    """
+    Class that holds the turns of the images of a stream
+    """
+
+    def __init__(self):
+        self.next_turn = 0
+        self.next_leave = 0
+        self.ready = {}
+        self.mutex = threading.Lock()
+
+
+class StreamOrder():
+    """
+    Class that delivers the images of every stream in the order they entered
+
+    Each image takes the next turn of its stream when it enters the AI
+    manager. Images finishing out of order wait until all the previous
+    images of their stream are delivered or dropped, so the display, the
+    actions and the latest prediction of the stream never go back in time.
+    Images of different streams do not wait for each other.
+
+    Attributes
+    ----------
+    _turns : dict
+        A private dictionary with the stream and turns of each image in
+        flight, oldest first
+    _streams : dict
+        A private dictionary with the turns of each stream
+
+    Methods
+    -------
+    enter(image : GstImage)
+        Take the next turn of the stream of the image
+    leave(image : GstImage, deliver : function)
+        Deliver the image once its turn comes, or drop its turn
+    """
+
+    def __init__(self):
+        """
+        Constructor for the Stream Order object
+        """
+
+        self._mutex = threading.Lock()
+        self._turns = {}
+        self._streams = {}
+
+    def enter(self, image):
+        """Take the next turn of the stream of the image
+
+        Parameters
+        ----------
+        image : GstImage
+            The image entering the AI manager
+        """
+
+        stream = image.get_media().get_name()
+
+        with self._mutex:
+            turns = self._streams.get(stream)
+            if turns is None:
+                turns = _StreamTurns()
+                self._streams[stream] = turns
+
+            # The same image may be in flight more than once
+            self._turns.setdefault(id(image), deque()).append(
+                (turns, turns.next_turn))
+            turns.next_turn += 1
+
+    def leave(self, image, deliver=None):
+        """Deliver the image once all the previous images of its stream
+        left
+
+        Parameters
+        ----------
+        image : GstImage
+            The image leaving the AI manager
+        deliver : function
+            The function delivering the image, None to drop its turn.
+            Images that did not enter are delivered right away.
+        """
+
+        with self._mutex:
+            entry = None
+            image_turns = self._turns.get(id(image))
+            if image_turns is not None:
+                entry = image_turns.popleft()
+                if not image_turns:
+                    del self._turns[id(image)]
+
+                turns, turn = entry
+                turns.ready[turn] = deliver
+
+        if entry is None:
+            if deliver is not None:
+                deliver()
+            return
+
+        self._flush(turns)
+
+    def _flush(self, turns):
+        # A single thread delivers the images of a stream at a time, the
+        # others leave their images ready for it and return
+        while turns.mutex.acquire(blocking=False):
+            try:
+                self._deliver_ready(turns)
+            finally:
+                turns.mutex.release()
+
+            # An image left ready while the mutex was held is delivered by
+            # this thread, as its own thread returned
+            with self._mutex:
+                if turns.next_leave not in turns.ready:
+                    return
+
+    def _deliver_ready(self, turns):
+        while True:
+            with self._mutex:
+                if turns.next_leave not in turns.ready:
+                    return
+
+                deliver = turns.ready.pop(turns.next_leave)
+                turns.next_leave += 1
+
+            if deliver is None:
+                continue
+
+            try:
+                deliver()
+            except Exception as e:
+                logging.error("Unable to deliver image: %s" % (e))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import logging
+import os
+
+import cv2
+
+default_opencv_threads = 1
+default_decoder_threads = 1
+
+
+class ThreadBudgetError(RuntimeError):
+    pass
+
+
+def get_cores():
+    """The number of cores the process may run on
+    """
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+class ThreadBudget():
+    """
+    Class that splits the cores between the run time instances, OpenCV and
+    the GStreamer decoders
+
+    Every stream decodes with its own decoder threads, and OpenCV runs its
+    parallel loops on a single global pool. The cores left are shared by
+    the run time instances, with at least one thread each. Threads not
+    given are derived so the total matches the cores, instead of every
+    library starting a thread per core.
+
+    Attributes
+    ----------
+    _cores : int
+        A private number of cores to budget
+    _runtime_threads : int
+        A private number of threads of each run time instance
+    _opencv_threads : int
+        A private number of OpenCV threads
+    _decoder_threads : int
+        A private number of decoder threads of each stream
+
+    Methods
+    -------
+    apply()
+        Set the OpenCV threads of the process
+    get_total()
+        Getter for the threads of all the consumers together
+    """
+
+    def __init__(self, streams, instances=1, cores=None, runtime_threads=None,
+                 opencv_threads=default_opencv_threads,
+                 decoder_threads=default_decoder_threads):
+        """
+        Constructor for the Thread Budget object
+
+        Parameters
+        ----------
+        streams : int
+            The number of streams decoded
+        instances : int
+            The number of run time instances inferring at the same time
+        cores : int
+            The cores to budget, the cores of the process by default
+        runtime_threads : int
+            The threads of each run time instance, derived from the cores
+            left by default
+        opencv_threads : int
+            The OpenCV threads
+        decoder_threads : int
+            The decoder threads of each stream
+        """
+
+        if cores is None:
+            cores = get_cores()
+
+        if cores < 1:
+            raise ThreadBudgetError("Invalid number of cores")
+
+        if streams < 0 or instances < 1:
+            raise ThreadBudgetError("Invalid number of consumers")
+
+        if opencv_threads < 1 or decoder_threads < 1:
+            raise ThreadBudgetError("Invalid number of threads")
+
+        if runtime_threads is None:
+            free = cores - opencv_threads - streams * decoder_threads
+            runtime_threads = max(1, free // instances)
+
+        if runtime_threads < 1:
+            raise ThreadBudgetError("Invalid number of run time threads")
+
+        self._cores = cores
+        self._streams = streams
+        self._instances = instances
+        self._runtime_threads = runtime_threads
+        self._opencv_threads = opencv_threads
+        self._decoder_threads = decoder_threads
+
+    def apply(self):
+        """Set the OpenCV threads of the process, and warn if the threads
+        exceed the cores
+        """
+
+        cv2.setNumThreads(self._opencv_threads)
+
+        if self.get_total() > self._cores:
+            logging.warning(
+                "%d threads budgeted on %d cores" %
+                (self.get_total(), self._cores))
+
+    def get_total(self):
+        return (self._instances * self._runtime_threads +
+                self._opencv_threads +
+                self._streams * self._decoder_threads)
+
+    def get_cores(self):
+        return self._cores
+
+    def get_runtime_threads(self):
+        return self._runtime_threads
+
+    def get_opencv_threads(self):
+        return self._opencv_threads
+
+    def get_decoder_threads(self):
+        return self._decoder_threads
+
+    @classmethod
+    def make(cls, desc, streams, instances=1):
+        if desc is None:
+            desc = {}
+
+        return ThreadBudget(streams,
+                            instances,
+                            desc.get("cores"),
+                            desc.get("runtime"),
+                            desc.get("opencv", default_opencv_threads),
+                            desc.get("decoder", default_decoder_threads))
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import math
+
+import numpy as np
+
+from rr.ai.region_of_interest import map_boxes
+
+default_overlap = 0.2
+default_max_tiles = 4
+default_nms_threshold = 0.5
+default_min_score = 0.1
+
+
+class TilerError(RuntimeError):
+    pass
+
+
+def non_max_suppression(results, formatter, threshold):
+    """Remove the boxes overlapping a better scored box of the same class
+
+    All the overlaps are computed at once, and a box is removed if any box
+    of the same class with a higher score overlaps it above the threshold.
+
+    Parameters
+    ----------
+    results : tuple
+        The class IDs, scores and boxes of a single image
+    formatter : list
+        The position of the x1, y1, x2, y2 coordinates in each box
+    threshold : float
+        The intersection over union above which a box is removed
+
+    Returns
+    -------
+    The kept results, sorted by decreasing score
+    """
+
+    class_IDs, scores, bounding_boxes = results
+
+    order = np.argsort(-scores[0], kind='stable')
+    class_IDs = class_IDs[0][order]
+    scores = scores[0][order]
+    bounding_boxes = bounding_boxes[0][order]
+
+    x1 = bounding_boxes[:, formatter.index(0)]
+    y1 = bounding_boxes[:, formatter.index(1)]
+    x2 = bounding_boxes[:, formatter.index(2)]
+    y2 = bounding_boxes[:, formatter.index(3)]
+    area = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    inter_width = np.clip(np.minimum(x2[:, None], x2[None, :]) -
+                          np.maximum(x1[:, None], x1[None, :]), 0, None)
+    inter_height = np.clip(np.minimum(y2[:, None], y2[None, :]) -
+                           np.maximum(y1[:, None], y1[None, :]), 0, None)
+    inter = inter_width * inter_height
+    union = area[:, None] + area[None, :] - inter
+    iou = inter / np.maximum(union, np.finfo(np.float32).eps)
+
+    # Only a better scored box of the same class may remove a box
+    iou[class_IDs[:, None] != class_IDs[None, :]] = 0
+    iou = np.triu(iou, k=1)
+
+    keep = np.ones(len(scores), dtype=bool)
+    if len(scores):
+        keep = iou.max(axis=0) <= threshold
+
+    return (class_IDs[keep][np.newaxis],
+            scores[keep][np.newaxis],
+            bounding_boxes[keep][np.newaxis])
+
+
+class Tiler():
+    """
+    Class that splits the images in overlapping tiles to be inferred as a
+    batch, and merges the detections of all the tiles
+
+    Each tile is resized to the model input on its own, so small objects
+    get more pixels than with a single resize of the whole image. Without
+    an explicit grid, the image is covered with tiles about the size of the
+    model input. The number of tiles is capped so the cost per image stays
+    predictable.
+
+    Attributes
+    ----------
+    _grid : tuple
+        A private number of tile columns and rows, None to derive it from
+        the image size
+    _overlap : float
+        A private fraction of each tile shared with its neighbours
+    _max_tiles : int
+        A private maximum number of tiles per image
+    _nms_threshold : float
+        A private intersection over union to merge overlapping detections
+    _min_score : float
+        A private score below which the detections are discarded before
+        merging
+
+    Methods
+    -------
+    get_rects(img_shape : tuple, tile_size : list)
+        Getter for the tiles of an image
+    split(img : ndarray, tile_size : list)
+        Split the image in tiles
+    merge(results : list, img_shape : tuple, resize : list, formatter : list)
+        Merge the detections of the tiles of an image
+    """
+
+    def __init__(self, grid=None, overlap=default_overlap,
+                 max_tiles=default_max_tiles,
+                 nms_threshold=default_nms_threshold,
+                 min_score=default_min_score):
+        """
+        Constructor for the Tiler object
+        """
+
+        if grid is not None and (len(grid) != 2 or min(grid) < 1):
+            raise TilerError("Invalid tile grid")
+
+        if overlap < 0 or overlap >= 1:
+            raise TilerError("Invalid tile overlap")
+
+        if max_tiles < 1:
+            raise TilerError("Invalid maximum number of tiles")
+
+        self._grid = None if grid is None else tuple(grid)
+        self._overlap = overlap
+        self._max_tiles = max_tiles
+        self._nms_threshold = nms_threshold
+        self._min_score = min_score
+        self._rects = {}
+
+    def _get_count(self, length, tile_length):
+        tile_length = min(tile_length, length)
+        step = tile_length * (1 - self._overlap)
+
+        return max(1, math.ceil((length - tile_length) / step) + 1)
+
+    def _get_spans(self, length, count):
+        tile_length = length / (count - (count - 1) * self._overlap)
+        step = tile_length * (1 - self._overlap)
+
+        return [(int(round(i * step)),
+                 min(length, int(round(i * step + tile_length))))
+                for i in range(count)]
+
+    def get_rects(self, img_shape, tile_size):
+        """Getter for the tiles of an image
+
+        Parameters
+        ----------
+        img_shape : tuple
+            The shape of the image
+        tile_size : list
+            The model input width and height
+
+        Returns
+        -------
+        A list with the tiles as (x0, y0, x1, y1) pixels of the image
+        """
+
+        key = (img_shape[:2], tuple(tile_size))
+        rects = self._rects.get(key)
+        if rects is not None:
+            return rects
+
+        img_height, img_width = img_shape[:2]
+
+        if self._grid is not None:
+            cols, rows = self._grid
+        else:
+            cols = self._get_count(img_width, tile_size[0])
+            rows = self._get_count(img_height, tile_size[1])
+
+        while cols * rows > self._max_tiles:
+            if cols >= rows:
+                cols -= 1
+            else:
+                rows -= 1
+
+        rects = [(x0, y0, x1, y1)
+                 for y0, y1 in self._get_spans(img_height, rows)
+                 for x0, x1 in self._get_spans(img_width, cols)]
+        self._rects[key] = rects
+
+        return rects
+
+    def split(self, img, tile_size):
+        """Split the image in tiles
+
+        Returns
+        -------
+        A list with a view of the image for each tile
+        """
+
+        return [img[y0:y1, x0:x1]
+                for x0, y0, x1, y1 in self.get_rects(img.shape, tile_size)]
+
+    def merge(self, results, img_shape, resize, formatter):
+        """Merge the detections of the tiles of an image
+
+        Parameters
+        ----------
+        results : list
+            The inference results of each tile, in the order given by split.
+            The class IDs and scores may come as (1, N) or (1, N, 1).
+        img_shape : tuple
+            The shape of the tiled image
+        resize : list
+            The model input width and height
+        formatter : list
+            The position of the x1, y1, x2, y2 coordinates in each box
+
+        Returns
+        -------
+        The inference results of the whole image
+        """
+
+        rects = self.get_rects(img_shape, resize)
+
+        class_IDs = []
+        scores = []
+        bounding_boxes = []
+        for rect, tile_results in zip(rects, results):
+            tile_class_IDs, tile_scores, tile_boxes = map_boxes(
+                tile_results, rect, img_shape, resize, formatter)
+
+            tile_scores = np.asarray(tile_scores).reshape(-1)
+            keep = tile_scores >= self._min_score
+            class_IDs.append(np.asarray(tile_class_IDs).reshape(-1)[keep])
+            scores.append(tile_scores[keep])
+            bounding_boxes.append(tile_boxes.reshape(-1, 4)[keep])
+
+        merged = (np.concatenate(class_IDs)[np.newaxis],
+                  np.concatenate(scores)[np.newaxis],
+                  np.concatenate(bounding_boxes)[np.newaxis])
+
+        return non_max_suppression(merged, formatter, self._nms_threshold)
+
+    @classmethod
+    def make(cls, desc):
+        if desc is None:
+            return None
+
+        return Tiler(desc.get("grid"),
+                     desc.get("overlap", default_overlap),
+                     desc.get("max_tiles", default_max_tiles),
+                     desc.get("nms_threshold", default_nms_threshold),
+                     desc.get("min_score", default_min_score))
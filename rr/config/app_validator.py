@@ -23,6 +23,22 @@ def validate_objects(dict, key, expected_type, key_err_msg, type_err_msg):
         raise AppValidatortError(type_err_msg)
 
 
+def validate_optional_objects(dict, key, expected_type, type_err_msg):
+    """Validates the parsed objects that may be omitted
+
+    Raises
+    ------
+    AppValidatorError
+    If the dictionary value is present but not of the expected type
+    """
+
+    if key not in dict:
+        return
+
+    if not isinstance(dict[key], expected_type):
+        raise AppValidatortError(type_err_msg)
+
+
 def validate_lists(in_list, expected_type, type_err_msg):
     """Validates the lists elements of the parsed objects
 
@@ -82,6 +98,10 @@ def validate_streams(cfg, triggers):
             "Triggers field not found in stream",
             "Found triggers field in stream, but is is not a list")
 
+        validate_inference_fps(stream)
+        validate_motion_gate(stream)
+        validate_roi(stream)
+
         stream_triggers = stream["triggers"]
         validate_lists(
             stream_triggers,
@@ -95,6 +115,123 @@ def validate_streams(cfg, triggers):
                 trigger, triggers, err_msg_triggers)
 
 
+def validate_inference_fps(stream):
+    """Validates the optional inference rate of a stream
+
+    Raises
+    ------
+    AppValidatorError
+    If the rate is not a positive number nor auto
+    """
+
+    if 'inference_fps' not in stream:
+        return
+
+    inference_fps = stream['inference_fps']
+    if inference_fps == 'auto':
+        return
+
+    if isinstance(inference_fps, bool) or not isinstance(
+            inference_fps, (int, float)) or inference_fps <= 0:
+        raise AppValidatortError(
+            "Inference fps field in stream must be a positive number or auto")
+
+
+def validate_motion_gate(stream):
+    """Validates the optional motion gate of a stream
+
+    Raises
+    ------
+    AppValidatorError
+    If the motion gate is malformed
+    """
+
+    validate_optional_objects(
+        stream,
+        'motion_gate',
+        dict,
+        "Found motion gate field in stream, but it is not a dictionary")
+
+    if 'motion_gate' not in stream:
+        return
+
+    motion_gate = stream['motion_gate']
+
+    validate_objects(
+        motion_gate,
+        'threshold',
+        (int, float),
+        "Threshold field not found in motion gate",
+        "Threshold field in motion gate must be a number")
+
+    if motion_gate['threshold'] < 0 or motion_gate['threshold'] > 1:
+        raise AppValidatortError(
+            "Threshold field in motion gate must be between 0 and 1")
+
+    validate_optional_objects(
+        motion_gate,
+        'downscale',
+        int,
+        "Downscale field in motion gate must be a whole number")
+
+    validate_optional_objects(
+        motion_gate,
+        'pixel_threshold',
+        (int, float),
+        "Pixel threshold field in motion gate must be a number")
+
+
+def validate_roi(stream):
+    """Validates the optional region of interest of a stream
+
+    Raises
+    ------
+    AppValidatorError
+    If the region of interest is malformed
+    """
+
+    validate_optional_objects(
+        stream,
+        'roi',
+        dict,
+        "Found roi field in stream, but it is not a dictionary")
+
+    if 'roi' not in stream:
+        return
+
+    roi = stream['roi']
+
+    if ('rect' in roi) == ('polygon' in roi):
+        raise AppValidatortError(
+            "Roi field in stream must have either a rect or a polygon")
+
+    if 'rect' in roi:
+        rect = roi['rect']
+        if not isinstance(rect, list) or len(rect) != 4:
+            raise AppValidatortError(
+                "Rect field in roi must be a list with x, y, width and height")
+
+        validate_lists(
+            rect, int, "Rect field in roi must contain whole numbers")
+
+        if rect[2] <= 0 or rect[3] <= 0:
+            raise AppValidatortError(
+                "Rect field in roi must have a positive width and height")
+    else:
+        polygon = roi['polygon']
+        if not isinstance(polygon, list) or len(polygon) < 3:
+            raise AppValidatortError(
+                "Polygon field in roi must be a list of at least 3 vertices")
+
+        for vertex in polygon:
+            if not isinstance(vertex, list) or len(vertex) != 2:
+                raise AppValidatortError(
+                    "Found vertex in roi polygon, but it is not an x, y pair")
+
+            validate_lists(
+                vertex, int, "Polygon field in roi must contain whole numbers")
+
+
 def validate_filters(cfg):
     """Validates the filters field of the configuration object
     """
@@ -284,6 +421,185 @@ def validate_model_parameters(cfg):
         "Name detection not found in model parameters",
         "Found detectionfield in model parameters, but it is not a string")
 
+    validate_backend(model_params)
+    validate_tiling(model_params)
+    validate_threads(model_params)
+    validate_score_floor(model_params)
+
+
+def validate_tiling(model_params):
+    """Validates the optional tiling field of the model parameters
+    """
+
+    validate_optional_objects(
+        model_params,
+        'tiling',
+        dict,
+        "Found tiling field in model parameters, but it is not a dictionary")
+
+    if 'tiling' not in model_params:
+        return
+
+    tiling = model_params['tiling']
+
+    if 'grid' in tiling:
+        grid = tiling['grid']
+        if not isinstance(grid, list) or len(grid) != 2:
+            raise AppValidatortError(
+                "Grid field in tiling must be a list with columns and rows")
+
+        validate_lists(
+            grid, int, "Grid field in tiling must contain whole numbers")
+
+        if min(grid) < 1:
+            raise AppValidatortError(
+                "Grid field in tiling must have at least one column and row")
+
+    validate_optional_objects(
+        tiling,
+        'overlap',
+        (int, float),
+        "Overlap field in tiling must be a number")
+
+    if 'overlap' in tiling and not 0 <= tiling['overlap'] < 1:
+        raise AppValidatortError(
+            "Overlap field in tiling must be between 0 and 1")
+
+    validate_optional_objects(
+        tiling,
+        'max_tiles',
+        int,
+        "Max tiles field in tiling must be a whole number")
+
+    if 'max_tiles' in tiling and tiling['max_tiles'] < 1:
+        raise AppValidatortError(
+            "Max tiles field in tiling must be a positive number")
+
+    validate_optional_objects(
+        tiling,
+        'nms_threshold',
+        (int, float),
+        "Nms threshold field in tiling must be a number")
+
+    validate_optional_objects(
+        tiling,
+        'min_score',
+        (int, float),
+        "Min score field in tiling must be a number")
+
+
+def validate_threads(model_params):
+    """Validates the optional threads field of the model parameters
+    """
+
+    validate_optional_objects(
+        model_params,
+        'threads',
+        dict,
+        "Found threads field in model parameters, but it is not a dictionary")
+
+    if 'threads' not in model_params:
+        return
+
+    threads = model_params['threads']
+
+    for field, name in [('cores', 'Cores'), ('runtime', 'Runtime'),
+                        ('opencv', 'Opencv'), ('decoder', 'Decoder')]:
+        validate_optional_objects(
+            threads,
+            field,
+            int,
+            name + " field in threads must be a whole number")
+
+        if field in threads and threads[field] < 1:
+            raise AppValidatortError(
+                name + " field in threads must be a positive number")
+
+
+def validate_score_floor(model_params):
+    """Validates the optional score floor field of the model parameters
+
+    Raises
+    ------
+    AppValidatorError
+    If the floor is not a number between 0 and 1 nor auto
+    """
+
+    if 'score_floor' not in model_params:
+        return
+
+    score_floor = model_params['score_floor']
+    if score_floor == 'auto':
+        return
+
+    if isinstance(score_floor, bool) or not isinstance(
+            score_floor, (int, float)) or not 0 <= score_floor <= 1:
+        raise AppValidatortError(
+            "Score floor field in model parameters must be a number "
+            "between 0 and 1 or auto")
+
+
+def validate_headless(cfg):
+    """Validates the optional headless field of the configuration object
+    """
+
+    validate_optional_objects(
+        cfg,
+        'headless',
+        bool,
+        "Found headless field, but it is not a boolean")
+
+
+def validate_backend(model_params):
+    """Validates the optional backend field of the model parameters
+    """
+
+    validate_optional_objects(
+        model_params,
+        'backend',
+        dict,
+        "Found backend field in model parameters, but it is not a dictionary")
+
+    if 'backend' not in model_params:
+        return
+
+    backend = model_params['backend']
+
+    validate_objects(
+        backend,
+        'type',
+        str,
+        "Type field not found in backend",
+        "Found type field in backend, but it is not a string")
+
+    if backend['type'] in ['pool', 'process']:
+        validate_objects(
+            backend,
+            'workers',
+            int,
+            "Workers field not found in backend of type " + backend['type'],
+            "Workers field in backend must be a whole number")
+
+    if backend['type'] == 'batch':
+        validate_objects(
+            backend,
+            'max_batch_size',
+            int,
+            "Max batch size field not found in backend of type batch",
+            "Max batch size field in backend must be a whole number")
+        validate_objects(
+            backend,
+            'max_batch_wait',
+            (int, float),
+            "Max batch wait field not found in backend of type batch",
+            "Max batch wait field in backend must be a number")
+
+    validate_optional_objects(
+        backend,
+        'queue_depth',
+        int,
+        "Queue depth field in backend must be a whole number")
+
 
 class AppValidatortError(RuntimeError):
     pass
@@ -304,6 +620,7 @@ class AppValidator():
         """
 
         validate_model_parameters(cfg)
+        validate_headless(cfg)
         filters = validate_filters(cfg)
         actions = validate_actions(cfg)
         triggers = validate_triggers(cfg, actions, filters)
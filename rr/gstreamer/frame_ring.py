@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+from collections import deque
+from multiprocessing import shared_memory
+import threading
+
+import numpy as np
+
+default_dimentions = 3
+
+
+class FrameRingError(RuntimeError):
+    pass
+
+
+class FrameRing():
+    """
+    Class that handles a ring of frame slots in shared memory
+
+    The process that creates the ring owns the slots: it acquires a free
+    slot, copies a frame into it and releases the slot once every reader is
+    done with it. Other processes attach to the ring by name and access the
+    slots in place as NumPy views. When no slot is free the frame must be
+    dropped by the caller, the ring never grows.
+
+    Attributes
+    ----------
+    _shm : SharedMemory
+        A private shared memory block holding all the slots
+    _free : deque
+        A private queue with the indices of the free slots
+    _dropped : int
+        A private counter of the frames dropped because the ring was full
+
+    Methods
+    -------
+    acquire()
+        Take a free slot, or None if the ring is full
+    release(slot : int)
+        Return a slot to the ring
+    write(slot : int, data : buffer)
+        Copy frame data into a slot
+    view(slot : int, width : int, height : int)
+        Get a NumPy view of the frame stored in a slot
+    close()
+        Detach from the shared memory and destroy it if owned
+    """
+
+    def __init__(self, slots, slot_size, name=None):
+        """
+        Constructor for the Frame Ring object
+
+        Parameters
+        ----------
+        slots : int
+            The number of frame slots
+        slot_size : int
+            The size in bytes of each slot
+        name : str
+            The name of an existing ring to attach to. A new ring is created
+            if not provided.
+        """
+
+        if slots < 1:
+            raise FrameRingError("Invalid number of slots")
+
+        if slot_size < 1:
+            raise FrameRingError("Invalid slot size")
+
+        self._slots = slots
+        self._slot_size = slot_size
+        self._owner = name is None
+
+        try:
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=self._owner, size=slots * slot_size)
+        except (OSError, ValueError) as e:
+            raise FrameRingError("Unable to map the frame ring") from e
+
+        self._free = deque(range(slots))
+        self._mutex = threading.Lock()
+        self._dropped = 0
+
+    def acquire(self):
+        """Take a free slot
+
+        Returns
+        -------
+        The index of the slot, or None if the ring is full. In that case the
+        frame is counted as dropped.
+        """
+
+        with self._mutex:
+            if not self._free:
+                self._dropped += 1
+                return None
+
+            return self._free.popleft()
+
+    def release(self, slot):
+        """Return a slot to the ring
+
+        Raises
+        ------
+        FrameRingError
+            If the slot is invalid or already free
+        """
+
+        self._check_slot(slot)
+
+        with self._mutex:
+            if slot in self._free:
+                raise FrameRingError("Slot %d is already free" % slot)
+
+            self._free.append(slot)
+
+    def write(self, slot, data):
+        """Copy frame data into a slot
+
+        Raises
+        ------
+        FrameRingError
+            If the slot is invalid or the data does not fit in it
+        """
+
+        self._check_slot(slot)
+
+        data = memoryview(data).cast('B')
+        size = data.nbytes
+        if size > self._slot_size:
+            raise FrameRingError("Frame does not fit in the ring slot")
+
+        offset = slot * self._slot_size
+        self._shm.buf[offset:offset + size] = data
+
+    def view(self, slot, width, height):
+        """Get a writable NumPy view of the RGB frame stored in a slot
+        """
+
+        self._check_slot(slot)
+
+        return np.ndarray(shape=(height, width, default_dimentions),
+                          dtype=np.uint8,
+                          buffer=self._shm.buf,
+                          offset=slot * self._slot_size)
+
+    def get_name(self):
+        return self._shm.name
+
+    def get_slots(self):
+        return self._slots
+
+    def get_slot_size(self):
+        return self._slot_size
+
+    def get_dropped(self):
+        return self._dropped
+
+    def close(self):
+        """Detach from the shared memory and destroy it if owned
+        """
+
+        if self._shm is None:
+            return
+
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def _check_slot(self, slot):
+        if slot is None or slot < 0 or slot >= self._slots:
+            raise FrameRingError("Invalid slot %s" % slot)
@@ -10,6 +10,13 @@ gi.require_version('GLib', '2.0')  # nopep8
 from gi.repository import Gst as gst  # nopep8
 from gi.repository import GLib  # nopep8
 
+from rr.gstreamer.frame_ring import FrameRingError
+from rr.ai.region_of_interest import RegionOfInterest, RegionOfInterestError
+from rr.stream.motion_gate import MotionGate, MotionGateError
+
+# Time to wait for the model size frame matching a display frame
+model_sample_timeout = 10 * gst.MSECOND
+
 
 class GstMediaError(RuntimeError):
     pass
@@ -51,6 +58,12 @@ class GstMedia():
         self.callback = None
         self.callback_sample = None
         self._triggers = []
+        self._frame_ring = None
+        self._inference_fps = None
+        self._motion_gate = None
+        self._roi = None
+        self._model_appsink = None
+        self._model_sample = None
 
     def create_media(self, name, desc):
         """Creates the media object from a string description
@@ -112,6 +125,18 @@ class GstMedia():
 
         self.callback = callback
 
+    def install_frame_ring(self, frame_ring):
+        """Copy every new frame into a slot of a shared memory ring
+
+        Parameters
+        ----------
+        frame_ring : FrameRing
+            The ring to copy the frames to. Frames arriving while the ring
+            is full are dropped.
+        """
+
+        self._frame_ring = frame_ring
+
     def install_buffer_callback(self):
         try:
             appsink = self._pipeline.get_by_name("appsink")
@@ -120,6 +145,35 @@ class GstMedia():
         except AttributeError as e:
             raise GstMediaError("Unable to install buffer callback") from e
 
+        # Optional branch with the frames scaled to the model input size
+        self._model_appsink = self._pipeline.get_by_name("model_appsink")
+
+    def _pull_model_image(self, pts):
+        """Pull the model size image with the same timestamp as a display
+        image, None if the model branch has not delivered it
+        """
+
+        sample = self._model_sample
+        self._model_sample = None
+
+        while sample is None or sample.get_buffer().pts < pts:
+            sample = self._model_appsink.emit(
+                "try-pull-sample", model_sample_timeout)
+            if sample is None:
+                return None
+
+        if sample.get_buffer().pts != pts:
+            # The model branch dropped this frame, keep the newer sample
+            self._model_sample = sample
+            return None
+
+        structure = sample.get_caps().get_structure(0)
+        return GstImage(structure.get_value("width"),
+                        structure.get_value("height"),
+                        structure.get_value("format"),
+                        sample,
+                        self)
+
     def _on_new_buffer(self, appsink, data):
         sample = appsink.emit("pull-sample")
 
@@ -129,12 +183,32 @@ class GstMedia():
                                  caps.get_structure(0).get_value("format")
                                  )
 
+        model_image = None
+        if self._model_appsink is not None:
+            model_image = self._pull_model_image(sample.get_buffer().pts)
+
+        slot = None
+        if self._frame_ring is not None:
+            slot = self._frame_ring.acquire()
+            if slot is None:
+                return gst.FlowReturn.OK
+
         gst_image = GstImage(
             width,
             height,
             format,
             sample,
-            self)
+            self,
+            slot,
+            model_image)
+
+        if slot is not None:
+            try:
+                self._frame_ring.write(slot, gst_image.get_data())
+            except FrameRingError:
+                # Frames that do not fit are passed by value
+                self._frame_ring.release(slot)
+                gst_image.slot = None
 
         self.callback(gst_image)
 
@@ -156,10 +230,55 @@ class GstMedia():
     def get_triggers(self):
         return self._triggers
 
+    def set_inference_fps(self, inference_fps):
+        self._inference_fps = inference_fps
+
+    def get_inference_fps(self):
+        """Getter for the target inference rate of the media: a number of
+        images per second, "auto" or None to infer every image
+        """
+        return self._inference_fps
+
+    def set_motion_gate(self, motion_gate):
+        self._motion_gate = motion_gate
+
+    def get_motion_gate(self):
+        """Getter for the motion gate of the media, None if every image
+        should be considered in motion
+        """
+        return self._motion_gate
+
+    def set_roi(self, roi):
+        self._roi = roi
+
+    def get_roi(self):
+        """Getter for the region of interest to infer, None to infer the
+        whole image
+        """
+        return self._roi
+
     @classmethod
-    def make(cls, desc, all_triggers):
-        pipe = 'uridecodebin uri=%s caps=video/x-h264 ! queue ! h264parse ! avdec_h264 ! queue ! videoconvert ! videoscale ! video/x-raw,width=320,height=240,format=RGB ! appsink emit-signals=true name=appsink' % (
-            desc["uri"])
+    def make(cls, desc, all_triggers, model_size=None, decoder_threads=0):
+        """Creates the media of a stream description
+
+        Parameters
+        ----------
+        model_size : list
+            The model input width and height. If given, and the stream
+            has no region of interest, the pipeline also scales the frames
+            to the model input, so they are not resized again for
+            inference.
+        decoder_threads : int
+            The threads of the video decoder, 0 for one per core
+        """
+
+        if model_size is None or desc.get('roi') is not None:
+            pipe = 'uridecodebin uri=%s caps=video/x-h264 ! queue ! h264parse ! avdec_h264 max-threads=%d ! queue ! videoconvert ! videoscale ! video/x-raw,width=320,height=240,format=RGB ! appsink emit-signals=true name=appsink' % (
+                desc["uri"], decoder_threads)
+        else:
+            pipe = 'uridecodebin uri=%s caps=video/x-h264 ! queue ! h264parse ! avdec_h264 max-threads=%d ! tee name=tee tee. ! queue ! videoconvert ! videoscale ! video/x-raw,width=320,height=240,format=RGB ! appsink emit-signals=true name=appsink tee. ! queue ! videoconvert ! videoscale ! video/x-raw,width=%d,height=%d,format=RGB ! appsink name=model_appsink max-buffers=4 drop=true' % (
+                desc["uri"], decoder_threads, model_size[0], model_size[1])
+
         media = GstMedia()
         media.create_media(desc['id'], pipe)
 
@@ -175,14 +294,28 @@ class GstMedia():
             media_triggers.append(match)
 
         media.set_triggers(media_triggers)
+        media.set_inference_fps(desc.get('inference_fps'))
+
+        try:
+            media.set_motion_gate(MotionGate.make(desc.get('motion_gate')))
+        except MotionGateError as e:
+            raise GstMediaError("Invalid motion gate description") from e
+
+        try:
+            media.set_roi(RegionOfInterest.make(desc.get('roi')))
+        except RegionOfInterestError as e:
+            raise GstMediaError("Invalid region of interest") from e
 
         return media
 
 
 class GstImage():
-    def __init__(self, width, height, format, sample, gst_media_obj):
+    def __init__(self, width, height, format, sample, gst_media_obj,
+                 slot=None, model_image=None):
         self.sample = sample
         self.gst_media_obj = gst_media_obj
+        self.slot = slot
+        self.model_image = model_image
 
         self._gst_memory_obj = None
         self.minfo = None
@@ -213,6 +346,18 @@ class GstImage():
     def get_media(self):
         return self.gst_media_obj
 
+    def get_slot(self):
+        """Getter for the shared memory ring slot holding a copy of the
+        image, None if the image was not copied to a ring
+        """
+        return self.slot
+
+    def get_model_image(self):
+        """Getter for the same image scaled to the model input size by the
+        pipeline, None if the media does not scale it
+        """
+        return self.model_image
+
     def get_timestamp(self):
         sample = self.get_sample()
         buf = sample.get_buffer()
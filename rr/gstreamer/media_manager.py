@@ -34,6 +34,9 @@ class MediaManager():
     stop_media():
         Stop the medias from dictionary
 
+    get_medias():
+        Getter for the medias from dictionary
+
     """
 
     def __init__(self):
@@ -126,5 +129,12 @@ class MediaManager():
             except MediaError as e:
                 raise MediaManagerError("Unable to install callback") from e
 
+    def install_frame_ring(self, frame_ring):
+        for key in self._Dict:
+            self._Dict[key].install_frame_ring(frame_ring)
+
+    def get_medias(self):
+        return list(self._Dict.values())
+
     def _get_media_dict(self):
         return self._Dict
@@ -3,11 +3,14 @@
 #  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
 #           Marisol Zeledon <marisol.zeledon@ridgerun.com>
 
+from bin.utils.getconfig import get_model_params
 from rr.actions.action_manager import ActionManager
 from rr.actions.action_manager import Action, ActionError
 from rr.actions.action_manager import Filter, FilterError
 from rr.actions.action_manager import Trigger, TriggerError
-from rr.ai.ai_manager import AIManagerOnNewImage
+from rr.ai.ai_manager import AIBackend
+from rr.ai.thread_budget import ThreadBudget
+from rr.ai.tiling import Tiler
 from rr.gstreamer.gst_media import GstMedia
 from rr.gstreamer.media_manager import MediaManager
 from rr.stream.stream_manager import StreamManager
@@ -48,17 +51,69 @@ class SmartCCTV:
         self.model = model_params['model']['detection']
         self.disp_width = model_params['disp_width']
         self.disp_height = model_params['disp_height']
+        self.backend = model_params.get('backend')
+        self.tiling = model_params.get('tiling')
+        self.score_floor = self._get_score_floor(model_params, config)
+        self.budget = self._create_thread_budget(
+            model_params, len(config['streams']))
 
         filters = self._parse_filters(config)
         actions = self._parse_actions(config)
         triggers = self._parse_triggers(config, actions, filters)
 
+        model_size = self._get_model_size(model_params)
+
         streams = []
         for stream in config['streams']:
-            streams.append(GstMedia.make(stream, triggers))
+            streams.append(GstMedia.make(
+                stream, triggers, model_size,
+                self.budget.get_decoder_threads()))
 
         return streams
 
+    def _create_thread_budget(self, model_params, streams):
+        """The threads of the run time instances, OpenCV and the decoders,
+        budgeted on the cores
+        """
+
+        # The pool and process backends infer with one run time per worker
+        backend = model_params.get('backend') or {}
+        instances = 1
+        if backend.get('type') in ('pool', 'process'):
+            instances = backend['workers']
+
+        budget = ThreadBudget.make(
+            model_params.get('threads'), streams, instances)
+        budget.apply()
+
+        return budget
+
+    def _get_score_floor(self, model_params, config):
+        """The score below which the detections are dropped right after the
+        inference, None to keep them all
+        """
+
+        # No filter passes a detection below the lowest threshold
+        score_floor = model_params.get('score_floor', 'auto')
+        if score_floor == 'auto':
+            thresholds = [desc['threshold'] for desc in config['filters']]
+            score_floor = min(thresholds, default=None)
+
+        return score_floor
+
+    def _get_model_size(self, model_params):
+        """The model input size the medias scale the frames to, None if
+        the AI manager needs the frames at display size
+        """
+
+        # Tiles are cut from the display frames, and worker processes only
+        # receive the display frames
+        backend = model_params.get('backend') or {}
+        if self.tiling is not None or backend.get('type') == 'process':
+            return None
+
+        return get_model_params(self.model).resize
+
     def _create_media_manager(self, streams):
         media_manager = MediaManager()
 
@@ -68,6 +123,10 @@ class SmartCCTV:
         return media_manager
 
     def _create_display_manager(self, streams):
+        # Nobody watches the streams of headless servers
+        if self.headless:
+            return None
+
         display_manager = DisplayManager()
 
         for stream in streams:
@@ -75,16 +134,33 @@ class SmartCCTV:
 
         return display_manager
 
-    def _create_ai_manager(self, model, disp_width, disp_height):
-        return AIManagerOnNewImage(model, disp_width, disp_height)
+    def _create_ai_manager(self, backend, tiling, model, disp_width,
+                           disp_height):
+        return AIBackend.make(backend, model, disp_width, disp_height,
+                              Tiler.make(tiling), self.budget,
+                              self.score_floor, self.headless)
+
+    def __init__(self, config, headless=False):
+        """
+        Constructor for the Smart CCTV object
+
+        The server is headless if requested here or in the configuration.
+        Headless servers do not draw the predictions nor display the
+        streams, the actions receive the original frames.
+        """
+
+        self.headless = headless or config.get('headless', False)
 
-    def __init__(self, config):
         streams = self._create_streams(config)
         media_manager = self._create_media_manager(streams)
         display_manager = self._create_display_manager(streams)
         action_manager = self._create_action_manager()
         ai_manager = self._create_ai_manager(
-            self.model, self.disp_width, self.disp_height)
+            self.backend,
+            self.tiling,
+            self.model,
+            self.disp_width,
+            self.disp_height)
 
         self._stream_manager = StreamManager(
             action_manager,
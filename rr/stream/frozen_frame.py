@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import zlib
+
+import numpy as np
+
+default_sample_step = 4
+default_frozen_frames = 30
+
+
+class FrozenFrameDetector():
+    """
+    Class that detects repeated images on a stream
+
+    Each image is identified by a checksum of a subsampled view of its
+    data, so only the sampled pixels are copied. An image with the same
+    checksum as the previous one is a duplicate. After a number of
+    consecutive duplicates the stream is considered frozen.
+
+    Attributes
+    ----------
+    _sample_step : int
+        A private subsampling step applied on both image axes
+    _frozen_frames : int
+        A private number of consecutive duplicates to consider the stream
+        frozen
+    _last_hash : int
+        A private checksum of the previous image
+    _repeated : int
+        A private number of consecutive duplicates
+    _duplicates : int
+        A private total number of duplicates
+
+    Methods
+    -------
+    is_duplicate(img : ndarray)
+        Decide if the image repeats the previous one
+    is_frozen()
+        Health signal of the stream
+    get_duplicates()
+        Getter for the total number of duplicates
+    """
+
+    def __init__(self, sample_step=default_sample_step,
+                 frozen_frames=default_frozen_frames):
+        """
+        Constructor for the Frozen Frame Detector object
+        """
+
+        self._sample_step = sample_step
+        self._frozen_frames = frozen_frames
+        self._last_hash = None
+        self._repeated = 0
+        self._duplicates = 0
+
+    def is_duplicate(self, img):
+        """Decide if the image repeats the previous one
+
+        Parameters
+        ----------
+        img : ndarray
+            The HWC image. It is only read.
+
+        Returns
+        -------
+        True if the sampled pixels and the image shape match the previous
+        image
+        """
+
+        sample = np.ascontiguousarray(
+            img[::self._sample_step, ::self._sample_step])
+        frame_hash = zlib.crc32(sample, zlib.crc32(repr(img.shape).encode()))
+
+        if frame_hash != self._last_hash:
+            self._last_hash = frame_hash
+            self._repeated = 0
+            return False
+
+        self._repeated += 1
+        self._duplicates += 1
+        return True
+
+    def is_frozen(self):
+        """Health signal of the stream
+
+        Returns
+        -------
+        True if the latest images repeated the same content for at least
+        the frozen frames threshold
+        """
+
+        return self._repeated >= self._frozen_frames
+
+    def get_duplicates(self):
+        return self._duplicates
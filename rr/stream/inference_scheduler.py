@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import logging
+import time
+
+from bin.utils.imagehandler import ImageHandler
+from rr.stream.frozen_frame import FrozenFrameDetector
+
+
+class InferenceScheduler():
+    """
+    Class that decides which images of each stream are inferred
+
+    Each media may request a target inference rate. Images arriving before
+    the next inference is due are not inferred, they are forwarded with
+    the latest prediction of their stream instead. Medias without a target
+    rate infer every image. Medias with a motion gate also skip the images
+    without motion. Images repeating the previous image of their stream are
+    never inferred, and a stream repeating images for long is reported as
+    frozen.
+
+    Attributes
+    ----------
+    _ai_manager : AIManagerOnNewImage
+        A private AI manager providing the measured latencies
+    _next_inference : dict
+        A private dictionary with the time of the next inference of each
+        stream
+    _inferred : dict
+        A private dictionary with the number of inferred images per stream
+    _skipped : dict
+        A private dictionary with the number of skipped images per stream
+    _frozen_detectors : dict
+        A private dictionary with the frozen frame detector of each stream
+
+    Methods
+    -------
+    should_infer(image : GstImage)
+        Decide if the image should be inferred
+    get_stats(media_name : str)
+        Getter for the inferred and skipped images of a stream
+    is_frozen(media_name : str)
+        Health signal telling if a stream repeats the same image
+    log_stats(medias : list)
+        Log the inferred and skipped images of each media
+    """
+
+    def __init__(self, ai_manager):
+        """
+        Constructor for the Inference Scheduler object
+        """
+
+        self._ai_manager = ai_manager
+        self._next_inference = {}
+        self._inferred = {}
+        self._skipped = {}
+        self._frozen_detectors = {}
+
+    def should_infer(self, image):
+        """Decide if the image should be inferred
+
+        Parameters
+        ----------
+        image : GstImage
+            The new image of a stream. Its media target inference rate is
+            either a number of images per second, "auto" to follow the
+            latency measured by the AI manager, or None to infer every
+            image.
+        """
+
+        media = image.get_media()
+        media_name = media.get_name()
+        target_fps = media.get_inference_fps()
+
+        img = ImageHandler.buffer_to_np_array(
+            image.get_data(), image.get_width(), image.get_height())
+
+        if self._is_duplicate(media_name, img):
+            self._skipped[media_name] = self._skipped.get(media_name, 0) + 1
+            return False
+
+        # The motion gate sees every new image to keep its background updated
+        motion_gate = media.get_motion_gate()
+        if motion_gate is not None and not motion_gate.has_motion(img):
+            self._skipped[media_name] = self._skipped.get(media_name, 0) + 1
+            return False
+
+        now = time.monotonic()
+        if target_fps is not None and now < self._next_inference.get(
+                media_name, 0.0):
+            self._skipped[media_name] = self._skipped.get(media_name, 0) + 1
+            return False
+
+        if target_fps == "auto":
+            interval = self._ai_manager.get_latency(media_name)
+        elif target_fps is not None:
+            interval = 1.0 / target_fps
+        else:
+            interval = 0.0
+
+        self._next_inference[media_name] = now + interval
+        self._inferred[media_name] = self._inferred.get(media_name, 0) + 1
+
+        return True
+
+    def get_stats(self, media_name):
+        """Getter for the inferred and skipped images of a stream
+
+        Returns
+        -------
+        A tuple with the number of inferred and skipped images
+        """
+
+        return (self._inferred.get(media_name, 0),
+                self._skipped.get(media_name, 0))
+
+    def is_frozen(self, media_name):
+        """Health signal telling if a stream repeats the same image
+
+        Returns
+        -------
+        True if the stream has been repeating its latest image
+        """
+
+        detector = self._frozen_detectors.get(media_name)
+
+        return detector is not None and detector.is_frozen()
+
+    def log_stats(self, medias):
+        """Log the inferred and skipped images of each media
+
+        Parameters
+        ----------
+        medias : list
+            The medias to log
+        """
+
+        for media in medias:
+            media_name = media.get_name()
+            inferred, skipped = self.get_stats(media_name)
+            logging.info("Stream %s: %d images inferred, %d skipped" %
+                         (media_name, inferred, skipped))
+
+            detector = self._frozen_detectors.get(media_name)
+            if detector is not None:
+                logging.info("Stream %s: %d duplicated images skipped" %
+                             (media_name, detector.get_duplicates()))
+
+            motion_gate = media.get_motion_gate()
+            if motion_gate is not None:
+                logging.info("Stream %s: %d images skipped without motion" %
+                             (media_name, motion_gate.get_stats()[1]))
+
+    def _is_duplicate(self, media_name, img):
+        detector = self._frozen_detectors.get(media_name)
+        if detector is None:
+            detector = FrozenFrameDetector()
+            self._frozen_detectors[media_name] = detector
+
+        was_frozen = detector.is_frozen()
+        duplicate = detector.is_duplicate(img)
+
+        if detector.is_frozen() and not was_frozen:
+            logging.warning("Stream %s is frozen" % media_name)
+        elif was_frozen and not detector.is_frozen():
+            logging.info("Stream %s recovered" % media_name)
+
+        return duplicate
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import numpy as np
+
+default_downscale = 8
+default_pixel_threshold = 25
+default_learning_rate = 0.05
+
+
+class MotionGateError(RuntimeError):
+    pass
+
+
+class MotionGate():
+    """
+    Class that detects motion on the images of a stream
+
+    The images are subsampled and compared against a running average
+    background model. The motion score is the fraction of subsampled
+    pixels that differ from the background by more than a pixel threshold.
+
+    Attributes
+    ----------
+    _threshold : float
+        A private minimum motion score to consider the image in motion
+    _downscale : int
+        A private subsampling step applied on both image axes
+    _background : ndarray
+        A private running average of the subsampled images
+
+    Methods
+    -------
+    has_motion(img : ndarray)
+        Update the background model and decide if the image has motion
+    get_stats()
+        Getter for the images with and without motion
+    """
+
+    def __init__(self, threshold, downscale=default_downscale,
+                 pixel_threshold=default_pixel_threshold,
+                 learning_rate=default_learning_rate):
+        """
+        Constructor for the Motion Gate object
+        """
+
+        if threshold < 0 or threshold > 1:
+            raise MotionGateError("Invalid motion threshold")
+
+        if downscale < 1:
+            raise MotionGateError("Invalid motion downscale")
+
+        self._threshold = threshold
+        self._downscale = downscale
+        self._pixel_threshold = pixel_threshold
+        self._learning_rate = learning_rate
+
+        self._background = None
+        self._frame = None
+        self._diff = None
+
+        self._inferred = 0
+        self._skipped = 0
+
+    def has_motion(self, img):
+        """Update the background model and decide if the image has motion
+
+        Parameters
+        ----------
+        img : ndarray
+            The HWC image. It is only read.
+
+        Returns
+        -------
+        True if the motion score reaches the threshold, or if there is no
+        background model yet
+        """
+
+        small = img[::self._downscale, ::self._downscale]
+
+        if self._background is None or self._background.shape != small.shape:
+            self._background = small.astype(np.float32)
+            self._frame = np.empty_like(self._background)
+            self._diff = np.empty_like(self._background)
+            self._inferred += 1
+            return True
+
+        np.copyto(self._frame, small, casting='unsafe')
+        np.subtract(self._frame, self._background, out=self._diff)
+
+        # Update the running average with the signed difference
+        self._background += self._learning_rate * self._diff
+
+        np.abs(self._diff, out=self._diff)
+        changed = np.count_nonzero(
+            (self._diff > self._pixel_threshold).any(axis=-1))
+        score = changed / (self._diff.shape[0] * self._diff.shape[1])
+
+        if score < self._threshold:
+            self._skipped += 1
+            return False
+
+        self._inferred += 1
+        return True
+
+    def get_stats(self):
+        """Getter for the images with and without motion
+
+        Returns
+        -------
+        A tuple with the number of images let through to inference and the
+        number of images skipped because of the lack of motion
+        """
+
+        return self._inferred, self._skipped
+
+    @classmethod
+    def make(cls, desc):
+        if desc is None:
+            return None
+
+        try:
+            threshold = desc["threshold"]
+        except KeyError as e:
+            raise MotionGateError("Malformed motion gate description") from e
+
+        return MotionGate(threshold,
+                          desc.get("downscale", default_downscale),
+                          desc.get("pixel_threshold", default_pixel_threshold))
@@ -6,6 +6,7 @@
 
 from rr.ai.ai_manager import AIManagerOnNewImage
 from rr.gstreamer.media_manager import MediaManager
+from rr.stream.inference_scheduler import InferenceScheduler
 
 
 class OnNewImage():
@@ -14,10 +15,14 @@ class OnNewImage():
         self.model = model
         self.disp_width = disp_width
         self.disp_height = disp_height
+        self.scheduler = InferenceScheduler(ai_manager)
 
     def __call__(self, image):
-        self.ai_manager.process_image(
-            image, self.model, self.disp_width, self.disp_height)
+        if self.scheduler.should_infer(image):
+            self.ai_manager.process_image(
+                image, self.model, self.disp_width, self.disp_height)
+        else:
+            self.ai_manager.forward_image(image)
 
 
 class OnNewPrediction():
@@ -27,7 +32,8 @@ class OnNewPrediction():
 
     def __call__(self, prediction, image, media):
         self.action_manager.execute(prediction, image, media)
-        self.display_manager.push_image(image, media)
+        if self.display_manager is not None:
+            self.display_manager.push_image(image, media)
 
 
 class StreamManagerError(RuntimeError):
@@ -56,6 +62,9 @@ class StreamManager():
             disp_height):
         """
         Constructor for the Stream Manager object
+
+        The display manager is None for headless servers, which only
+        execute the actions.
         """
 
         self.ai_manager = ai_manager
@@ -63,8 +72,13 @@ class StreamManager():
         self.action_manager = action_manager
         self.display_manager = display_manager
 
-        cb = OnNewImage(ai_manager, model, disp_width, disp_height)
-        self.media_manager.install_callback(cb)
+        self._on_new_image = OnNewImage(
+            ai_manager, model, disp_width, disp_height)
+        self.media_manager.install_callback(self._on_new_image)
+
+        frame_ring = self.ai_manager.get_frame_ring()
+        if frame_ring is not None:
+            self.media_manager.install_frame_ring(frame_ring)
 
         cb_prediction = OnNewPrediction(action_manager, display_manager)
         self.ai_manager.install_callback(cb_prediction)
@@ -75,7 +89,8 @@ class StreamManager():
         """
 
         try:
-            self.display_manager.play_display()
+            if self.display_manager is not None:
+                self.display_manager.play_display()
             self.media_manager.play_media()
 
         except Exception as e:
@@ -88,7 +103,12 @@ class StreamManager():
 
         try:
             self.media_manager.stop_media()
-            self.display_manager.stop_display()
+            self.ai_manager.stop()
+            if self.display_manager is not None:
+                self.display_manager.stop_display()
+
+            self._on_new_image.scheduler.log_stats(
+                self.media_manager.get_medias())
 
         except Exception as e:
             raise StreamManagerError("Unable to stop the stream") from e
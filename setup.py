@@ -60,7 +60,8 @@ setup(
             "*.tests",
             "*.tests.*",
             "tests.*",
-            "tests"]),
+            "tests",
+            "benchmarks"]),
     scripts=[
         'smartcity.py',
     ],
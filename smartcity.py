@@ -35,6 +35,13 @@ def parse_args():
         default=False,
         action='store_true',
         help='Print full stack trace of errors. Useful for debugging.')
+    parser.add_argument(
+        '--headless',
+        dest='headless',
+        default=False,
+        action='store_true',
+        help='Run without drawing the predictions nor displaying the '
+        'streams, even if the configuration file does not enable it.')
     return parser.parse_args()
 
 
@@ -47,7 +54,7 @@ def main():
 
     try:
         config_dict = config.load(args.config_file)
-        server = SmartCCTV(config_dict)
+        server = SmartCCTV(config_dict, args.headless)
     except Exception as e:
         error(e)
         exit(-1)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+import yaml
+
+from TI.classnames import coco
+from TI.postprocess import PostProcessDetection
+from TI.postprocess import unknown_label
+
+width = 64
+height = 48
+frame_width = 320
+frame_height = 240
+
+
+def create_model(model_dir, label_offset=None):
+    """Write a synthetic param.yaml with the given prediction label offset
+    """
+
+    yaml_params = {
+        'session': {'session_name': 'tflitert',
+                    'model_path': 'model.tflite',
+                    'artifacts_folder': 'artifacts'},
+        'preprocess': {'resize': [width, height],
+                       'crop': [width, height],
+                       'mean': [0, 0, 0],
+                       'scale': [1, 1, 1],
+                       'data_layout': 'NHWC',
+                       'reverse_channels': False},
+        'postprocess': {'formatter': {'src_indices': [0, 1, 2, 3]}},
+        'input_dataset': {'name': 'coco'},
+        'task_type': 'detection'}
+
+    if label_offset is not None:
+        yaml_params['metric'] = {'label_offset_pred': label_offset}
+
+    with open(os.path.join(model_dir, "param.yaml"), "w") as file:
+        yaml.safe_dump(yaml_params, file)
+
+    return model_dir + os.sep
+
+
+def overlay_reference(frame, results, labels, score_thresh, scalex, scaley,
+                      formatter):
+    """Draw the boxes one at a time, as the overlay originally did
+    """
+
+    class_IDs, scores, bounding_boxes = results
+    for i, score in enumerate(np.squeeze(scores, axis=0)):
+        if (score <= score_thresh):
+            continue
+        box = bounding_boxes[0][i]
+        box = [int(box[formatter.index(0)] * scalex),
+               int(box[formatter.index(1)] * scaley),
+               int(box[formatter.index(2)] * scalex),
+               int(box[formatter.index(3)] * scaley)]
+        box_color = (int(120 * score), int(120 * score), int(50 * score))
+        text_color = (int(240 * score), int(240 * score), int(240 * score))
+        cv2.rectangle(frame, (box[0], box[1]),
+                      (box[2], box[3]), box_color, 2)
+        cv2.rectangle(frame,
+                      (int((box[2] + box[0]) / 2) - 5,
+                       int((box[3] + box[1]) / 2) + 5),
+                      (int((box[2] + box[0]) / 2) + 160,
+                       int((box[3] + box[1]) / 2) - 15),
+                      box_color,
+                      -1)
+        cv2.putText(frame,
+                    labels[i],
+                    (int((box[2] + box[0]) / 2),
+                     int((box[3] + box[1]) / 2)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.3,
+                    text_color)
+
+    return frame
+
+
+def create_results(rng, count, max_score=1.0):
+    corners = rng.uniform(-10, max(width, height) + 10, (1, count, 2, 2))
+    boxes = np.concatenate([corners.min(axis=2), corners.max(axis=2)],
+                           axis=-1).astype(np.float32)
+
+    return (rng.integers(0, 91, (1, count)).astype(np.float32),
+            rng.uniform(0, max_score, (1, count)).astype(np.float32),
+            boxes)
+
+
+class TestPostProcessDetection(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.model_dir.cleanup()
+
+    def create_postprocess(self, label_offset=None):
+        # Every model gets its own directory, as the parameters are cached
+        # per directory
+        model_dir = tempfile.mkdtemp(dir=self.model_dir.name)
+
+        return PostProcessDetection(
+            create_model(model_dir, label_offset), width, height)
+
+    def testlabels_no_offset(self):
+        postprocess = self.create_postprocess()
+
+        labels = postprocess.get_labels(np.array([[1, 90, 91, 0]]))
+
+        self.assertEqual([coco[1], coco[90], coco[91], unknown_label],
+                         list(labels))
+
+    def testlabels_int_offset(self):
+        postprocess = self.create_postprocess(1)
+
+        labels = postprocess.get_labels(np.array([[0, 1, 89, 90]]))
+
+        self.assertEqual([coco[1], coco[2], coco[90], coco[91]],
+                         list(labels))
+
+    def testlabels_dict_offset(self):
+        postprocess = self.create_postprocess({0: 1, 1: 3, 3: 91})
+
+        labels = postprocess.get_labels(np.array([[0, 1, 2, 3]]))
+
+        # The IDs missing in the offsets have no label
+        self.assertEqual([coco[1], coco[3], unknown_label, coco[91]],
+                         list(labels))
+
+    def testlabels_out_of_range(self):
+        for label_offset in [None, 1, {0: 1, 1: 2}]:
+            with self.subTest(label_offset=label_offset):
+                postprocess = self.create_postprocess(label_offset)
+
+                labels = postprocess.get_labels(
+                    np.array([[-1, -100, 92, 1000]]))
+
+                self.assertEqual([unknown_label] * 4, list(labels))
+
+    def testlabels_float(self):
+        postprocess = self.create_postprocess(1)
+        class_IDs = np.array([[0, 1, 2]], dtype=np.float32)
+
+        # The class IDs of some runtimes come as a column
+        for class_IDs in [class_IDs, class_IDs[..., np.newaxis]]:
+            with self.subTest(shape=class_IDs.shape):
+                expected = np.copy(class_IDs)
+
+                labels = postprocess.get_labels(class_IDs)
+
+                self.assertEqual([coco[1], coco[2], coco[3]], list(labels))
+                np.testing.assert_array_equal(expected, class_IDs)
+
+    def testlabels_empty(self):
+        postprocess = self.create_postprocess()
+
+        labels = postprocess.get_labels(np.empty((1, 0), dtype=np.float32))
+
+        self.assertEqual((0,), labels.shape)
+
+    def assertOverlay(self, postprocess, results, formatter):
+        rng = np.random.default_rng(0)
+        frame = rng.integers(
+            0, 256, (frame_height, frame_width, 3), dtype=np.uint8)
+        labels = postprocess.get_labels(results[0])
+        scalex = frame_width / width
+        scaley = frame_height / height
+
+        expected = overlay_reference(
+            frame.copy(), results, labels, 0.5, scalex, scaley, formatter)
+        overlay = postprocess.overlay_bounding_box(
+            frame.copy(), results, labels, 0.5, scalex, scaley, formatter)
+
+        np.testing.assert_array_equal(expected, overlay)
+
+    def testoverlay(self):
+        postprocess = self.create_postprocess(1)
+        rng = np.random.default_rng(1)
+
+        for formatter in [[0, 1, 2, 3], [1, 0, 3, 2]]:
+            for frame in range(20):
+                with self.subTest(formatter=formatter, frame=frame):
+                    results = create_results(rng, rng.integers(1, 30))
+                    self.assertOverlay(postprocess, results, formatter)
+
+    def testoverlay_empty(self):
+        postprocess = self.create_postprocess(1)
+        results = create_results(np.random.default_rng(2), 0)
+
+        self.assertOverlay(postprocess, results, [0, 1, 2, 3])
+
+    def testoverlay_below_threshold(self):
+        postprocess = self.create_postprocess(1)
+        results = create_results(np.random.default_rng(3), 10, 0.5)
+
+        # Scores at the threshold are not drawn either
+        results[1][0, ::2] = 0.5
+
+        self.assertOverlay(postprocess, results, [0, 1, 2, 3])
+
+    def testget_postprocessed_image(self):
+        postprocess = self.create_postprocess(1)
+        results = create_results(np.random.default_rng(4), 10)
+        frame = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
+
+        expected = overlay_reference(
+            frame.copy(), results, postprocess.get_labels(results[0]), 0.5,
+            frame_width / width, frame_height / height, [0, 1, 2, 3])
+
+        np.testing.assert_array_equal(
+            expected, postprocess.get_postprocessed_image(frame, results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import itertools
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import yaml
+
+from TI.preprocess import PreProcessDetection
+
+width = 64
+height = 48
+mean = [123.675, 116.28, 103.53]
+scale = [0.017125, 0.017507, 0.017429]
+
+
+def create_model(model_dir, data_layout, reverse_channels,
+                 crop=[width, height]):
+    """Write a synthetic param.yaml with the given input layout
+    """
+
+    yaml_params = {
+        'session': {'session_name': 'tflitert',
+                    'model_path': 'model.tflite',
+                    'artifacts_folder': 'artifacts'},
+        'preprocess': {'resize': [width, height],
+                       'crop': crop,
+                       'mean': mean,
+                       'scale': scale,
+                       'data_layout': data_layout,
+                       'reverse_channels': reverse_channels},
+        'postprocess': {'formatter': {'src_indices': [0, 1, 2, 3]}},
+        'input_dataset': {'name': 'coco'},
+        'task_type': 'detection'}
+
+    with open(os.path.join(model_dir, "param.yaml"), "w") as file:
+        yaml.safe_dump(yaml_params, file)
+
+    return model_dir + os.sep
+
+
+def get_reference(img, data_layout, reverse_channels):
+    """The float tensor given by the original step by step preprocess
+    """
+
+    if not reverse_channels:
+        img = img[:, :, ::-1]
+
+    normalized = (img.astype(np.float32) - np.array(mean, np.float32)) * \
+        np.array(scale, np.float32)
+
+    if data_layout == 'NCHW':
+        normalized = normalized.transpose(2, 0, 1)
+
+    return normalized[np.newaxis]
+
+
+def quantize(tensor, dtype, quantization_scale, zero_point):
+    info = np.iinfo(dtype)
+    if quantization_scale:
+        tensor = tensor / quantization_scale + zero_point
+
+    return np.clip(np.round(tensor), info.min, info.max)
+
+
+class TestPreProcessDetection(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = tempfile.TemporaryDirectory()
+        self.img = np.random.randint(
+            0, 256, (height, width, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.model_dir.cleanup()
+
+    def create_preprocess(self, data_layout, reverse_channels,
+                          normalization='lut'):
+        # Every combination gets its own directory, as the parameters are
+        # cached per directory
+        model_dir = tempfile.mkdtemp(dir=self.model_dir.name)
+        model = create_model(model_dir, data_layout, reverse_channels)
+
+        return PreProcessDetection(model, normalization)
+
+    def testcrop(self):
+        for crop, size in [([32, 24], (32, 24)), (40, (40, 40)),
+                           ([width, height], (width, height))]:
+            with self.subTest(crop=crop):
+                model_dir = tempfile.mkdtemp(dir=self.model_dir.name)
+                preprocess = PreProcessDetection(
+                    create_model(model_dir, 'NHWC', True, crop))
+
+                tensor = preprocess.get_preprocessed_image(self.img)
+
+                self.assertEqual(size, preprocess.size)
+                self.assertEqual((1, size[1], size[0], 3), tensor.shape)
+
+    def testinteger(self):
+        quantizations = {np.uint8: (0.0078125, 128), np.int8: (0.0078125, 0)}
+
+        for dtype, data_layout, reverse_channels in itertools.product(
+                [np.uint8, np.int8], ['NHWC', 'NCHW'], [True, False]):
+            with self.subTest(dtype=dtype, data_layout=data_layout,
+                              reverse_channels=reverse_channels):
+                preprocess = self.create_preprocess(
+                    data_layout, reverse_channels)
+                preprocess.set_input_type(dtype, quantizations[dtype])
+
+                tensor = preprocess.get_preprocessed_image(self.img)
+
+                expected = quantize(
+                    get_reference(self.img, data_layout, reverse_channels),
+                    dtype, *quantizations[dtype])
+                self.assertEqual(np.dtype(dtype), tensor.dtype)
+                self.assertEqual(expected.shape, tensor.shape)
+                self.assertLessEqual(
+                    np.abs(tensor.astype(np.int16) - expected).max(), 1)
+
+    def testinteger_not_quantized(self):
+        for data_layout, reverse_channels in itertools.product(
+                ['NHWC', 'NCHW'], [True, False]):
+            with self.subTest(data_layout=data_layout,
+                              reverse_channels=reverse_channels):
+                preprocess = self.create_preprocess(
+                    data_layout, reverse_channels)
+                preprocess.set_input_type(np.int8)
+
+                tensor = preprocess.get_preprocessed_image(self.img)
+
+                expected = quantize(
+                    get_reference(self.img, data_layout, reverse_channels),
+                    np.int8, 0.0, 0)
+                self.assertLessEqual(
+                    np.abs(tensor.astype(np.int16) - expected).max(), 1)
+
+    def testlut(self):
+        for data_layout, reverse_channels in itertools.product(
+                ['NHWC', 'NCHW'], [True, False]):
+            with self.subTest(data_layout=data_layout,
+                              reverse_channels=reverse_channels):
+                lut = self.create_preprocess(data_layout, reverse_channels)
+                arithmetic = self.create_preprocess(
+                    data_layout, reverse_channels, 'arithmetic')
+
+                tensor = lut.get_preprocessed_image(self.img)
+
+                self.assertEqual(np.float32, tensor.dtype)
+                np.testing.assert_allclose(
+                    arithmetic.get_preprocessed_image(self.img), tensor,
+                    rtol=0, atol=1e-5)
+                np.testing.assert_allclose(
+                    get_reference(self.img, data_layout, reverse_channels),
+                    tensor, rtol=0, atol=1e-5)
+
+    def testlut_out(self):
+        preprocess = self.create_preprocess('NCHW', False)
+        out = preprocess.new_input()
+
+        tensor = preprocess.get_preprocessed_image(self.img, out)
+
+        self.assertIs(out, tensor)
+        np.testing.assert_allclose(
+            get_reference(self.img, 'NCHW', False), out, rtol=0, atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import fractions
+import subprocess
+import sys
+from types import SimpleNamespace
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from TI import runtimes
+from TI.runtimes import RunTimeError
+from TI.runtimes import copy_results
+from TI.runtimes import get_runtime
+from TI.runtimes import get_runtimes
+from TI.runtimes import make_runtime
+from TI.runtimes import onnxrt
+from TI.runtimes import register_runtime
+from TI.runtimes import tflitert
+
+width = 64
+height = 48
+max_detections = 5
+
+
+class MockRunTime:
+    def __init__(self, params, threads=None):
+        self.params = params
+        self.threads = threads
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registered = dict(runtimes._runtimes)
+
+    def tearDown(self):
+        runtimes._runtimes.clear()
+        runtimes._runtimes.update(self.registered)
+
+    def testbuilt_in(self):
+        for name in ['tvmdlr', 'tflitert', 'onnxrt']:
+            self.assertIn(name, get_runtimes())
+
+    def testbuilt_in_not_imported(self):
+        # A fresh interpreter, as other tests may load the libraries
+        code = ("import sys, TI.runtimes; "
+                "print([m for m in ('dlr', 'tflite_runtime', 'onnxruntime') "
+                "if m in sys.modules])")
+        output = subprocess.check_output([sys.executable, "-c", code])
+
+        self.assertEqual(b"[]", output.strip())
+
+    def testregister_class(self):
+        register_runtime('mockrt', MockRunTime)
+
+        self.assertIs(MockRunTime, get_runtime('mockrt'))
+        self.assertIn('mockrt', get_runtimes())
+
+    def testregister_decorator(self):
+        @register_runtime('decoratedrt')
+        class DecoratedRunTime(MockRunTime):
+            pass
+
+        self.assertIs(DecoratedRunTime, get_runtime('decoratedrt'))
+
+    def testregister_path(self):
+        register_runtime('pathrt', 'fractions:Fraction')
+        self.assertEqual('fractions:Fraction', runtimes._runtimes['pathrt'])
+
+        self.assertIs(fractions.Fraction, get_runtime('pathrt'))
+        self.assertIs(fractions.Fraction, runtimes._runtimes['pathrt'])
+
+    def testregister_path_lazy(self):
+        # Registering does not import, only selecting the run time does
+        register_runtime('missingrt', 'not_a_module:RunTime')
+
+        with self.assertRaises(RunTimeError) as e:
+            get_runtime('missingrt')
+
+        self.assertEqual("Unable to load run time missingrt",
+                         str(e.exception))
+
+    def testregister_path_missing_class(self):
+        register_runtime('missingrt', 'fractions:NotAClass')
+
+        with self.assertRaises(RunTimeError):
+            get_runtime('missingrt')
+
+    def testunknown(self):
+        with self.assertRaises(RunTimeError) as e:
+            get_runtime('unknownrt')
+
+        self.assertEqual("Unsupported run time unknownrt", str(e.exception))
+
+    def testmake_runtime(self):
+        register_runtime('mockrt', MockRunTime)
+        params = SimpleNamespace(run_time='mockrt')
+
+        runtime = make_runtime(params)
+        self.assertIsInstance(runtime, MockRunTime)
+        self.assertIs(params, runtime.params)
+        self.assertIsNone(runtime.threads)
+
+        self.assertEqual(2, make_runtime(params, 2).threads)
+
+
+def create_onnxruntime(outputs, input_type='tensor(float)',
+                       input_shape=[1, 3, height, width]):
+    """A stub onnxruntime module whose session returns the given outputs
+    """
+
+    session = mock.Mock()
+    session.get_inputs.return_value = [SimpleNamespace(
+        name='input', type=input_type, shape=input_shape)]
+    session.run.return_value = outputs
+
+    onnxruntime = mock.Mock()
+    onnxruntime.InferenceSession.return_value = session
+
+    return onnxruntime
+
+
+def create_boxes(n):
+    return np.arange(n * 4, dtype=np.float32).reshape(1, n, 4)
+
+
+class TestOnnxRT(unittest.TestCase):
+    def setUp(self):
+        self.params = SimpleNamespace(
+            model_path='model.onnx', task_type='detection',
+            data_layout='NCHW', formatter=[0, 1, 2, 3])
+        self.boxes = create_boxes(3)
+        self.scores = np.array([[0.9, 0.5, 0.1]], dtype=np.float32)
+        self.class_IDs = np.array([[3, 1, 2]], dtype=np.int64)
+
+    def create_runtime(self, outputs, **kwargs):
+        onnxruntime = create_onnxruntime(outputs, **kwargs)
+        with mock.patch.dict(sys.modules, {'onnxruntime': onnxruntime}):
+            return onnxrt(self.params)
+
+    def run_runtime(self, outputs, shape=(1, 3, height, width)):
+        runtime = self.create_runtime(outputs)
+
+        return runtime.run(np.zeros(shape, dtype=np.float32))
+
+    def assertResults(self, results, boxes=None):
+        class_IDs, scores, bounding_boxes = results
+
+        self.assertEqual((1, 3), class_IDs.shape)
+        self.assertEqual((1, 3), scores.shape)
+        self.assertEqual((1, 3, 4), bounding_boxes.shape)
+        np.testing.assert_array_equal(self.class_IDs, class_IDs)
+        np.testing.assert_array_equal(self.scores, scores)
+        np.testing.assert_array_equal(
+            self.boxes if boxes is None else boxes, bounding_boxes)
+
+    def testone_output(self):
+        detections = np.concatenate(
+            [self.boxes, self.scores[..., np.newaxis],
+             self.class_IDs[..., np.newaxis]], axis=-1)
+
+        self.assertResults(self.run_runtime([detections]))
+
+    def testtwo_outputs(self):
+        detections = np.concatenate(
+            [self.boxes, self.scores[..., np.newaxis]], axis=-1)
+
+        self.assertResults(self.run_runtime([detections, self.class_IDs]))
+        self.assertResults(self.run_runtime([self.class_IDs, detections]))
+
+    def testthree_outputs(self):
+        # The labels are told from the scores by their integer type
+        for outputs in [[self.boxes, self.scores, self.class_IDs],
+                        [self.class_IDs, self.boxes, self.scores],
+                        [self.scores, self.class_IDs, self.boxes]]:
+            self.assertResults(self.run_runtime(outputs))
+
+    def testthree_outputs_column(self):
+        outputs = [self.boxes, self.scores.reshape(1, 3, 1),
+                   self.class_IDs.reshape(1, 3, 1)]
+
+        self.assertResults(self.run_runtime(outputs))
+
+    def testunsupported_outputs(self):
+        for outputs in [[], [self.boxes, self.boxes, self.scores],
+                        [self.boxes, self.scores, self.class_IDs,
+                         self.scores]]:
+            with self.subTest(outputs=len(outputs)):
+                with self.assertRaises(RunTimeError):
+                    self.run_runtime(outputs)
+
+    def testnormalized(self):
+        self.params.normalized_detections = True
+        self.params.formatter = [1, 0, 3, 2]
+        outputs = [self.boxes, self.scores, self.class_IDs]
+
+        # The boxes come as y1, x1, y2, x2 with respect to the input size
+        expected = self.boxes * \
+            np.array([height, width, height, width], dtype=np.float32)
+
+        for data_layout, shape in [('NCHW', (1, 3, height, width)),
+                                   ('NHWC', (1, height, width, 3))]:
+            with self.subTest(data_layout=data_layout):
+                self.params.data_layout = data_layout
+
+                self.assertResults(
+                    self.run_runtime(outputs, shape), expected)
+
+    def testnot_detection(self):
+        self.params.task_type = 'classification'
+        outputs = [np.zeros((1, 1000), dtype=np.float32)]
+
+        self.assertIs(outputs, self.run_runtime(outputs))
+
+    def testrun_batch(self):
+        boxes = np.concatenate([self.boxes, self.boxes + 100])
+        scores = np.concatenate([self.scores, self.scores])
+        class_IDs = np.concatenate([self.class_IDs, self.class_IDs])
+        runtime = self.create_runtime([boxes, scores, class_IDs],
+                                      input_shape=['batch', 3, height, width])
+        inputs = [np.zeros((1, 3, height, width), dtype=np.float32)] * 2
+
+        results = runtime.run_batch(inputs)
+
+        self.assertEqual(2, len(results))
+        self.assertResults(results[0])
+        self.assertResults(results[1], self.boxes + 100)
+
+    def testinput_type(self):
+        runtime = self.create_runtime([], input_type='tensor(uint8)')
+        self.assertEqual((np.uint8, (0.0, 0)), runtime.get_input_type())
+
+        with self.assertRaises(RunTimeError):
+            self.create_runtime([], input_type='tensor(double)')
+
+
+def create_detections(value):
+    """The normalized boxes, class IDs and scores the stub interpreter
+    gives for an input filled with the value, and their valid count
+    """
+
+    detections = value + np.arange(max_detections, dtype=np.float32)
+    boxes = (detections[:, np.newaxis] +
+             np.arange(4, dtype=np.float32)) / 1000
+    scores = (detections % 10) / 10
+
+    return boxes, detections, scores, value % (max_detections + 1)
+
+
+class MockInterpreter:
+    """A stub TFLite interpreter with the SSD post-process outputs, whose
+    detections depend on the first value of each input
+    """
+
+    def __init__(self, model_path, experimental_delegates=None,
+                 num_threads=None, dynamic_batch=True):
+        self.dynamic_batch = dynamic_batch
+        self.shape = (1, height, width, 3)
+        self.outputs = None
+
+    def allocate_tensors(self):
+        batch = self.shape[0]
+        self.outputs = [
+            np.zeros((batch, max_detections, 4), dtype=np.float32),
+            np.zeros((batch, max_detections), dtype=np.float32),
+            np.zeros((batch, max_detections), dtype=np.float32),
+            np.zeros(batch, dtype=np.float32)]
+
+    def resize_tensor_input(self, index, shape):
+        if not self.dynamic_batch:
+            raise ValueError("Cannot resize a static input")
+        self.shape = tuple(shape)
+
+    def get_input_details(self):
+        signature = (-1 if self.dynamic_batch else 1,) + self.shape[1:]
+
+        return [{'index': 0, 'dtype': np.uint8,
+                 'shape': np.array(self.shape),
+                 'shape_signature': np.array(signature),
+                 'quantization': (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{'index': i + 1, 'shape': np.array(output.shape),
+                 'dtype': output.dtype}
+                for i, output in enumerate(self.outputs)]
+
+    def set_tensor(self, index, value):
+        if (value.shape != self.shape):
+            raise ValueError("Cannot set tensor: Dimension mismatch")
+        self.input = value
+
+    def invoke(self):
+        for i in range(self.shape[0]):
+            boxes, class_IDs, scores, count = create_detections(
+                int(self.input[i].flat[0]))
+            self.outputs[0][i] = boxes
+            self.outputs[1][i] = class_IDs
+            self.outputs[2][i] = scores
+            self.outputs[3][i] = count
+
+    def tensor(self, index):
+        return lambda: self.outputs[index - 1]
+
+
+class TestTFLiteRT(unittest.TestCase):
+    def setUp(self):
+        self.params = SimpleNamespace(
+            model_path='model.tflite', artifacts='artifacts',
+            task_type='detection')
+
+    def create_runtime(self, dynamic_batch=True):
+        interpreter = mock.Mock()
+        interpreter.load_delegate.return_value = None
+        interpreter.Interpreter = lambda *args, **kwargs: MockInterpreter(
+            *args, dynamic_batch=dynamic_batch, **kwargs)
+        tflite_runtime = mock.Mock(interpreter=interpreter)
+
+        with mock.patch.dict(sys.modules, {
+                'tflite_runtime': tflite_runtime,
+                'tflite_runtime.interpreter': interpreter}):
+            return tflitert(self.params)
+
+    def create_input(self, value):
+        return np.full((1, height, width, 3), value, dtype=np.uint8)
+
+    def assertResults(self, value, results):
+        boxes, class_IDs, scores, count = create_detections(value)
+        class_IDs2, scores2, bounding_boxes2 = results
+
+        self.assertEqual((1, count), class_IDs2.shape)
+        self.assertEqual((1, count), scores2.shape)
+        self.assertEqual((1, count, 4), bounding_boxes2.shape)
+        np.testing.assert_array_equal(class_IDs[:count], class_IDs2[0])
+        np.testing.assert_array_equal(scores[:count], scores2[0])
+        np.testing.assert_allclose(boxes[:count] * width, bounding_boxes2[0])
+
+    def testrun(self):
+        runtime = self.create_runtime()
+
+        # Scaled to the input width and truncated to the valid detections
+        for value in [0, 3, 5]:
+            with self.subTest(value=value):
+                self.assertResults(
+                    value, runtime.run(self.create_input(value)))
+
+    def testrun_overwritten(self):
+        runtime = self.create_runtime()
+
+        results = runtime.run(self.create_input(4))
+        kept = copy_results(results)
+
+        runtime.run(self.create_input(10))
+
+        # The results are read into buffers reused by the next run
+        boxes = create_detections(10)[0]
+        np.testing.assert_allclose(boxes[:4] * width, results[2][0])
+        self.assertResults(4, kept)
+
+    def testrun_batch_count(self):
+        runtime = self.create_runtime()
+        values = [1, 5, 0, 3]
+
+        results = runtime.run_batch(
+            [self.create_input(value) for value in values])
+
+        self.assertEqual(len(values), len(results))
+        for value, input_results in zip(values, results):
+            self.assertResults(value, input_results)
+
+    def testrun_after_batch(self):
+        runtime = self.create_runtime()
+
+        self.assertResults(2, runtime.run(self.create_input(2)))
+
+        results = runtime.run_batch(
+            [self.create_input(value) for value in [1, 3, 4]])
+        for value, input_results in zip([1, 3, 4], results):
+            self.assertResults(value, input_results)
+
+        # The input goes back to a single image
+        self.assertResults(3, runtime.run(self.create_input(3)))
+        self.assertEqual(1, runtime.input_details[0]['shape'][0])
+
+        results = runtime.run_batch(
+            [self.create_input(value) for value in [5, 2]])
+        for value, input_results in zip([5, 2], results):
+            self.assertResults(value, input_results)
+
+    def testrun_batch_static(self):
+        runtime = self.create_runtime(dynamic_batch=False)
+
+        results = runtime.run_batch(
+            [self.create_input(value) for value in [1, 3, 4]])
+
+        for value, input_results in zip([1, 3, 4], results):
+            self.assertResults(value, input_results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,11 +6,13 @@
 import unittest
 from unittest.mock import MagicMock
 
+import numpy as np
 
 from rr.actions.action_manager import ActionManager
 from rr.actions.action_manager import Action, ActionError
 from rr.actions.action_manager import Filter, FilterError
 from rr.actions.action_manager import Trigger, TriggerError
+from rr.ai.detections import Detections
 
 
 class TestFilter(unittest.TestCase):
@@ -66,6 +68,36 @@ class TestFilter(unittest.TestCase):
 
         self.common(self._desc, pred, False)
 
+    def test_detections(self):
+        pred = Detections(np.array([1, 2]),
+                          np.array([0.9, 0.6], dtype=np.float32),
+                          np.zeros((2, 4), dtype=np.float32),
+                          np.array(["snake", "dog"], dtype=object))
+        self.common(self._desc, pred, True)
+
+        pred.scores[1] = 0.4
+        self.common(self._desc, pred, False)
+
+        self.common(self._desc, Detections.empty(), False)
+
+    def test_detections_column(self):
+        # Some runtimes give (1, N, 1) class IDs and scores
+        results = (np.array([[[1], [2]]], dtype=np.float32),
+                   np.array([[[0.9], [0.6]]], dtype=np.float32),
+                   np.zeros((1, 2, 4), dtype=np.float32))
+
+        pred = Detections.from_results(
+            results, np.array(["snake", "dog"], dtype=object))
+        self.common(self._desc, pred, True)
+
+        pred = Detections.from_results(
+            results, np.array(["dog", "snake"], dtype=object))
+        self.common(self._desc, pred, True)
+
+        pred = Detections.from_results(
+            results, np.array(["snake", "snake"], dtype=object))
+        self.common(self._desc, pred, False)
+
 
 class TestAction(unittest.TestCase):
 
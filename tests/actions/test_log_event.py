@@ -7,7 +7,11 @@ import unittest
 
 import csv
 import os
+
+import numpy as np
+
 from rr.actions.log_event import LogEvent, LogEventError
+from rr.ai.detections import Detections
 
 
 class mockMedia():
@@ -84,6 +88,28 @@ class TestLogEvent(unittest.TestCase):
             self.assertEqual(first_row_ret, next(reader))
             self.assertEqual(second_row_ret, next(reader))
 
+    def test_log_detections(self):
+        media = mockMedia('test_media_name')
+        image = mockImage('2021-07-27 12:00:20')
+        inf_results = Detections(
+            np.array([3, 7]),
+            np.array([0.75, 0.5], dtype=np.float32),
+            np.array([[1, 2, 3, 4], [5, 6, 7, 8]], dtype=np.float32),
+            np.array(['ZZZZ', 'XXXX'], dtype=object))
+
+        log_action = LogEvent("name", self.csv_file_good)
+        log_action.execute(media, image, inf_results, [mockFilter()])
+
+        with open(self.csv_file_good) as f:
+            reader = csv.reader(f)
+            self.assertEqual(log_action._fieldnames, next(reader))
+            self.assertEqual(
+                ['test_media_name', '2021-07-27 12:00:20', 'ZZZZ', '0.75',
+                 '1.0', '2.0', '3.0', '4.0'], next(reader))
+            self.assertEqual(
+                ['test_media_name', '2021-07-27 12:00:20', 'XXXX', '0.5',
+                 '5.0', '6.0', '7.0', '8.0'], next(reader))
+
     def test_log_no_parent_dir(self):
         no_parent = 'tests/actions/no/parent/dir/test_log.csv'
 
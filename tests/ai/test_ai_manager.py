@@ -13,8 +13,12 @@ from unittest.mock import MagicMock
 from TI.postprocess import PostProcessDetection
 from TI.preprocess import PreProcessDetection
 from rr.ai.ai_manager import AIManager
+from rr.ai.ai_manager import AIManagerBatch
 from rr.ai.ai_manager import AIManagerError
 from rr.ai.ai_manager import AIManagerOnNewImage
+from rr.ai.ai_manager import AIManagerPipeline
+from rr.ai.ai_manager import AIManagerProcessPool
+from rr.ai.ai_manager import AIManagerWorkerPool
 from rr.config.app_config_loader import AppConfigLoader
 from rr.gstreamer.gst_media import GstImage
 from rr.gstreamer.gst_media import GstMedia
@@ -49,6 +53,29 @@ class MockImage():
         return self.real_img
 
 
+def create_mock_gst_image(img):
+    h, w, c = img.shape
+    size = h * w * c
+
+    image = MagicMock()
+    image.get_data = MagicMock(return_value=img)
+    image.get_width = MagicMock(return_value=w)
+    image.get_height = MagicMock(return_value=h)
+
+    gst_media_obj = GstMedia()
+    desc = "videotestsrc is-live=true ! fakesink async=false"
+    gst_media_obj.create_media("name", desc)
+    image.get_media = MagicMock(return_value=gst_media_obj)
+
+    buf = GstUtils.buffer_new_wrapped_full(img.tobytes(), size)
+    sample = GstUtils.sample_new(buf, None)
+    image.get_sample = MagicMock(return_value=sample)
+    image.get_slot = MagicMock(return_value=None)
+    image.get_model_image = MagicMock(return_value=None)
+
+    return image
+
+
 class TestAIManager(unittest.TestCase):
     def setUp(self):
         global width, height, color
@@ -134,6 +161,242 @@ class TestAIManagerOnNewImage(unittest.TestCase):
         self.ai_manager.process_image(
             image, self.model, self.disp_width, self.disp_height)
 
+    def testforward_image(self):
+        image = create_mock_gst_image(self.img)
+        media_name = image.get_media().get_name()
+
+        cb = MagicMock()
+        self.ai_manager.install_callback(cb)
+
+        # Without a previous prediction the image is passed as is
+        self.ai_manager.forward_image(image)
+        cb.assert_called_with({"instances": []}, image, image.get_media())
+
+        self.ai_manager.process_image(
+            image, self.model, self.disp_width, self.disp_height)
+        prediction = cb.call_args[0][0]
+        self.assertTrue(0 < self.ai_manager.get_latency(media_name))
+
+        self.ai_manager.forward_image(image)
+        self.assertEqual(prediction, cb.call_args[0][0])
+
+    def testprocess_image_owned(self):
+        image = create_mock_gst_image(self.img)
+        runtime = self.ai_manager.inference_obj._runtimes[0]
+        run_runtime = runtime.run
+        outputs = []
+
+        def run(img):
+            results = run_runtime(img)
+            outputs.append(results)
+            return results
+
+        # The pools are shared by the process
+        runtime.run = run
+        self.addCleanup(delattr, runtime, 'run')
+        cb = MagicMock()
+        self.ai_manager.install_callback(cb)
+
+        self.ai_manager.process_image(
+            image, self.model, self.disp_width, self.disp_height)
+        prediction = cb.call_args[0][0]
+        scores = np.copy(prediction.scores)
+        boxes = np.copy(prediction.boxes)
+
+        # The next inference may reuse the result buffers of the runtime
+        for result in outputs[0]:
+            result[...] = 0
+
+        np.testing.assert_array_equal(scores, prediction.scores)
+        np.testing.assert_array_equal(boxes, prediction.boxes)
+
+
+class TestAIManagerWorkerPool(unittest.TestCase):
+    def setUp(self):
+        config_obj = AppConfigLoader()
+        config_dict = config_obj.load(default_config_file)
+        model_params = config_dict['model_params']
+
+        self.model = model_params['model']['detection']
+        self.disp_width = model_params['disp_width']
+        self.disp_height = model_params['disp_height']
+
+        self.mock_image = MockImage(width, height, color)
+        self.img = self.mock_image.get_image()
+
+        self.ai_manager = AIManagerWorkerPool(
+            self.model,
+            self.disp_width,
+            self.disp_height,
+            2,
+            4)
+
+    def tearDown(self):
+        self.ai_manager.stop()
+
+    def testprocess_image(self):
+        image = create_mock_gst_image(self.img)
+
+        cb = MagicMock()
+        self.ai_manager.install_callback(cb)
+        for i in range(4):
+            self.ai_manager.process_image(
+                image, self.model, self.disp_width, self.disp_height)
+        self.ai_manager.stop()
+
+        self.assertEqual(4, cb.call_count)
+
+    def testinvalid_workers(self):
+        with self.assertRaises(AIManagerError):
+            AIManagerWorkerPool(
+                self.model, self.disp_width, self.disp_height, 0, 4)
+
+
+class TestAIManagerBatch(unittest.TestCase):
+    def setUp(self):
+        config_obj = AppConfigLoader()
+        config_dict = config_obj.load(default_config_file)
+        model_params = config_dict['model_params']
+
+        self.model = model_params['model']['detection']
+        self.disp_width = model_params['disp_width']
+        self.disp_height = model_params['disp_height']
+
+        self.mock_image = MockImage(width, height, color)
+        self.img = self.mock_image.get_image()
+
+        self.ai_manager = AIManagerBatch(
+            self.model,
+            self.disp_width,
+            self.disp_height,
+            4,
+            0.05,
+            8)
+
+    def tearDown(self):
+        self.ai_manager.stop()
+
+    def testprocess_image(self):
+        image = create_mock_gst_image(self.img)
+
+        cb = MagicMock()
+        self.ai_manager.install_callback(cb)
+        for i in range(4):
+            self.ai_manager.process_image(
+                image, self.model, self.disp_width, self.disp_height)
+        self.ai_manager.stop()
+
+        self.assertEqual(4, cb.call_count)
+        self.assertTrue(0 < self.ai_manager.get_occupancy() <= 1)
+
+    def testinvalid_batch_size(self):
+        with self.assertRaises(AIManagerError):
+            AIManagerBatch(
+                self.model, self.disp_width, self.disp_height, 0, 0.05, 8)
+
+
+class TestAIManagerPipeline(unittest.TestCase):
+    def setUp(self):
+        config_obj = AppConfigLoader()
+        config_dict = config_obj.load(default_config_file)
+        model_params = config_dict['model_params']
+
+        self.model = model_params['model']['detection']
+        self.disp_width = model_params['disp_width']
+        self.disp_height = model_params['disp_height']
+
+        self.mock_image = MockImage(width, height, color)
+        self.img = self.mock_image.get_image()
+
+        self.ai_manager = AIManagerPipeline(
+            self.model,
+            self.disp_width,
+            self.disp_height,
+            2)
+
+    def tearDown(self):
+        self.ai_manager.stop()
+
+    def testprocess_image_order(self):
+        images = [create_mock_gst_image(self.img) for i in range(4)]
+
+        received = []
+
+        def cb(prediction, image, media):
+            received.append(media)
+
+        self.ai_manager.install_callback(cb)
+        for image in images:
+            self.ai_manager.process_image(
+                image, self.model, self.disp_width, self.disp_height)
+        self.ai_manager.stop()
+
+        self.assertEqual([image.get_media() for image in images], received)
+
+    def testinvalid_queue_depth(self):
+        with self.assertRaises(AIManagerError):
+            AIManagerPipeline(
+                self.model, self.disp_width, self.disp_height, 0)
+
+
+class TestAIManagerProcessPool(unittest.TestCase):
+    def setUp(self):
+        config_obj = AppConfigLoader()
+        config_dict = config_obj.load(default_config_file)
+        model_params = config_dict['model_params']
+
+        self.model = model_params['model']['detection']
+        self.disp_width = model_params['disp_width']
+        self.disp_height = model_params['disp_height']
+
+        self.mock_image = MockImage(width, height, color)
+        self.img = self.mock_image.get_image()
+
+        self.ai_manager = AIManagerProcessPool(
+            self.model,
+            self.disp_width,
+            self.disp_height,
+            2,
+            4)
+
+    def tearDown(self):
+        self.ai_manager.stop()
+
+    def testprocess_image(self):
+        image = create_mock_gst_image(self.img)
+
+        cb = MagicMock()
+        self.ai_manager.install_callback(cb)
+        for i in range(4):
+            self.ai_manager.process_image(
+                image, self.model, self.disp_width, self.disp_height)
+        self.ai_manager.stop()
+
+        self.assertEqual(4, cb.call_count)
+
+    def testforward_image_slots(self):
+        frame_ring = self.ai_manager.get_frame_ring()
+
+        cb = MagicMock()
+        self.ai_manager.install_callback(cb)
+
+        # More skipped frames than slots, as the medias take a slot for
+        # every frame
+        for i in range(3 * frame_ring.get_slots()):
+            slot = frame_ring.acquire()
+            self.assertIsNotNone(slot)
+
+            image = create_mock_gst_image(self.img)
+            image.get_slot = MagicMock(return_value=slot)
+            self.ai_manager.forward_image(image)
+
+        self.assertEqual(3 * frame_ring.get_slots(), cb.call_count)
+
+    def testinvalid_workers(self):
+        with self.assertRaises(AIManagerError):
+            AIManagerProcessPool(
+                self.model, self.disp_width, self.disp_height, 0, 4)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import unittest
+
+import numpy as np
+
+from rr.ai.ai_worker import prune_results
+
+
+def create_results():
+    return (np.array([[1, 2, 3]], dtype=np.float32),
+            np.array([[0.9, 0.05, 0.4]], dtype=np.float32),
+            np.array([[[10, 20, 30, 40], [50, 60, 70, 80],
+                       [15, 25, 35, 45]]], dtype=np.float32))
+
+
+class TestPruneResults(unittest.TestCase):
+    def testprune(self):
+        results, retained, pruned = prune_results(create_results(), 0.4)
+
+        class_IDs, scores, bounding_boxes = results
+        self.assertEqual(2, retained)
+        self.assertEqual(1, pruned)
+        np.testing.assert_array_equal([[1, 3]], class_IDs)
+        np.testing.assert_array_equal(
+            [[0.9, 0.4]], np.float64(scores).round(6))
+        np.testing.assert_array_equal(
+            [[[10, 20, 30, 40], [15, 25, 35, 45]]], bounding_boxes)
+
+    def testprune_column(self):
+        class_IDs, scores, bounding_boxes = create_results()
+
+        results, retained, pruned = prune_results(
+            (class_IDs[..., np.newaxis], scores[..., np.newaxis],
+             bounding_boxes), 0.4)
+
+        class_IDs, scores, bounding_boxes = results
+        self.assertEqual(2, retained)
+        self.assertEqual(1, pruned)
+        np.testing.assert_array_equal([[1, 3]], class_IDs)
+        np.testing.assert_array_equal(
+            [[0.9, 0.4]], np.float64(scores).round(6))
+        np.testing.assert_array_equal(
+            [[[10, 20, 30, 40], [15, 25, 35, 45]]], bounding_boxes)
+
+    def testprune_all(self):
+        results, retained, pruned = prune_results(create_results(), 0.95)
+
+        class_IDs, scores, bounding_boxes = results
+        self.assertEqual(0, retained)
+        self.assertEqual(3, pruned)
+        self.assertEqual((1, 0), scores.shape)
+        self.assertEqual((1, 0, 4), bounding_boxes.shape)
+
+    def testkeep_all(self):
+        results, retained, pruned = prune_results(create_results(), 0)
+
+        self.assertEqual(3, retained)
+        self.assertEqual(0, pruned)
+        np.testing.assert_array_equal(create_results()[2], results[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import pickle
+import unittest
+
+import numpy as np
+
+from rr.ai.detections import Detections
+
+
+def create_results():
+    return (np.array([[1, 2]], dtype=np.float32),
+            np.array([[0.9, 0.4]], dtype=np.float32),
+            np.array([[[10, 20, 30, 40], [50, 60, 70, 80]]],
+                     dtype=np.float32))
+
+
+class TestDetections(unittest.TestCase):
+    def testfrom_results(self):
+        detections = Detections.from_results(
+            create_results(), "car", "stream0", 1000)
+
+        self.assertEqual(2, len(detections))
+        np.testing.assert_array_equal([1, 2], detections.class_ids)
+        np.testing.assert_array_equal([0.9, 0.4], np.float64(
+            detections.scores).round(6))
+        self.assertEqual((2, 4), detections.boxes.shape)
+        self.assertEqual(["car", "car"], list(detections.labels))
+        self.assertEqual("stream0", detections.stream)
+        self.assertEqual(1000, detections.timestamp)
+
+    def testfrom_results_column(self):
+        class_IDs, scores, bounding_boxes = create_results()
+
+        detections = Detections.from_results(
+            (class_IDs[..., np.newaxis], scores[..., np.newaxis],
+             bounding_boxes), np.array(["car", "bus"], dtype=object))
+
+        self.assertEqual(2, len(detections))
+        self.assertEqual((2,), detections.class_ids.shape)
+        self.assertEqual((2,), detections.scores.shape)
+        self.assertEqual((2, 4), detections.boxes.shape)
+        self.assertEqual(
+            [0.9, 0.4], [round(p["labels"][0]["probability"], 6)
+                         for p in detections["instances"]])
+
+    def testto_dict(self):
+        detections = Detections.from_results(create_results(), "car")
+
+        prediction = detections.to_dict()
+        self.assertIs(prediction, detections.to_dict())
+
+        self.assertEqual(2, len(prediction["instances"]))
+        instance = prediction["instances"][0]
+        self.assertEqual("car", instance["labels"][0]["label"])
+        self.assertAlmostEqual(0.9, instance["labels"][0]["probability"],
+                               places=6)
+        self.assertEqual({"x": 10, "y": 20, "width": 30, "height": 40},
+                         instance["bbox"])
+
+        # Legacy callers index the detections like the dictionary
+        self.assertIs(prediction["instances"], detections["instances"])
+
+    def testempty(self):
+        detections = Detections.empty("stream0")
+
+        self.assertEqual(0, len(detections))
+        self.assertEqual({"instances": []}, detections)
+        self.assertEqual(detections, {"instances": []})
+
+    def testslots(self):
+        detections = Detections.empty()
+
+        with self.assertRaises(AttributeError):
+            detections.other = None
+
+    def testpickle(self):
+        detections = Detections.from_results(
+            create_results(), "car", "stream0", 1000)
+
+        self.assertEqual(detections, pickle.loads(pickle.dumps(detections)))
+
+
+if __name__ == '__main__':
+    unittest.main()
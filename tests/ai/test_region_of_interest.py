@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import threading
+import unittest
+
+import numpy as np
+
+from rr.ai.region_of_interest import RegionOfInterest, RegionOfInterestError
+
+width = 320
+height = 240
+resize = [300, 300]
+formatter = (0, 1, 2, 3)
+
+
+def create_results(boxes):
+    boxes = np.array([boxes], dtype=np.float32)
+    class_IDs = np.zeros((1, boxes.shape[1]), dtype=np.float32)
+    scores = np.ones((1, boxes.shape[1]), dtype=np.float32)
+
+    return class_IDs, scores, boxes
+
+
+class TestRegionOfInterest(unittest.TestCase):
+    def setUp(self):
+        self.img = np.random.randint(
+            0, 256, (height, width, 3), dtype=np.uint8)
+
+    def testcrop_rect(self):
+        roi = RegionOfInterest(rect=[40, 20, 100, 60])
+
+        cropped = roi.crop(self.img)
+
+        self.assertEqual((60, 100, 3), cropped.shape)
+        self.assertTrue(np.shares_memory(cropped, self.img))
+        np.testing.assert_array_equal(self.img[20:80, 40:140], cropped)
+
+    def testcrop_clipped(self):
+        roi = RegionOfInterest(rect=[300, 200, 100, 100])
+        self.assertEqual((40, 20, 3), roi.crop(self.img).shape)
+
+        outside = RegionOfInterest(rect=[400, 300, 10, 10])
+        self.assertEqual(self.img.shape, outside.crop(self.img).shape)
+
+    def testcrop_polygon(self):
+        roi = RegionOfInterest(polygon=[[0, 0], [100, 0], [0, 100]])
+
+        cropped = roi.crop(self.img)
+
+        self.assertEqual((101, 101, 3), cropped.shape)
+        np.testing.assert_array_equal(self.img[10, 10], cropped[10, 10])
+        np.testing.assert_array_equal([0, 0, 0], cropped[90, 90])
+
+    def testcrop_polygon_threads(self):
+        roi = RegionOfInterest(polygon=[[0, 0], [100, 0], [0, 100]])
+        expected = roi.crop(self.img)
+        small = np.random.randint(0, 256, (60, 80, 3), dtype=np.uint8)
+        expected_small = roi.crop(small)
+        errors = []
+
+        # Frames of different sizes make the threads rebuild the mask
+        def crop(img, expected):
+            try:
+                for i in range(200):
+                    np.testing.assert_array_equal(expected, roi.crop(img))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=crop, args=args)
+                   for args in [(self.img, expected), (small, expected_small)]
+                   for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+
+    def testmap_results(self):
+        roi = RegionOfInterest(rect=[160, 120, 160, 120])
+
+        # A box covering the whole region in model input coordinates
+        results = create_results([[0, 0, 300, 300]])
+        class_IDs, scores, boxes = roi.map_results(
+            results, self.img.shape, resize, formatter)
+
+        np.testing.assert_allclose([[[150, 150, 300, 300]]], boxes)
+        self.assertIs(results[1], scores)
+
+    def testmap_results_formatter(self):
+        roi = RegionOfInterest(rect=[160, 0, 160, 240])
+
+        # Boxes given as y1, x1, y2, x2
+        results = create_results([[0, 0, 300, 300]])
+        class_IDs, scores, boxes = roi.map_results(
+            results, self.img.shape, resize, (1, 0, 3, 2))
+
+        np.testing.assert_allclose([[[0, 150, 300, 300]]], boxes)
+
+    def testinvalid(self):
+        with self.assertRaises(RegionOfInterestError):
+            RegionOfInterest()
+
+        with self.assertRaises(RegionOfInterestError):
+            RegionOfInterest(rect=[0, 0, 0, 10])
+
+        with self.assertRaises(RegionOfInterestError):
+            RegionOfInterest(polygon=[[0, 0], [1, 1]])
+
+    def testmake(self):
+        self.assertIsNone(RegionOfInterest.make(None))
+        self.assertIsInstance(
+            RegionOfInterest.make({'rect': [0, 0, 10, 10]}), RegionOfInterest)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from rr.ai.runtime_pool import RunTimePool, RunTimePoolError
+from TI.runtimes import copy_results
+
+
+class MockRunTime():
+    """
+    Run time reusing a single result buffer, like tflitert
+    """
+
+    def __init__(self):
+        self.scores = np.zeros((1, 1), dtype=np.float32)
+
+    def get_input_type(self):
+        return np.uint8, (1 / 128, 128)
+
+    def run(self, input_img):
+        self.scores[0, 0] = input_img
+        return (self.scores,)
+
+    def run_batch(self, input_imgs):
+        return [(np.copy(self.run(input_img)[0]),)
+                for input_img in input_imgs]
+
+
+class TestRunTimePool(unittest.TestCase):
+    def testcheckout(self):
+        runtimes = [MockRunTime(), MockRunTime()]
+        pool = RunTimePool(None, runtimes=runtimes)
+
+        first = pool.checkout()
+        second = pool.checkout()
+        self.assertIsNot(first, second)
+
+        with self.assertRaises(RunTimePoolError):
+            pool.checkout(timeout=0)
+
+        pool.checkin(first)
+        self.assertIs(first, pool.checkout(timeout=0))
+
+    def testcheckin_invalid(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime()])
+
+        with self.assertRaises(RunTimePoolError):
+            pool.checkin(MockRunTime())
+
+        runtime = pool.checkout()
+        pool.checkin(runtime)
+
+        with self.assertRaises(RunTimePoolError):
+            pool.checkin(runtime)
+
+    def testrun_copies_shared_results(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime(), MockRunTime()])
+
+        first = pool.run(1)
+        second = pool.run(2)
+        third = pool.run(3)
+
+        self.assertEqual(1, first[0][0, 0])
+        self.assertEqual(2, second[0][0, 0])
+        self.assertEqual(3, third[0][0, 0])
+        self.assertEqual(2, pool.get_instances())
+
+    def testrun_single_instance(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime()])
+
+        # A single user reads the results before the next run
+        first = pool.run(1)
+        pool.run(2)
+        self.assertEqual(2, first[0][0, 0])
+
+        # Once shared, another user may run the instance in between
+        self.assertIs(pool, pool.share())
+        first = pool.run(1)
+        pool.run(2)
+        self.assertEqual(1, first[0][0, 0])
+
+    def testrun_owned(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime()])
+
+        first = pool.run(1, owned=True)
+        pool.run(2)
+        self.assertEqual(1, first[0][0, 0])
+
+        first = pool.run_batch([1, 2], owned=True)
+        pool.run_batch([3, 4])
+        self.assertEqual([1, 2], [results[0][0, 0] for results in first])
+
+    def testrun_copies_once(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime(), MockRunTime()])
+
+        with mock.patch('rr.ai.runtime_pool.copy_results',
+                        side_effect=copy_results) as copy:
+            pool.run(1, owned=True)
+            self.assertEqual(1, copy.call_count)
+
+            pool.run_batch([1, 2], owned=True)
+            self.assertEqual(3, copy.call_count)
+
+    def testrun_concurrent(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime(), MockRunTime()])
+        results = {}
+
+        def infer(value):
+            results[value] = pool.run(value)[0][0, 0]
+
+        threads = [threading.Thread(target=infer, args=(value,))
+                   for value in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({value: value for value in range(8)}, results)
+
+    def testinput_type(self):
+        pool = RunTimePool(None, runtimes=[MockRunTime()])
+
+        self.assertEqual((np.uint8, (1 / 128, 128)), pool.get_input_type())
+
+    def testinvalid(self):
+        with self.assertRaises(RunTimePoolError):
+            RunTimePool(None, instances=0)
+
+        with self.assertRaises(RunTimePoolError):
+            RunTimePool(None, runtimes=[])
+
+
+if __name__ == '__main__':
+    unittest.main()
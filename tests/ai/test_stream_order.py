@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import random
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from rr.ai.stream_order import StreamOrder
+
+
+def create_image(stream):
+    media = MagicMock()
+    media.get_name = MagicMock(return_value=stream)
+
+    image = MagicMock()
+    image.get_media = MagicMock(return_value=media)
+
+    return image
+
+
+class TestStreamOrder(unittest.TestCase):
+    def setUp(self):
+        self.order = StreamOrder()
+        self.delivered = []
+
+    def deliver(self, name):
+        return lambda: self.delivered.append(name)
+
+    def testin_order(self):
+        images = [create_image("stream0") for i in range(3)]
+        for image in images:
+            self.order.enter(image)
+
+        for i, image in enumerate(images):
+            self.order.leave(image, self.deliver(i))
+
+        self.assertEqual([0, 1, 2], self.delivered)
+
+    def testout_of_order(self):
+        images = [create_image("stream0") for i in range(3)]
+        for image in images:
+            self.order.enter(image)
+
+        self.order.leave(images[2], self.deliver(2))
+        self.order.leave(images[1], self.deliver(1))
+        self.assertEqual([], self.delivered)
+
+        self.order.leave(images[0], self.deliver(0))
+        self.assertEqual([0, 1, 2], self.delivered)
+
+    def testdrop(self):
+        images = [create_image("stream0") for i in range(3)]
+        for image in images:
+            self.order.enter(image)
+
+        self.order.leave(images[2], self.deliver(2))
+        self.order.leave(images[0])
+        self.assertEqual([], self.delivered)
+
+        self.order.leave(images[1], self.deliver(1))
+        self.assertEqual([1, 2], self.delivered)
+
+    def teststreams(self):
+        first = create_image("stream0")
+        second = create_image("stream1")
+        self.order.enter(first)
+        self.order.enter(second)
+
+        self.order.leave(second, self.deliver("stream1"))
+        self.assertEqual(["stream1"], self.delivered)
+
+        self.order.leave(first, self.deliver("stream0"))
+        self.assertEqual(["stream1", "stream0"], self.delivered)
+
+    def testsame_image(self):
+        image = create_image("stream0")
+        self.order.enter(image)
+        self.order.enter(image)
+
+        self.order.leave(image, self.deliver(0))
+        self.order.leave(image, self.deliver(1))
+
+        self.assertEqual([0, 1], self.delivered)
+
+    def testnot_entered(self):
+        self.order.leave(create_image("stream0"), self.deliver(0))
+
+        self.assertEqual([0], self.delivered)
+
+    def testleave_while_delivering(self):
+        images = [create_image("stream0") for i in range(3)]
+        for image in images:
+            self.order.enter(image)
+
+        delivering = threading.Event()
+        release = threading.Event()
+
+        def deliver_slowly():
+            delivering.set()
+            release.wait()
+            self.delivered.append(0)
+
+        thread = threading.Thread(
+            target=self.order.leave, args=(images[0], deliver_slowly))
+        thread.start()
+        delivering.wait()
+
+        def leave():
+            self.order.leave(images[2], self.deliver(2))
+            self.order.leave(images[1], self.deliver(1))
+
+        # The images left ready return while the first one is delivered
+        leaving = threading.Thread(target=leave)
+        leaving.start()
+        leaving.join(5)
+        returned = not leaving.is_alive()
+        self.assertEqual([], self.delivered)
+
+        release.set()
+        thread.join()
+        leaving.join()
+
+        self.assertTrue(returned)
+
+        self.assertEqual([0, 1, 2], self.delivered)
+
+    def testthreads(self):
+        images = [create_image("stream0") for i in range(200)]
+        for image in images:
+            self.order.enter(image)
+
+        shuffled = list(enumerate(images))
+        random.shuffle(shuffled)
+
+        def leave(items):
+            for i, image in items:
+                self.order.leave(image, self.deliver(i))
+
+        threads = [threading.Thread(target=leave, args=(shuffled[i::4],))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(list(range(200)), self.delivered)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import unittest
+
+import cv2
+
+from rr.ai.thread_budget import ThreadBudget, ThreadBudgetError
+
+
+class TestThreadBudget(unittest.TestCase):
+    def testderived_runtime_threads(self):
+        budget = ThreadBudget(streams=2, instances=2, cores=8)
+
+        # 8 cores - 1 OpenCV - 2 decoders, split by 2 instances
+        self.assertEqual(2, budget.get_runtime_threads())
+        self.assertEqual(7, budget.get_total())
+
+    def testminimum_runtime_threads(self):
+        budget = ThreadBudget(streams=8, instances=4, cores=4)
+
+        self.assertEqual(1, budget.get_runtime_threads())
+        self.assertEqual(13, budget.get_total())
+
+    def testexplicit_threads(self):
+        budget = ThreadBudget(streams=1, instances=1, cores=4,
+                              runtime_threads=3, opencv_threads=2,
+                              decoder_threads=2)
+
+        self.assertEqual(3, budget.get_runtime_threads())
+        self.assertEqual(2, budget.get_opencv_threads())
+        self.assertEqual(2, budget.get_decoder_threads())
+
+    def testapply(self):
+        threads = cv2.getNumThreads()
+        try:
+            ThreadBudget(streams=1, cores=4, opencv_threads=2).apply()
+            self.assertEqual(2, cv2.getNumThreads())
+        finally:
+            cv2.setNumThreads(threads)
+
+    def testmake(self):
+        budget = ThreadBudget.make(
+            {'cores': 16, 'decoder': 2}, streams=4, instances=2)
+
+        self.assertEqual(16, budget.get_cores())
+        self.assertEqual(3, budget.get_runtime_threads())
+
+        budget = ThreadBudget.make(None, streams=1)
+        self.assertGreaterEqual(budget.get_runtime_threads(), 1)
+
+    def testinvalid(self):
+        with self.assertRaises(ThreadBudgetError):
+            ThreadBudget(streams=1, cores=0)
+
+        with self.assertRaises(ThreadBudgetError):
+            ThreadBudget(streams=1, instances=0)
+
+        with self.assertRaises(ThreadBudgetError):
+            ThreadBudget(streams=1, opencv_threads=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
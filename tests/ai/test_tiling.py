@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import unittest
+
+import numpy as np
+
+from rr.ai.tiling import Tiler, TilerError, non_max_suppression
+
+resize = [300, 300]
+formatter = (0, 1, 2, 3)
+
+
+def create_results(class_IDs, scores, boxes):
+    return (np.array([class_IDs], dtype=np.float32),
+            np.array([scores], dtype=np.float32),
+            np.array([boxes], dtype=np.float32).reshape(1, -1, 4))
+
+
+class TestNonMaxSuppression(unittest.TestCase):
+    def testoverlapping(self):
+        results = create_results(
+            [1, 1, 1],
+            [0.6, 0.9, 0.8],
+            [[0, 0, 100, 100], [5, 5, 105, 105], [200, 200, 250, 250]])
+
+        class_IDs, scores, boxes = non_max_suppression(results, formatter, 0.5)
+
+        np.testing.assert_allclose([[0.9, 0.8]], scores)
+        np.testing.assert_allclose(
+            [[[5, 5, 105, 105], [200, 200, 250, 250]]], boxes)
+
+    def testdifferent_classes(self):
+        results = create_results(
+            [1, 2], [0.9, 0.8], [[0, 0, 100, 100], [0, 0, 100, 100]])
+
+        class_IDs, scores, boxes = non_max_suppression(results, formatter, 0.5)
+
+        np.testing.assert_allclose([[1, 2]], class_IDs)
+
+    def testempty(self):
+        results = create_results([], [], [])
+
+        class_IDs, scores, boxes = non_max_suppression(results, formatter, 0.5)
+
+        self.assertEqual((1, 0), scores.shape)
+
+
+class TestTiler(unittest.TestCase):
+    def testgrid(self):
+        tiler = Tiler(grid=[2, 2], overlap=0.2)
+
+        rects = tiler.get_rects((240, 320, 3), resize)
+
+        self.assertEqual(4, len(rects))
+        self.assertEqual((0, 0), rects[0][:2])
+        self.assertEqual((320, 240), rects[-1][2:])
+
+        # Neighbour tiles overlap
+        self.assertLess(rects[1][0], rects[0][2])
+        self.assertLess(rects[2][1], rects[0][3])
+
+    def testderived_grid(self):
+        tiler = Tiler(overlap=0.2, max_tiles=16)
+
+        self.assertEqual(1, len(tiler.get_rects((240, 300, 3), resize)))
+        self.assertEqual(2, len(tiler.get_rects((240, 320, 3), resize)))
+
+        # A 6x3 grid of model sized tiles, capped to 5x3
+        self.assertEqual(15, len(tiler.get_rects((720, 1280, 3), resize)))
+
+    def testmax_tiles(self):
+        tiler = Tiler(grid=[4, 4], max_tiles=6)
+
+        self.assertLessEqual(len(tiler.get_rects((720, 1280, 3), resize)), 6)
+
+    def testsplit(self):
+        tiler = Tiler(grid=[2, 1], overlap=0.5)
+        img = np.random.randint(0, 256, (240, 300, 3), dtype=np.uint8)
+
+        tiles = tiler.split(img, resize)
+
+        self.assertEqual(2, len(tiles))
+        self.assertEqual((240, 200, 3), tiles[0].shape)
+        self.assertTrue(np.shares_memory(tiles[0], img))
+
+    def testmerge(self):
+        tiler = Tiler(grid=[2, 1], overlap=0.5)
+        img_shape = (240, 300, 3)
+
+        # The same object seen by both tiles, in model input coordinates
+        results = [create_results([1], [0.9], [[150, 0, 300, 150]]),
+                   create_results([1], [0.7], [[0, 0, 150, 150]])]
+
+        class_IDs, scores, boxes = tiler.merge(
+            results, img_shape, resize, formatter)
+
+        np.testing.assert_allclose([[0.9]], scores)
+        np.testing.assert_allclose([[[100, 0, 200, 150]]], boxes)
+
+    def testmerge_min_score(self):
+        tiler = Tiler(grid=[2, 1], overlap=0.5, min_score=0.5)
+
+        results = [create_results([1], [0.2], [[0, 0, 10, 10]]),
+                   create_results([1], [0.7], [[0, 0, 10, 10]])]
+
+        class_IDs, scores, boxes = tiler.merge(
+            results, (240, 300, 3), resize, formatter)
+
+        np.testing.assert_allclose([[0.7]], scores)
+
+    def testmerge_column(self):
+        tiler = Tiler(grid=[2, 1], overlap=0.5, min_score=0.5)
+        results = []
+        for score in [0.2, 0.7]:
+            class_IDs, scores, boxes = create_results(
+                [1], [score], [[0, 0, 10, 10]])
+            results.append((class_IDs[..., np.newaxis],
+                            scores[..., np.newaxis], boxes))
+
+        class_IDs, scores, boxes = tiler.merge(
+            results, (240, 300, 3), resize, formatter)
+
+        np.testing.assert_allclose([[1]], class_IDs)
+        np.testing.assert_allclose([[0.7]], scores)
+        self.assertEqual((1, 1, 4), boxes.shape)
+
+    def testinvalid(self):
+        with self.assertRaises(TilerError):
+            Tiler(grid=[0, 2])
+
+        with self.assertRaises(TilerError):
+            Tiler(overlap=1)
+
+        with self.assertRaises(TilerError):
+            Tiler(max_tiles=0)
+
+    def testmake(self):
+        self.assertIsNone(Tiler.make(None))
+        self.assertIsInstance(Tiler.make({'grid': [2, 2]}), Tiler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@
 
 import unittest
 
-from rr.config.app_validator import AppValidator, AppValidatortError, validate_streams, validate_filters, validate_actions, validate_triggers
+from rr.config.app_validator import AppValidator, AppValidatortError, validate_streams, validate_filters, validate_actions, validate_triggers, validate_backend, validate_inference_fps, validate_motion_gate, validate_roi, validate_tiling, validate_threads, validate_score_floor, validate_headless
 
 
 class TestYamlFormat(unittest.TestCase):
@@ -103,6 +103,81 @@ class TestYamlFormat(unittest.TestCase):
             "Streams attempts to use the test trigger but it is not defined anywhere", str(
                 e4.exception))
 
+    def test_inference_fps(self):
+        self.assertEqual(None, validate_inference_fps({'id': 'stream0'}))
+        self.assertEqual(None, validate_inference_fps({'inference_fps': 5}))
+        self.assertEqual(
+            None, validate_inference_fps({'inference_fps': 2.5}))
+        self.assertEqual(
+            None, validate_inference_fps({'inference_fps': 'auto'}))
+
+        for invalid in [0, -1, 'fast', True]:
+            with self.assertRaises(AppValidatortError) as e:
+                validate_inference_fps({'inference_fps': invalid})
+
+            self.assertEqual(
+                "Inference fps field in stream must be a positive number or auto", str(
+                    e.exception))
+
+    def test_motion_gate(self):
+        self.assertEqual(None, validate_motion_gate({'id': 'stream0'}))
+        self.assertEqual(None, validate_motion_gate(
+            {'motion_gate': {'threshold': 0.02}}))
+        self.assertEqual(None, validate_motion_gate(
+            {'motion_gate': {'threshold': 0.02, 'downscale': 4,
+                             'pixel_threshold': 30}}))
+
+        invalid = [
+            ({'motion_gate': 0.02},
+             "Found motion gate field in stream, but it is not a dictionary"),
+            ({'motion_gate': {'downscale': 4}},
+             "Threshold field not found in motion gate"),
+            ({'motion_gate': {'threshold': 'low'}},
+             "Threshold field in motion gate must be a number"),
+            ({'motion_gate': {'threshold': 2}},
+             "Threshold field in motion gate must be between 0 and 1"),
+            ({'motion_gate': {'threshold': 0.02, 'downscale': 2.5}},
+             "Downscale field in motion gate must be a whole number"),
+        ]
+
+        for stream, msg in invalid:
+            with self.assertRaises(AppValidatortError) as e:
+                validate_motion_gate(stream)
+
+            self.assertEqual(msg, str(e.exception))
+
+    def test_roi(self):
+        self.assertEqual(None, validate_roi({'id': 'stream0'}))
+        self.assertEqual(None, validate_roi(
+            {'roi': {'rect': [10, 20, 100, 50]}}))
+        self.assertEqual(None, validate_roi(
+            {'roi': {'polygon': [[0, 0], [100, 0], [50, 80]]}}))
+
+        invalid = [
+            ({'roi': [0, 0, 10, 10]},
+             "Found roi field in stream, but it is not a dictionary"),
+            ({'roi': {}},
+             "Roi field in stream must have either a rect or a polygon"),
+            ({'roi': {'rect': [0, 0, 10, 10], 'polygon': [[0, 0]]}},
+             "Roi field in stream must have either a rect or a polygon"),
+            ({'roi': {'rect': [0, 0, 10]}},
+             "Rect field in roi must be a list with x, y, width and height"),
+            ({'roi': {'rect': [0, 0, 10.5, 10]}},
+             "Rect field in roi must contain whole numbers"),
+            ({'roi': {'rect': [0, 0, 0, 10]}},
+             "Rect field in roi must have a positive width and height"),
+            ({'roi': {'polygon': [[0, 0], [10, 10]]}},
+             "Polygon field in roi must be a list of at least 3 vertices"),
+            ({'roi': {'polygon': [[0, 0], [10, 10], [5]]}},
+             "Found vertex in roi polygon, but it is not an x, y pair"),
+        ]
+
+        for stream, msg in invalid:
+            with self.assertRaises(AppValidatortError) as e:
+                validate_roi(stream)
+
+            self.assertEqual(msg, str(e.exception))
+
     def test_filters(self):
         cfg_good = {'filters': [{'name': 'person_filter',
                                  'labels': ['male', 'child'], 'threshold': 0.7}]}
@@ -465,6 +540,145 @@ class TestYamlFormat(unittest.TestCase):
             "Triggers attempts to use the test filter but it is not defined anywhere", str(
                 e4.exception))
 
+    def test_backend(self):
+        params_no_backend = {'disp_width': 320}
+        params_serial = {'backend': {'type': 'serial'}}
+        params_pool = {'backend': {'type': 'pool', 'workers': 2}}
+        params_batch = {'backend': {
+            'type': 'batch', 'max_batch_size': 4, 'max_batch_wait': 0.01}}
+
+        self.assertEqual(None, validate_backend(params_no_backend))
+        self.assertEqual(None, validate_backend(params_serial))
+        self.assertEqual(None, validate_backend(params_pool))
+        self.assertEqual(None, validate_backend(params_batch))
+
+    def test_tiling(self):
+        self.assertEqual(None, validate_tiling({}))
+        self.assertEqual(None, validate_tiling({'tiling': {}}))
+        self.assertEqual(None, validate_tiling(
+            {'tiling': {'grid': [2, 2], 'overlap': 0.25, 'max_tiles': 4,
+                        'nms_threshold': 0.5, 'min_score': 0.2}}))
+
+        invalid = [
+            ({'tiling': [2, 2]},
+             "Found tiling field in model parameters, but it is not a dictionary"),
+            ({'tiling': {'grid': 2}},
+             "Grid field in tiling must be a list with columns and rows"),
+            ({'tiling': {'grid': [2, 1.5]}},
+             "Grid field in tiling must contain whole numbers"),
+            ({'tiling': {'grid': [0, 2]}},
+             "Grid field in tiling must have at least one column and row"),
+            ({'tiling': {'overlap': '0.2'}},
+             "Overlap field in tiling must be a number"),
+            ({'tiling': {'overlap': 1}},
+             "Overlap field in tiling must be between 0 and 1"),
+            ({'tiling': {'max_tiles': 0}},
+             "Max tiles field in tiling must be a positive number"),
+        ]
+
+        for params, msg in invalid:
+            with self.assertRaises(AppValidatortError) as e:
+                validate_tiling(params)
+
+            self.assertEqual(msg, str(e.exception))
+
+    def test_threads(self):
+        self.assertEqual(None, validate_threads({}))
+        self.assertEqual(None, validate_threads({'threads': {}}))
+        self.assertEqual(None, validate_threads(
+            {'threads': {'cores': 8, 'runtime': 2, 'opencv': 1,
+                         'decoder': 1}}))
+
+        invalid = [
+            ({'threads': 4},
+             "Found threads field in model parameters, but it is not a dictionary"),
+            ({'threads': {'cores': 2.5}},
+             "Cores field in threads must be a whole number"),
+            ({'threads': {'runtime': 0}},
+             "Runtime field in threads must be a positive number"),
+            ({'threads': {'decoder': '1'}},
+             "Decoder field in threads must be a whole number"),
+        ]
+
+        for params, msg in invalid:
+            with self.assertRaises(AppValidatortError) as e:
+                validate_threads(params)
+
+            self.assertEqual(msg, str(e.exception))
+
+    def test_score_floor(self):
+        self.assertEqual(None, validate_score_floor({}))
+        self.assertEqual(None, validate_score_floor({'score_floor': 'auto'}))
+        self.assertEqual(None, validate_score_floor({'score_floor': 0.3}))
+        self.assertEqual(None, validate_score_floor({'score_floor': 0}))
+
+        msg = "Score floor field in model parameters must be a number " \
+            "between 0 and 1 or auto"
+        for score_floor in ['low', 1.5, -0.1, True]:
+            with self.assertRaises(AppValidatortError) as e:
+                validate_score_floor({'score_floor': score_floor})
+
+            self.assertEqual(msg, str(e.exception))
+
+    def test_headless(self):
+        self.assertEqual(None, validate_headless({}))
+        self.assertEqual(None, validate_headless({'headless': True}))
+
+        with self.assertRaises(AppValidatortError) as e:
+            validate_headless({'headless': 'yes'})
+
+        self.assertEqual(
+            "Found headless field, but it is not a boolean",
+            str(e.exception))
+
+    def test_backend_errors(self):
+        params_invalid_backend = {'backend': 'pool'}
+        params_missing_type = {'backend': {'workers': 2}}
+        params_missing_workers = {'backend': {'type': 'pool'}}
+        params_invalid_depth = {'backend': {
+            'type': 'pool', 'workers': 2, 'queue_depth': '4'}}
+        params_missing_batch_size = {'backend': {
+            'type': 'batch', 'max_batch_wait': 0.01}}
+        params_invalid_batch_wait = {'backend': {
+            'type': 'batch', 'max_batch_size': 4, 'max_batch_wait': '0.01'}}
+
+        with self.assertRaises(AppValidatortError) as e1:
+            validate_backend(params_invalid_backend)
+
+        with self.assertRaises(AppValidatortError) as e2:
+            validate_backend(params_missing_type)
+
+        with self.assertRaises(AppValidatortError) as e3:
+            validate_backend(params_missing_workers)
+
+        with self.assertRaises(AppValidatortError) as e4:
+            validate_backend(params_invalid_depth)
+
+        with self.assertRaises(AppValidatortError) as e5:
+            validate_backend(params_missing_batch_size)
+
+        with self.assertRaises(AppValidatortError) as e6:
+            validate_backend(params_invalid_batch_wait)
+
+        self.assertEqual(
+            "Found backend field in model parameters, but it is not a dictionary", str(
+                e1.exception))
+        self.assertEqual(
+            "Type field not found in backend", str(
+                e2.exception))
+        self.assertEqual(
+            "Workers field not found in backend of type pool", str(
+                e3.exception))
+        self.assertEqual(
+            "Queue depth field in backend must be a whole number", str(
+                e4.exception))
+        self.assertEqual(
+            "Max batch size field not found in backend of type batch", str(
+                e5.exception))
+        self.assertEqual(
+            "Max batch wait field in backend must be a number", str(
+                e6.exception))
+
     def test_validate(self):
         self.validator = AppValidator()
         cfg = {'model_params': {'disp_width': 320,
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import numpy as np
+import unittest
+
+from rr.gstreamer.frame_ring import FrameRing
+from rr.gstreamer.frame_ring import FrameRingError
+
+width = 8
+height = 4
+slots = 2
+slot_size = width * height * 3
+
+
+class TestFrameRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = FrameRing(slots, slot_size)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def testwrite_view(self):
+        img = np.arange(slot_size, dtype=np.uint8).reshape((height, width, 3))
+
+        slot = self.ring.acquire()
+        self.ring.write(slot, img.tobytes())
+
+        self.assertTrue(np.array_equal(
+            img, self.ring.view(slot, width, height)))
+
+    def testattach(self):
+        img = np.full((height, width, 3), 7, dtype=np.uint8)
+
+        slot = self.ring.acquire()
+        self.ring.write(slot, img.data)
+
+        reader = FrameRing(slots, slot_size, self.ring.get_name())
+        view = reader.view(slot, width, height)
+        self.assertTrue(np.array_equal(img, view))
+
+        # Writes through the view are seen by the owner
+        view[:] = 3
+        del view
+        reader.close()
+
+        self.assertTrue(np.all(self.ring.view(slot, width, height) == 3))
+
+    def testfull_ring_drops(self):
+        first = self.ring.acquire()
+        second = self.ring.acquire()
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(None, self.ring.acquire())
+        self.assertEqual(1, self.ring.get_dropped())
+
+        self.ring.release(first)
+        self.assertEqual(first, self.ring.acquire())
+
+    def testrelease_errors(self):
+        slot = self.ring.acquire()
+        self.ring.release(slot)
+
+        with self.assertRaises(FrameRingError):
+            self.ring.release(slot)
+
+        with self.assertRaises(FrameRingError):
+            self.ring.release(slots)
+
+    def testwrite_too_big(self):
+        slot = self.ring.acquire()
+
+        with self.assertRaises(FrameRingError):
+            self.ring.write(slot, bytes(slot_size + 1))
+
+    def testinvalid_ring(self):
+        with self.assertRaises(FrameRingError):
+            FrameRing(0, slot_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@ gi.require_version('GLib', '2.0')  # nopep8
 from gi.repository import Gst as gst
 from gi.repository import GLib
 
+import threading
 import unittest
 
 from rr.gstreamer.gst_media import GstMedia
@@ -61,6 +62,42 @@ class TestGstMedia(unittest.TestCase):
         assert self.gstmedia.get_media() is None, "Failed to delete the media object properly"
 
 
+class TestGstMediaModelImage(unittest.TestCase):
+    def setUp(self):
+        self.desc = "videotestsrc is-live=true ! tee name=tee " \
+            "tee. ! queue ! videoconvert ! videoscale ! " \
+            "video/x-raw,width=320,height=240,format=RGB ! " \
+            "appsink emit-signals=true name=appsink " \
+            "tee. ! queue ! videoconvert ! videoscale ! " \
+            "video/x-raw,width=300,height=300,format=RGB ! " \
+            "appsink name=model_appsink max-buffers=4 drop=true"
+        self.name = "test_media"
+
+        self.gstmedia = GstMedia()
+        self.gstmedia.create_media(self.name, self.desc)
+
+    def testmodel_image(self):
+        received = threading.Event()
+        images = []
+
+        def on_new_image(image):
+            if image.get_model_image() is not None:
+                images.append(image)
+                received.set()
+
+        self.gstmedia.install_callback(on_new_image)
+        self.gstmedia.play_media()
+        self.assertTrue(received.wait(5))
+        self.gstmedia.stop_media()
+
+        image = images[0]
+        model_image = image.get_model_image()
+        self.assertEqual(320, image.get_width())
+        self.assertEqual(300, model_image.get_width())
+        self.assertEqual(300, model_image.get_height())
+        self.assertEqual(image.get_timestamp(), model_image.get_timestamp())
+
+
 class TestGstMediaFail(unittest.TestCase):
     def testcreate_media(self):
         # Force desc to make media fail
@@ -35,6 +35,9 @@ class TestMediaManager(unittest.TestCase):
 
         self.assertEqual(self.media, dict[self.key])
 
+    def testget_medias(self):
+        self.assertEqual([self.media], self.media_manager.get_medias())
+
     def testremove_media(self):
         dict = self.media_manager._get_media_dict()
 
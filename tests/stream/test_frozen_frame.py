@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import unittest
+
+import numpy as np
+
+from rr.stream.frozen_frame import FrozenFrameDetector
+
+width = 64
+height = 48
+
+
+def random_frame():
+    return np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+class TestFrozenFrameDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = FrozenFrameDetector(frozen_frames=3)
+
+    def testduplicate(self):
+        img = random_frame()
+
+        self.assertFalse(self.detector.is_duplicate(img))
+        self.assertTrue(self.detector.is_duplicate(img.copy()))
+        self.assertFalse(self.detector.is_duplicate(random_frame()))
+        self.assertEqual(1, self.detector.get_duplicates())
+
+    def testsampled_change(self):
+        img = random_frame()
+        self.detector.is_duplicate(img)
+
+        changed = img.copy()
+        changed[0, 0] = 255 - changed[0, 0]
+        self.assertFalse(self.detector.is_duplicate(changed))
+
+    def testshape_change(self):
+        img = np.zeros((height, width, 3), dtype=np.uint8)
+        self.detector.is_duplicate(img)
+
+        self.assertFalse(self.detector.is_duplicate(img[:, :32]))
+
+    def testfrozen(self):
+        img = random_frame()
+
+        for i in range(3):
+            self.detector.is_duplicate(img)
+            self.assertFalse(self.detector.is_frozen())
+
+        self.detector.is_duplicate(img)
+        self.assertTrue(self.detector.is_frozen())
+
+        self.detector.is_duplicate(random_frame())
+        self.assertFalse(self.detector.is_frozen())
+
+
+if __name__ == '__main__':
+    unittest.main()
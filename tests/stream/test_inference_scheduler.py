@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from rr.stream.inference_scheduler import InferenceScheduler
+from rr.stream.motion_gate import MotionGate
+
+width = 64
+height = 48
+
+
+def random_frame():
+    return np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def create_mock_image(media_name, inference_fps, motion_gate=None,
+                      img=None):
+    media = MagicMock()
+    media.get_name = MagicMock(return_value=media_name)
+    media.get_inference_fps = MagicMock(return_value=inference_fps)
+    media.get_motion_gate = MagicMock(return_value=motion_gate)
+
+    image = MagicMock()
+    image.get_media = MagicMock(return_value=media)
+    if img is None:
+        image.get_data = MagicMock(
+            side_effect=lambda: random_frame().tobytes())
+    else:
+        image.get_data = MagicMock(return_value=img.tobytes())
+    image.get_width = MagicMock(return_value=width)
+    image.get_height = MagicMock(return_value=height)
+
+    return image
+
+
+class TestInferenceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.ai_manager = MagicMock()
+        self.ai_manager.get_latency = MagicMock(return_value=0.0)
+
+        self.scheduler = InferenceScheduler(self.ai_manager)
+
+    def testno_target(self):
+        image = create_mock_image("media", None)
+
+        for i in range(5):
+            self.assertTrue(self.scheduler.should_infer(image))
+
+        self.assertEqual((5, 0), self.scheduler.get_stats("media"))
+
+    def testtarget_fps(self):
+        image = create_mock_image("media", 10)
+
+        self.assertTrue(self.scheduler.should_infer(image))
+        self.assertFalse(self.scheduler.should_infer(image))
+
+        time.sleep(0.11)
+        self.assertTrue(self.scheduler.should_infer(image))
+
+        self.assertEqual((2, 1), self.scheduler.get_stats("media"))
+
+    def testauto(self):
+        self.ai_manager.get_latency = MagicMock(return_value=0.1)
+        image = create_mock_image("media", "auto")
+
+        self.assertTrue(self.scheduler.should_infer(image))
+        self.assertFalse(self.scheduler.should_infer(image))
+        self.ai_manager.get_latency.assert_called_with("media")
+
+    def teststreams_independent(self):
+        image1 = create_mock_image("media1", 1)
+        image2 = create_mock_image("media2", 1)
+
+        self.assertTrue(self.scheduler.should_infer(image1))
+        self.assertTrue(self.scheduler.should_infer(image2))
+        self.assertFalse(self.scheduler.should_infer(image1))
+        self.assertFalse(self.scheduler.should_infer(image2))
+
+    def testmotion_gate(self):
+        motion_gate = MotionGate(0.01, downscale=4)
+        img = np.zeros((height, width, 3), dtype=np.uint8)
+        static = create_mock_image("media", None, motion_gate, img)
+        self.assertTrue(self.scheduler.should_infer(static))
+
+        img[0, 0] = 1
+        static = create_mock_image("media", None, motion_gate, img)
+        self.assertFalse(self.scheduler.should_infer(static))
+
+        moved = img.copy()
+        moved[:16, :16] = 255
+        motion = create_mock_image("media", None, motion_gate, moved)
+        self.assertTrue(self.scheduler.should_infer(motion))
+
+        self.assertEqual((2, 1), self.scheduler.get_stats("media"))
+        self.assertEqual((2, 1), motion_gate.get_stats())
+
+    def testduplicates(self):
+        img = random_frame()
+        image = create_mock_image("media", None, img=img)
+
+        self.assertTrue(self.scheduler.should_infer(image))
+        self.assertFalse(self.scheduler.should_infer(image))
+        self.assertTrue(self.scheduler.should_infer(
+            create_mock_image("media", None)))
+
+        self.assertEqual((2, 1), self.scheduler.get_stats("media"))
+
+    def testfrozen(self):
+        image = create_mock_image("media", None, img=random_frame())
+
+        for i in range(40):
+            self.scheduler.should_infer(image)
+
+        self.assertTrue(self.scheduler.is_frozen("media"))
+        self.assertFalse(self.scheduler.is_frozen("other"))
+
+        self.scheduler.should_infer(create_mock_image("media", None))
+        self.assertFalse(self.scheduler.is_frozen("media"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+#  Copyright (C) 2021 RidgeRun, LLC (http://www.ridgerun.com)
+#  Authors: Daniel Chaves <daniel.chaves@ridgerun.com>
+#           Marisol Zeledon <marisol.zeledon@ridgerun.com>
+
+import unittest
+
+import numpy as np
+
+from rr.stream.motion_gate import MotionGate, MotionGateError
+
+width = 64
+height = 48
+
+
+class TestMotionGate(unittest.TestCase):
+    def setUp(self):
+        self.img = np.full((height, width, 3), 100, dtype=np.uint8)
+        self.motion_gate = MotionGate(0.05, downscale=4)
+
+    def testfirst_image(self):
+        self.assertTrue(self.motion_gate.has_motion(self.img))
+        self.assertEqual((1, 0), self.motion_gate.get_stats())
+
+    def teststatic(self):
+        self.motion_gate.has_motion(self.img)
+
+        for i in range(5):
+            self.assertFalse(self.motion_gate.has_motion(self.img))
+
+        self.assertEqual((1, 5), self.motion_gate.get_stats())
+
+    def testnoise_below_pixel_threshold(self):
+        self.motion_gate.has_motion(self.img)
+
+        noisy = self.img + np.uint8(10)
+        self.assertFalse(self.motion_gate.has_motion(noisy))
+
+    def testmotion(self):
+        self.motion_gate.has_motion(self.img)
+
+        moved = self.img.copy()
+        moved[:height // 2] = 0
+        self.assertTrue(self.motion_gate.has_motion(moved))
+
+    def testsmall_motion_below_threshold(self):
+        self.motion_gate.has_motion(self.img)
+
+        moved = self.img.copy()
+        moved[:4, :4] = 0
+        self.assertFalse(self.motion_gate.has_motion(moved))
+
+    def testbackground_adapts(self):
+        self.motion_gate.has_motion(self.img)
+
+        moved = self.img.copy()
+        moved[:height // 2] = 0
+        for i in range(100):
+            in_motion = self.motion_gate.has_motion(moved)
+
+        self.assertFalse(in_motion)
+
+    def testresolution_change(self):
+        self.motion_gate.has_motion(self.img)
+
+        self.assertTrue(self.motion_gate.has_motion(self.img[:, :32]))
+
+    def testmake(self):
+        self.assertIsNone(MotionGate.make(None))
+        self.assertIsInstance(MotionGate.make({'threshold': 0.1}), MotionGate)
+
+        with self.assertRaises(MotionGateError):
+            MotionGate.make({'downscale': 4})
+
+        with self.assertRaises(MotionGateError):
+            MotionGate.make({'threshold': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
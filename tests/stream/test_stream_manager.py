@@ -17,6 +17,7 @@ from rr.display.display_manager import DisplayManager
 from rr.gstreamer.gst_media import GstMedia
 from rr.gstreamer.media_manager import MediaManager
 from rr.stream.stream_manager import OnNewImage
+from rr.stream.stream_manager import OnNewPrediction
 from rr.stream.stream_manager import StreamManager
 from bin.utils.imagehandler import ImageHandler
 
@@ -130,5 +131,27 @@ class TestStreamManager(unittest.TestCase):
         action_manager.execute.assert_called_once()
 
 
+class TestOnNewPrediction(unittest.TestCase):
+    def testdisplay(self):
+        action_manager = MagicMock()
+        display_manager = MagicMock()
+        on_new_prediction = OnNewPrediction(action_manager, display_manager)
+
+        on_new_prediction("prediction", "image", "media")
+
+        action_manager.execute.assert_called_once_with(
+            "prediction", "image", "media")
+        display_manager.push_image.assert_called_once_with("image", "media")
+
+    def testheadless(self):
+        action_manager = MagicMock()
+        on_new_prediction = OnNewPrediction(action_manager, None)
+
+        on_new_prediction("prediction", "image", "media")
+
+        action_manager.execute.assert_called_once_with(
+            "prediction", "image", "media")
+
+
 if __name__ == '__main__':
     unittest.main()